@@ -0,0 +1,89 @@
+# Startup budget for the emonic-admin CLI.
+#
+# Runs `python -m emonicadmin --help` and a no-op command a few times each, plus one
+# `python -X importtime` pass over emonicadmin.admin, and fails (exit 1) when the CLI
+# is slower than the budget or when the dispatcher starts importing command modules
+# or heavy stdlib modules eagerly again.
+#
+#   python benchmarks/startup.py [--runs 10] [--budget-ms 80] [--import-budget-ms 25] [--json]
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only commands need; importing any of them for --help is a regression
+FORBIDDEN_AT_STARTUP = [
+    'json', 'hashlib', 'secrets', 'ast', 'random', 'tarfile', 'zipfile', 'gzip', 'concurrent.futures',
+    'emonicadmin.commands', 'emonicadmin.buildtree', 'emonicadmin.config', 'emonicadmin.artifact',
+]
+
+def run(args, env):
+    started = time.perf_counter()
+    subprocess.run([sys.executable] + args, cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return (time.perf_counter() - started) * 1000
+
+def median_ms(args, runs, env):
+    run(args, env)  # warm the page cache and __pycache__
+    return statistics.median(run(args, env) for _ in range(runs))
+
+def import_profile(env):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import emonicadmin.admin'],
+                            cwd=ROOT, env=env, check=True, capture_output=True, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace('import time:', '|').split('|')]
+        modules[name] = int(cumulative_us)
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description='Check emonic-admin startup time against a budget.')
+    parser.add_argument('--runs', type=int, default=10, help='Timed runs per command')
+    parser.add_argument('--budget-ms', type=float, default=80.0, help='Median wall-time budget per command')
+    parser.add_argument('--import-budget-ms', type=float, default=25.0,
+                        help='Budget for the cumulative import time of emonicadmin.admin')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    results = {
+        'python': sys.version.split()[0],
+        'interpreter_ms': median_ms(['-c', 'pass'], args.runs, env),
+        'help_ms': median_ms(['-m', 'emonicadmin', '--help'], args.runs, env),
+        'noop_ms': median_ms(['-m', 'emonicadmin', 'setup'], args.runs, env),
+    }
+    modules = import_profile(env)
+    results['import_ms'] = modules.get('emonicadmin', modules.get('emonicadmin.admin', 0)) / 1000
+    results['eager_imports'] = sorted(name for name in modules
+                                      if any(name == forbidden or name.startswith(forbidden + '.')
+                                             for forbidden in FORBIDDEN_AT_STARTUP))
+
+    failures = []
+    for key in ('help_ms', 'noop_ms'):
+        if results[key] > args.budget_ms:
+            failures.append(f'{key} {results[key]:.1f} ms > {args.budget_ms:.1f} ms')
+    if results['import_ms'] > args.import_budget_ms:
+        failures.append(f'import_ms {results["import_ms"]:.1f} ms > {args.import_budget_ms:.1f} ms')
+    if results['eager_imports']:
+        failures.append(f'eagerly imported: {", ".join(results["eager_imports"])}')
+    results['failures'] = failures
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f'python {results["python"]}: interpreter {results["interpreter_ms"]:.1f} ms, '
+              f'--help {results["help_ms"]:.1f} ms, no-op {results["noop_ms"]:.1f} ms, '
+              f'import {results["import_ms"]:.1f} ms')
+        for failure in failures:
+            print(f'FAIL: {failure}')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
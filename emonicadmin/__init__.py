@@ -1 +1,8 @@
-from .admin import *
\ No newline at end of file
+from .admin import main, LAZY_EXPORTS
+
+__all__ = ['main'] + list(LAZY_EXPORTS)
+
+def __getattr__(name):
+    # Keep `from emonicadmin import create_project` working without importing every command up front
+    from . import admin
+    return getattr(admin, name)
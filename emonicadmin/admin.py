@@ -1,557 +1,349 @@
 import os
 import argparse
-import json
-import secrets
-import ast
-import shutil
-import random
-import time
 
-def create_project(project_name):
-    project_path = os.path.join(os.getcwd(), project_name)
-
-    try:
-        os.makedirs(project_path, exist_ok=True)
-
-        # Create folders and files
-        open(os.path.join(project_path, '__init__.py'), 'a').close()
-        open(os.path.join(project_path, 'urls.py'), 'a').close()
-        open(os.path.join(project_path, 'settings.py'), 'a').close()
-        open(os.path.join(project_path, 'gradle.py'), 'a').close()
-
-        # Add content to settings.py
-        settings_content = f'''
-INSTALLED_APPS = [
-    '@emonic.core',
-    '@emonic.mail',
-    '@emonic.contrib',
-    '@emonic.Restful',
-    '@emonic.security',
-    '@emonic.utils',
-    '@emonic.components',
-    '@emonic.structer',
-    '@emonic.builder',
-    '{project_name}.admin',
-]
-
-ALLOWED_HOSTS = ['0.0.0.0', '127.0.0.1']
-        '''
-        with open(os.path.join(project_path, 'settings.py'), 'w') as settings_file:
-            settings_file.write(settings_content)
-
-        # Add content to urls.py
-        urls_content = f'''
-from {project_name}.urls import path
-
-urlpatterns = [
-    path('{project_name}')
-]
-        '''
-        with open(os.path.join(project_path, 'urls.py'), 'w') as urls_file:
-            urls_file.write(urls_content)
-
-        # Delete existing config.py if it exists
-        config_path = os.path.join(os.getcwd(), 'config.py')
-        if os.path.exists(config_path):
-            os.remove(config_path)
-
-        unique_key = secrets.token_hex(16)
-        unique_checksum = secrets.token_hex(32)
-
-        # Create config.py
-        config_content = f'''APP = [
-    {{
-        "project": {{
-            "project": "{project_name}",
-            "path": "{project_path}",
-            "gradle": {{
-                "version": 1.1,
-                "path": "{project_path}?gradle.key{unique_key}",
-                "projectSecrets": ["myadmin", "root", "builder"],
-                "checksum": "{unique_checksum}"
-            }},
-            "projectKey": "{unique_key}",
-            "projectAdmin": "emonic.root",
-            "alice": None
-        }}
-    }}
-]
-
-GRADLE = []
-        '''
-        with open(config_path, 'w') as config_file:
-            config_file.write(config_content)
-
-        message = f'''Project {project_name} intitiazed. \n 
-APP = [
-    {{
-        "project": {{
-            "project": "{project_name}",
-            "path": "{project_path}",
-            "gradle": {{
-                "version": 1.1,
-                "path": "{project_path}?gradle.key{unique_key}",
-                "checksum": "{unique_checksum}"
-            }},
-            "projectKey": "{unique_key}",
-        }}
-    }}
-] \n
-
-run ^ `emonic-admin setup --migrate` # Migrate your project
->> emonic-admin 1.0.1
-        '''
-
-        print(message)
-    except Exception as e:
-        print(f'Error creating project "{project_name}": {e}')
-
-def fetch_project_name():
-    config_path = os.path.join(os.getcwd(), 'config.py')
-    if os.path.exists(config_path):
-        with open(config_path, 'r') as config_file:
-            config_content = config_file.read()
-
-            # Extract project name using string manipulation
-            project_name_start = config_content.find('"project": "') + len('"project": "')
-            project_name_end = config_content.find('"', project_name_start)
-            project_name = config_content[project_name_start:project_name_end]
-            
-            return project_name
-    else:
-        print('config.py does not exist.')
-        return None
-
-def create_migration():
-    project_name = fetch_project_name()
-
-    if project_name:
-        project_path = os.path.join(os.getcwd(), project_name)
-        migration_path = os.path.join(project_path, 'Gradle')
-
-        try:
-            os.makedirs(migration_path, exist_ok=True)
-
-            # Create files inside migration_path
-            open(os.path.join(migration_path, '__init__.py'), 'a').close()
-            open(os.path.join(migration_path, 'migration.py'), 'a').close()
-            open(os.path.join(migration_path, 'build.py'), 'a').close()
-
-            # Add content to migration.py
-            migration_content = f'''BUILDER = [
-    {{
-        "project": {{
-            "init": "main:{project_name}:gradle",
-            "migration": "gradle.migrate",
-            "entry_point": {{
-                "root": "{project_path}",
-                "secure": True
-            }},
-            "connection": {{
-                "connect": "http://emonic.vvfin.in/connect/migration/{{secret_key}}",
-                "CORS": "Keep-Alive-3.0",
-                "setup": ['on', 'disconnect']
-            }},
-            "gradle": {{
-                "name": "gradle.com.1",
-                "version": 1.1,
-                "key": "",
-                "entry": "BUILDER"
-            }}
-        }}
-    }}
-]
-            '''
-            with open(os.path.join(migration_path, 'migration.py'), 'w') as migration_file:
-                migration_file.write(migration_content)
-
-            print(f'Migration of {project_name} in progress...')
-
-            # Add content to build.py
-            build_content = f'''GRADLE_BUILD = ["{project_name}", "{project_path}"]
-            '''
-            with open(os.path.join(migration_path, 'build.py'), 'w') as build_file:
-                build_file.write(build_content)
-                time.sleep(5)
-
-            message = f'''Migration setup for {project_name} is completed. \n
-BUILDER = [
-    {{
-        "project": {{
-            "init": "main:{project_name}:gradle",
-            "migration": "gradle.migrate",
-            "entry_point": {{
-                "root": "{project_path}",
-                "secure": True
-            }}
-        }}
-    }}
-]
-
-run ^ `emonic-admin build --p <gradle_project_name>` ## For build core project.
->> emonic-admin 1.0.1
-'''
-
-            print(message)
-        except Exception as e:
-            print(f'Error creating migration for "{project_name}": {e}')
-    else:
-        print('Error: Project name not found in config.py.')
-
-def build_project(project_name):
-    gradle_project_name = fetch_project_name()
-    project_path = os.path.join(os.getcwd(), gradle_project_name)
-    root_project_path = os.path.join(os.getcwd(), project_name)
-    migration_path = os.path.join(project_path, 'Gradle')
-    migration_file_path = os.path.join(migration_path, 'migration.py')
-
-    if os.path.exists(migration_file_path):
-        with open(migration_file_path, 'r') as migration_file:
-            migration_content = migration_file.read()
-            if 'BUILDER' in migration_content:
-                if f'"init": "main:{gradle_project_name}:gradle"' in migration_content and \
-                   '"migration": "gradle.migrate"' in migration_content:
-
-                    # Update INSTALLED_APPS in settings.py
-                    settings_path = os.path.join(project_path, 'settings.py')
-                    with open(settings_path, 'r') as settings_file:
-                        settings_content = settings_file.read()
-                    if f"'@{project_name}.gradle'" not in settings_content:
-                        new_settings_content = settings_content.replace(
-                            'INSTALLED_APPS = [',
-                            f"INSTALLED_APPS = [\n'@{project_name}.gradle',"
-                        )
-                        with open(settings_path, 'w') as settings_file:
-                            settings_file.write(new_settings_content)
-
-                    # Create a new folder outside {project_name}
-                    new_project_path = os.path.join(os.getcwd(), project_name)
-                    os.makedirs(new_project_path, exist_ok=True)
-                    os.makedirs(os.path.join(new_project_path, 'app'), exist_ok=True)
-
-                    open(os.path.join(new_project_path, '__init__.py'), 'a').close()
-                    open(os.path.join(new_project_path, 'views.py'), 'a').close()
-                    open(os.path.join(new_project_path, 'settings.py'), 'a').close()
-
-                    # Create views.py
-                    views_content = f'''from emonic.core.branch import Emonic
-
-app = Emonic(__name__)
-
-@app.route('/')
-def emonic(request):
-    return "Welcome to Emonic server!"
-
-if __name__ == "__main__":
-    app.run()
-    '''
-                    with open(os.path.join(new_project_path, 'views.py'), 'w') as views_file:
-                        views_file.write(views_content)
-
-                    # Create settings.py
-                    settings_content = f'''HOST = 'localhost'
-PORT = 8000
-DEBUG = True
-SECRET_KEY = "your_secret_key"
-STATIC_FOLDER = "static"
-
-TEMPLATES = [
-    {{
-        'BACKEND': 'emonic.backends.EmonicTemplates',
-        'DIRS': ['views'],
-    }}
-]
-
-DATABASES = {{
-    'default': {{
-        'ENGINE': 'emonic.db.backends.electrus',
-        'HOST': 'localhost',
-        'PORT': 37017,
-        'USER': 'root',
-        'PASSWORD': 'root'
-    }}
-}}
-
-MAILER = [
-    {{
-        "SMTP": "VALUE",
-        "PORT": "VALUE",
-        "USERNAME": "VALUE",
-        "PASSWORD": "VALUE",
-        "SSL": True,
-        "DEFAULT_SENDER": "VALUE"
-    }}
-]
-
-PATH = [
-    {{
-        "project": {{
-            "name": "{project_name}",
-            "path": "{root_project_path}"
-        }},
-        "gradle": {{
-            "name": "{gradle_project_name}",
-            "path": "{project_path}"
-        }}
-    }}
-]
-
-SCRIPT = [
-    {{
-        "config": {{
-            "wsgi": "emonic.wsgi.http",
-            "host": "localhost",
-            "port": "8000",
-            "debug": "True"
-        }},
-        "apps": {{
-            "emonic",
-            "emonic-admin"
-            # add more emonic apps for e.g, electrus nexusdb etc...
-        }}
-    }}
-]
-    '''
-                    with open(os.path.join(new_project_path, 'settings.py'), 'w') as settings_file:
-                        settings_file.write(settings_content)
-
-                    # Update config.py with GRADLE_PROJECT
-                    config_path = os.path.join(os.getcwd(), 'config.py')
-                    with open(config_path, 'r') as config_file:
-                        config_content = config_file.read()
-                    new_config_content = config_content.replace(
-                        'GRADLE = [',  # Update this line
-                        f'''GRADLE = [
-    {{
-        "gradle": {{
-            "project": "{project_name}",
-            "path": "{root_project_path}",
-            "dev": {{
-                "host": "localhost",
-                "port": 8000,
-                "debug": True,
-                "key": {random.randint(10000000000, 99999999999)},
-                "script": "run {project_name}/wsgi.py",
-                "console": "",
-                "version": 1.1
-            }},
-            "prod": {{
-                "host": "0.0.0.0",
-                "port": 8000,
-                "server": ['gunicorn', 'uWSGI'],
-                "prod-key": None,
-                "script": "run {project_name}/wsgi.py",
-                "build": "gradle {project_name}",
-                "version": 1.1
-            }}
-        }}
-    }}
-'''
-                    )
-
-                    print("Runnig builder...")
-                    with open(config_path, 'w') as config_file:
-                        config_file.write(new_config_content)
-
-                    message = f'''
-GRADLE = [
-    {{
-        "gradle": {{
-            "project": "{project_name}",
-            "path": "{root_project_path}",
-            "dev": {{
-                "host": "localhost",
-                "port": 8000,
-                "debug": True,
-                "key": {random.randint(10000000000, 99999999999)},
-                "script": "run {project_name}/wsgi.py",
-                "console": "",
-                "version": 1.1
-            }},
-            "prod": {{
-                "host": "0.0.0.0",
-                "port": 8000,
-                "server": ['gunicorn', 'uWSGI'],
-                "prod-key": None,
-                "script": "run {project_name}/wsgi.py",
-                "build": "gradle {project_name}",
-                "version": 1.1
-            }}
-        }}
-    }}
-]
-
-Builder completed, Gradle project: {project_name}.
-run ^ `emonic-admin gradle --production` # Setup your project for production.
-run ^ `emonic-admin manage engine` # For setup your Emonic Static and Templating Engine.
-run ^ `emonic-admin create electrus cli -u root -p root` # Creating the Electrus CLI Engine.
->> emonic-admin 1.0.1
-'''
-                    time.sleep(5)
-                    print(message)
-                else:
-                    print('Error: Invalid migration configuration in migration.py.')
-            else:
-                print('Error: BUILDER list is missing in migration.py.')
-    else:
-        print('Error: migration.py does not exist.')
-
-def fetch_gradle_project_name():
-    config_path = os.path.join(os.getcwd(), 'config.py')
-    if os.path.exists(config_path):
-        with open(config_path, 'r') as config_file:
-            config_content = config_file.read()
-
-            # Find the index of the "GRADLE" key within the config content
-            gradle_index = config_content.find('GRADLE = [')
-            if gradle_index != -1:
-                # Extract the content of the GRADLE list
-                gradle_list_start = gradle_index + len('GRADLE = [')
-                gradle_list_end = config_content.find(']', gradle_index) + 1
-                gradle_list_content = config_content[gradle_list_start:gradle_list_end]
-
-                # Find the index of the "project" key within the GRADLE list content
-                project_key_index = gradle_list_content.find('"project": "')
-                if project_key_index != -1:
-                    project_name_start = project_key_index + len('"project": "')
-                    project_name_end = gradle_list_content.find('"', project_name_start)
-                    project_name = gradle_list_content[project_name_start:project_name_end]
-
-                    return project_name
-                else:
-                    print('"project" key not found in GRADLE list.')
-                    return None
-            else:
-                print('GRADLE list not found in config.py.')
-                return None
-    else:
-        print('config.py does not exist.')
-        return None
-
-def fetch_static_dirs(project_name):
-    project_path = os.path.join(os.getcwd(), project_name)
-    settings_path = os.path.join(project_path, 'settings.py')
-    static_folder = None
-    dirs_value = None
-
-    if os.path.exists(settings_path):
-        with open(settings_path, 'r') as settings_file:
-            settings_content = settings_file.read()
-            static_start = settings_content.find('STATIC_FOLDER = ') + len('STATIC_FOLDER = ')
-            static_end = settings_content.find('\n', static_start)
-            static_folder = settings_content[static_start:static_end].strip('"')
-
-            dirs_start = settings_content.find("'DIRS': [") + len("'DIRS': [")
-            dirs_end = settings_content.find(']', dirs_start)
-            dirs_value = settings_content[dirs_start:dirs_end]
-
-            # Remove enclosing quotes from dirs_value if present
-            dirs_value = dirs_value.strip(" '\"")
-
-    return static_folder, dirs_value
-
-def manage_engine():
-    gradle_project_name = fetch_gradle_project_name()
-    project_path = os.path.join(os.getcwd(), gradle_project_name)
-    
-    static_folder, dirs_value = fetch_static_dirs(gradle_project_name)
-
-    if static_folder and dirs_value:
-        static_path = os.path.join(project_path, static_folder)
-        dirs_path = os.path.join(project_path, dirs_value)
-
-        if not os.path.exists(static_path):
-            os.makedirs(static_path)
-
-            # Create css/ and js/ folders inside static_path
-            os.makedirs(os.path.join(static_path, 'css'), exist_ok=True)
-            os.makedirs(os.path.join(static_path, 'js'), exist_ok=True)
-
-        if not os.path.exists(dirs_path):
-            os.makedirs(dirs_path)
-
-            # Create index.html file inside dirs_path
-            with open(os.path.join(dirs_path, 'index.html'), 'w') as dirs_file:
-                dirs_file.write('')
-
-        print(f'Emonic template and static engine setup for {gradle_project_name} is completed.')
-    else:
-        print(f'Error: Static folder and/or DIRS value not found in settings.py for {gradle_project_name}.')
-
-def gradle_build():
-    gradle_project_name = fetch_gradle_project_name()
-    root_project_name = fetch_project_name()
-    
-    if gradle_project_name and root_project_name:
-        project_path = os.path.join(os.getcwd(), gradle_project_name)
-        build_path = os.path.join(os.getcwd(), 'build')
-
-        if os.path.exists(project_path):
-            shutil.copytree(project_path, build_path)
-
-            emonic_path = os.path.join(build_path, 'root')
-            os.makedirs(emonic_path, exist_ok=True)
-
-            for root, _, files in os.walk(os.path.join(project_path, 'build/root')):
-                for file in files:
-                    src_file = os.path.join(root, file)
-                    dst_file = os.path.join(emonic_path, file)
-                    shutil.copy2(src_file, dst_file)
-            
-            root_project_path = os.path.join(os.getcwd(), root_project_name)
-            for root, dirs, files in os.walk(root_project_path):
-                for dir in dirs:
-                    src_dir = os.path.join(root, dir)
-                    dst_dir = os.path.join(emonic_path, dir)
-                    shutil.copytree(src_dir, dst_dir)
-                for file in files:
-                    src_file = os.path.join(root, file)
-                    dst_file = os.path.join(emonic_path, file)
-                    shutil.copy2(src_file, dst_file)
-
-            print(f'Gradle build completed and copied to the build directory.')
-        else:
-            print(f'Error: {gradle_project_name} does not exist.')
-    else:
-        print(f'Error: gradle_project_name or project_name not found in config.py.')
+# Command implementations live in emonicadmin.commands and are imported only when
+# the command runs, so `emonic-admin --help` does not pay for shutil, json, hashlib...
+LAZY_EXPORTS = {
+    'create_project': 'emonicadmin.commands.createproject',
+    'remove_project': 'emonicadmin.commands.removeproject',
+    'create_migration': 'emonicadmin.commands.migrate',
+    'build_project': 'emonicadmin.commands.build',
+    'manage_engine': 'emonicadmin.commands.manage',
+    'build_assets': 'emonicadmin.commands.assets',
+    'compile_templates': 'emonicadmin.commands.templates',
+    'gradle_build': 'emonicadmin.commands.gradle',
+    'gradle_watch': 'emonicadmin.commands.gradle',
+    'run_batch': 'emonicadmin.commands.batch',
+    'run_bench': 'emonicadmin.commands.bench',
+    'run_bench_serve': 'emonicadmin.commands.benchserve',
+    'load_registry': 'emonicadmin.registry',
+    'load_config': 'emonicadmin.config',
+    'fetch_project_name': 'emonicadmin.config',
+    'fetch_gradle_project_name': 'emonicadmin.config',
+    'fetch_static_dirs': 'emonicadmin.config',
+    'sync_build_tree': 'emonicadmin.buildtree',
+    'WriteTransaction': 'emonicadmin.transaction',
+    'render_template': 'emonicadmin.templating',
+}
+
+__all__ = ['main'] + list(LAZY_EXPORTS)
+
+def __getattr__(name):
+    if name in LAZY_EXPORTS:
+        import importlib
+        return getattr(importlib.import_module(LAZY_EXPORTS[name]), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+def add_project_selector(parser):
+    selector = parser.add_mutually_exclusive_group()
+    selector.add_argument('--project', action='append', metavar='NAME',
+                          help='GRADLE project to run for, building into build/<NAME> (repeatable)')
+    selector.add_argument('--all', action='store_true', help='Run for every GRADLE project in config.py concurrently')
+
+def run_selected(args, function):
+    # function(project) for every project picked by --project/--all, concurrently
+    from .registry import run_projects, select_projects
+    projects = select_projects(names=args.project or [], all_projects=args.all)
+    if projects is None:
+        raise SystemExit(1)
+    results = run_projects(projects, function)
+    failed = [name for name, result in results.items() if result is None or result is False]
+    if failed:
+        print(f'Error: {", ".join(failed)} failed.')
+        raise SystemExit(1)
+
+def check_result(result):
+    # Commands return None or False on failure; the exit status lets scripts and CI gate on it
+    if result is None or result is False:
+        raise SystemExit(1)
 
 def main():
     parser = argparse.ArgumentParser(description='Utility for managing projects and configurations.')
     subparsers = parser.add_subparsers(title='Available commands', dest='command', metavar='command')
 
+    # Output options shared by every command
+    common_parser = argparse.ArgumentParser(add_help=False)
+    common_parser.add_argument('-q', '--quiet', action='store_true', help='Only print errors')
+    common_parser.add_argument('--no-progress', action='store_true', help='Do not print per-step progress')
+    common_parser.add_argument('--profile', action='store_true',
+                               help='Print per-phase wall time, syscall counts, counters and peak RSS when done')
+    common_parser.add_argument('--timings-json', metavar='PATH', help='Write the profile as JSON to PATH')
+    common_parser.add_argument('--cprofile', metavar='PATH', help='Dump cProfile statistics for the command to PATH')
+    common_parser.add_argument('--template-dir', action='append', default=[], metavar='DIR',
+                               help='Directory of scaffold templates that override the bundled ones (repeatable)')
+
     # Create Project
-    create_parser = subparsers.add_parser('createproject', help='Create a new project')
+    create_parser = subparsers.add_parser('createproject', parents=[common_parser], help='Create a new project')
     create_parser.add_argument('project_name', type=str, help='Name of the project')
 
+    # Remove Project
+    remove_parser = subparsers.add_parser('removeproject', parents=[common_parser],
+                                          help='Remove an APP or GRADLE project from config.py')
+    remove_parser.add_argument('project_name', type=str, help='Name of the project')
+
     # Set Up Migration
-    setup_parser = subparsers.add_parser('setup', help='Set up migration for a project')
+    setup_parser = subparsers.add_parser('setup', parents=[common_parser], help='Set up migration for a project')
     setup_parser.add_argument('--migrate', '-M', action='store_true', help='Set up migration')
+    setup_parser.add_argument('--app', metavar='NAME', help='APP project to set up (default: the first one in config.py)')
 
     # Build Project
-    build_parser = subparsers.add_parser('build', help='Build project setup')
+    build_parser = subparsers.add_parser('build', parents=[common_parser], help='Build project setup')
     build_parser.add_argument('-p', '--project', type=str, help='Project name for build setup')
+    build_parser.add_argument('--app', metavar='NAME', help='APP project to build on (default: the first one in config.py)')
+    build_parser.add_argument('--async', dest='async_app', action='store_true',
+                              help='Also generate asgi.py, async_views.py and hypercorn/uvicorn launch configs')
+    settings_group = build_parser.add_argument_group('settings.py', 'Production database and cache settings')
+    settings_group.add_argument('--settings-profile', choices=['auto', 'cpu', 'io', 'low-memory'], default='auto',
+                                help='Size connection pools for this server profile (see gradle --server-config)')
+    settings_group.add_argument('--db-pool-size', type=int, metavar='N', help='Connections kept open per process')
+    settings_group.add_argument('--db-max-overflow', type=int, metavar='N',
+                                help='Extra connections allowed under bursts (default: the pool size)')
+    settings_group.add_argument('--db-pool-recycle', type=int, default=1800, metavar='SECONDS',
+                                help='Replace connections after this many seconds (default 1800)')
+    settings_group.add_argument('--db-replica', action='append', default=[], metavar='HOST[:PORT]',
+                                help='Read replica to add to DATABASES (repeatable)')
+    settings_group.add_argument('--cache', choices=['locmem', 'file', 'redis'], default='locmem',
+                                help='Production cache backend; development always uses local memory')
+    settings_group.add_argument('--cache-location', metavar='LOCATION',
+                                help='Cache name, directory or redis:// URL (default depends on --cache)')
 
     # Manage Engine
-    manage_parser = subparsers.add_parser('manage', help='Manage startup engine')
-    manage_parser.add_argument('engine', choices=['engine'], help='Manage the startup engine')
-
-    gradle_parser = subparsers.add_parser('gradle', help='Build emonic project for production')
+    manage_parser = subparsers.add_parser('manage', parents=[common_parser], help='Manage startup engine')
+    manage_parser.add_argument('action', choices=['engine', 'assets', 'compile-templates'],
+                               help='engine: set up the startup engine; assets: minify, fingerprint and precompress '
+                                    'static files; compile-templates: precompile the DIRS templates into build/')
+    manage_parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of parallel asset workers')
+    manage_parser.add_argument('--no-minify', action='store_true', help='Fingerprint and compress assets without minifying them')
+    add_project_selector(manage_parser)
+
+    # Choices mirror buildtree.LINK_MODES and artifact.ARTIFACT_FORMATS, kept literal to avoid importing them
+    gradle_parser = subparsers.add_parser('gradle', parents=[common_parser], help='Build emonic project for production')
     gradle_parser.add_argument('-s', '--production', action='store_true', help='Perform a production gradle build')
+    gradle_parser.add_argument('-i', '--incremental', action='store_true', help='Only copy files changed since the last build')
+    gradle_parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of parallel file copy workers')
+    gradle_parser.add_argument('--link-mode', choices=['copy', 'hardlink', 'reflink', 'auto'], default='copy',
+                               help='How files are placed in build/: copy, hardlink, reflink or auto (reflink, then in-kernel copy)')
+    gradle_parser.add_argument('--artifact', choices=['tar.gz', 'tar.zst', 'zip'],
+                               help='Also stream the build into a reproducible dist/<project>.<format> archive')
+    gradle_parser.add_argument('--compile-templates', action='store_true',
+                               help='Run `manage compile-templates` before copying the build')
+    gradle_parser.add_argument('--compile', nargs='?', const='0', metavar='LEVELS',
+                               help='Precompile build/ to bytecode at these comma-separated optimize levels (default 0)')
+    gradle_parser.add_argument('--pyc-mode', choices=['checked-hash', 'unchecked-hash', 'timestamp'], default='checked-hash',
+                               help='How --compile bytecode is validated at import time (default checked-hash)')
+    gradle_parser.add_argument('--zipapp', action='store_true',
+                               help='Ship build/root as the importable archive build/root.pyz (with .pyc files under --compile); '
+                                    'the --server-config gunicorn and uWSGI configs put it on sys.path, anything else '
+                                    'needs it on PYTHONPATH')
+    gradle_parser.add_argument('--prune-imports', action='store_true',
+                               help='Only ship Python modules reachable from views.py and the other entry points, '
+                                    'and static files something references')
+    gradle_parser.add_argument('-w', '--watch', action='store_true',
+                               help='Keep build/ in sync with the projects, copying only changed files')
+    gradle_parser.add_argument('--debounce-ms', type=int, default=20,
+                               help='With --watch, wait for this many quiet milliseconds before syncing a burst of changes')
+    gradle_parser.add_argument('--poll', action='store_true', help='With --watch, poll instead of using inotify')
+    gradle_parser.add_argument('--server-config', nargs='?', const='auto', choices=['auto', 'cpu', 'io', 'low-memory'],
+                               metavar='PROFILE',
+                               help='Write gunicorn.conf.py and uwsgi.ini into build/, tuned for this host (auto) or a '
+                                    'profile: cpu, io or low-memory')
+    gradle_parser.add_argument('--deploy', metavar='TARGET',
+                               help='Deploy the build into TARGET/releases/<id>, hardlinking unchanged files, and '
+                                    'switch TARGET/current to it atomically')
+    gradle_parser.add_argument('--keep-releases', type=int, default=5, metavar='N',
+                               help='With --deploy, keep the N newest releases (default 5)')
+    gradle_parser.add_argument('--no-tree', action='store_true', help='Skip the loose build/ directory (requires --artifact)')
+    add_project_selector(gradle_parser)
+
+    # Batch
+    batch_parser = subparsers.add_parser('batch', parents=[common_parser], help='Scaffold many projects from a manifest')
+    batch_parser.add_argument('manifest', type=str, help='JSON, YAML or TOML manifest listing the projects')
+    batch_parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of workspaces scaffolded in parallel')
+
+    # Bench
+    bench_parser = subparsers.add_parser('bench', parents=[common_parser],
+                                         help='Time the scaffold and gradle pipeline on synthetic projects')
+    bench_parser.add_argument('--files', default='1k', metavar='N[,N...]',
+                              help='Comma-separated synthetic file counts, e.g. 1k,10k,100k (default 1k)')
+    bench_parser.add_argument('--shape', choices=['wide', 'deep', 'both'], default='wide',
+                              help='Few large directories (wide), a nested binary tree (deep) or both')
+    bench_parser.add_argument('--gradle-entries', type=int, default=1, help='Number of GRADLE entries in config.py')
+    bench_parser.add_argument('--file-size', type=int, default=1024, help='Bytes per synthetic file')
+    bench_parser.add_argument('--runs', type=int, default=3, help='Fresh workspaces timed per scenario')
+    bench_parser.add_argument('-j', '--jobs', type=int, default=1, help='Copy workers for the gradle build')
+    bench_parser.add_argument('--dir', help='Directory to create the workspaces in (default: system temp)')
+    bench_parser.add_argument('--json', metavar='PATH', help='Write machine-readable results to PATH (- for stdout)')
+    bench_parser.add_argument('--keep', action='store_true', help='Keep the generated workspaces')
+
+    # Choices mirror serverconfig.SERVER_PROFILES, kept literal to avoid importing it
+    serve_parser = subparsers.add_parser('bench-serve', parents=[common_parser],
+                                         help='Load test the built app under a server profile')
+    serve_parser.add_argument('--project', metavar='NAME', help='GRADLE project whose build/<NAME> to serve')
+    serve_parser.add_argument('--server-profile', choices=['auto', 'cpu', 'io', 'low-memory'], default='auto',
+                              help='Worker and thread layout, as for `gradle --server-config` (default auto)')
+    serve_parser.add_argument('--server', choices=['auto', 'gunicorn', 'builtin'], default='auto',
+                              help='gunicorn, or the built-in pre-forking wsgiref server (auto: gunicorn if installed)')
+    serve_parser.add_argument('--app', metavar='MODULE:ATTR',
+                              help='WSGI application to serve (default: wsgi:application or views:app in build/root)')
+    serve_parser.add_argument('-c', '--connections', type=int, default=64, help='Concurrent keep-alive connections')
+    serve_parser.add_argument('-d', '--duration', type=float, default=10.0, help='Seconds of measured load')
+    serve_parser.add_argument('--warmup', type=float, default=1.0, help='Seconds of unmeasured load first')
+    serve_parser.add_argument('--route', action='append', metavar='PATH',
+                              help='Path to request, cycled across requests (repeatable, default /)')
+    serve_parser.add_argument('--port', type=int, help='Port to serve on (default: a free one)')
+    serve_parser.add_argument('--json', metavar='PATH', help='Write machine-readable results to PATH (- for stdout)')
+    serve_parser.add_argument('--min-rps', type=float, metavar='N', help='Fail when throughput is below N requests/s')
+    serve_parser.add_argument('--max-p99-ms', type=float, metavar='MS', help='Fail when p99 latency is above MS')
 
     args = parser.parse_args()
 
-    if args.command == 'createproject':
-        create_project(args.project_name)
-    elif args.command == 'setup' and args.migrate:
-        create_migration()
-    elif args.command == 'build' and args.project:
-        build_project(args.project)
-    elif args.command == 'manage' and args.engine == 'engine':
-        manage_engine()
-    elif args.command == 'gradle' and args.production:
-        gradle_build()
-    else:
-        parser.print_help()
+    from .output import OUTPUT
+    OUTPUT['quiet'] = getattr(args, 'quiet', False)
+    OUTPUT['progress'] = not getattr(args, 'no_progress', False)
+    if getattr(args, 'template_dir', None):
+        from .templating import set_template_dirs
+        set_template_dirs(args.template_dir)
+
+    # Profiling is opt-in; without these flags the hooks in emonicadmin.profiling stay no-ops
+    profiling = getattr(args, 'profile', False) or getattr(args, 'timings_json', None) or getattr(args, 'cprofile', None)
+    if profiling:
+        from .profiling import start_profile
+        start_profile(args.command, cprofile=bool(args.cprofile))
+
+    try:
+        if args.command == 'createproject':
+            from .commands.createproject import create_project
+            check_result(create_project(args.project_name))
+        elif args.command == 'removeproject':
+            from .commands.removeproject import remove_project
+            check_result(remove_project(args.project_name))
+        elif args.command == 'setup' and args.migrate:
+            from .commands.migrate import create_migration
+            check_result(create_migration(args.app))
+        elif args.command == 'build' and args.project:
+            from .commands.build import build_project
+            from .settingsconfig import parse_replica
+            try:
+                replicas = [parse_replica(replica) for replica in args.db_replica]
+            except ValueError as e:
+                build_parser.error(str(e))
+            if (args.db_pool_size is not None and args.db_pool_size < 1) or \
+                    (args.db_max_overflow is not None and args.db_max_overflow < 0) or args.db_pool_recycle < 1:
+                build_parser.error('--db-pool-size and --db-pool-recycle must be at least 1, '
+                                   '--db-max-overflow must not be negative')
+            settings_options = {'profile': args.settings_profile, 'pool_size': args.db_pool_size,
+                                'max_overflow': args.db_max_overflow, 'recycle': args.db_pool_recycle,
+                                'replicas': replicas, 'cache': args.cache, 'cache_location': args.cache_location}
+            check_result(build_project(args.project, args.app, async_app=args.async_app,
+                                       settings_options=settings_options))
+        elif args.command == 'manage' and args.action == 'engine':
+            from .commands.manage import manage_engine
+            if args.project or args.all:
+                run_selected(args, manage_engine)
+            else:
+                check_result(manage_engine())
+        elif args.command == 'manage' and args.action == 'assets':
+            if args.jobs is not None and args.jobs < 1:
+                manage_parser.error('--jobs must be at least 1')
+            from .commands.assets import build_assets
+            if args.project or args.all:
+                run_selected(args, lambda project: build_assets(project, jobs=args.jobs, minify=not args.no_minify))
+            else:
+                check_result(build_assets(jobs=args.jobs, minify=not args.no_minify))
+        elif args.command == 'manage' and args.action == 'compile-templates':
+            from .commands.templates import compile_templates
+            if args.project or args.all:
+                from .registry import project_build_path
+                run_selected(args, lambda project: compile_templates(
+                    project, build_path=project_build_path(os.getcwd(), project)))
+            elif compile_templates() is None:
+                raise SystemExit(1)
+        elif args.command == 'batch':
+            if args.jobs is not None and args.jobs < 1:
+                batch_parser.error('--jobs must be at least 1')
+            from .commands.batch import run_batch
+            if not run_batch(args.manifest, args.jobs):
+                raise SystemExit(1)
+        elif args.command == 'bench':
+            from .commands.bench import BENCH_SHAPES, parse_scale, run_bench
+            try:
+                scales = [parse_scale(value) for value in args.files.split(',')]
+            except ValueError:
+                bench_parser.error(f'invalid --files value "{args.files}"')
+            if args.runs < 1 or args.jobs < 1 or args.gradle_entries < 1:
+                bench_parser.error('--runs, --jobs and --gradle-entries must be at least 1')
+            if args.file_size < 0:
+                bench_parser.error('--file-size must not be negative')
+            shapes = BENCH_SHAPES if args.shape == 'both' else [args.shape]
+            if run_bench(scales, shapes, args.gradle_entries, args.runs, args.jobs, args.file_size, args.dir,
+                         args.json, args.keep) is None:
+                raise SystemExit(1)
+        elif args.command == 'bench-serve':
+            if args.connections < 1 or args.duration <= 0 or args.warmup < 0:
+                serve_parser.error('--connections must be at least 1, --duration positive and --warmup not negative')
+            if any(not route.startswith('/') for route in args.route or []):
+                serve_parser.error('--route paths must start with /')
+            from .commands.benchserve import run_bench_serve
+            if run_bench_serve(args.project, profile=args.server_profile, server=args.server,
+                               connections=args.connections, duration=args.duration, warmup=args.warmup,
+                               routes=args.route, app=args.app, port=args.port, json_path=args.json,
+                               min_rps=args.min_rps, max_p99_ms=args.max_p99_ms) is None:
+                raise SystemExit(1)
+        elif args.command == 'gradle' and args.watch:
+            if args.jobs < 1:
+                gradle_parser.error('--jobs must be at least 1')
+            if args.artifact or args.no_tree:
+                gradle_parser.error('--watch cannot be combined with --artifact or --no-tree')
+            if args.debounce_ms < 0:
+                gradle_parser.error('--debounce-ms must not be negative')
+            if args.all or (args.project and len(args.project) > 1):
+                gradle_parser.error('--watch follows a single project, pass at most one --project')
+            from .commands.gradle import gradle_watch
+            if gradle_watch(args.jobs, args.link_mode, debounce=args.debounce_ms / 1000, polling=args.poll,
+                            project=args.project[0] if args.project else None) is None:
+                raise SystemExit(1)
+        elif args.command == 'gradle' and args.production:
+            if args.jobs < 1:
+                gradle_parser.error('--jobs must be at least 1')
+            if args.no_tree and not args.artifact:
+                gradle_parser.error('--no-tree requires --artifact')
+            if args.deploy and args.no_tree:
+                gradle_parser.error('--deploy ships the build directory and cannot be used with --no-tree')
+            if args.keep_releases < 1:
+                gradle_parser.error('--keep-releases must be at least 1')
+            compile_levels = None
+            if args.compile is not None:
+                if args.no_tree:
+                    gradle_parser.error('--compile writes bytecode into build/ and cannot be used with --no-tree')
+                try:
+                    compile_levels = sorted({int(level) for level in args.compile.split(',')})
+                except ValueError:
+                    compile_levels = []
+                if not compile_levels or not set(compile_levels) <= {0, 1, 2}:
+                    gradle_parser.error('--compile levels must be 0, 1 and/or 2')
+            from .commands.gradle import gradle_build
+
+            # Several selected projects deploy side by side into TARGET/<project>
+            shared_target = args.all or (args.project and len(args.project) > 1)
+
+            def build(project=None):
+                deploy = os.path.join(args.deploy, project) if args.deploy and shared_target else args.deploy
+                return gradle_build(args.incremental, args.jobs, args.link_mode, artifact=args.artifact,
+                                    tree=not args.no_tree, templates=args.compile_templates,
+                                    prune_imports=args.prune_imports, compile_levels=compile_levels,
+                                    pyc_mode=args.pyc_mode, zipapp=args.zipapp, project=project,
+                                    server_profile=args.server_config, deploy=deploy,
+                                    keep_releases=args.keep_releases)
+            if args.project or args.all:
+                run_selected(args, build)
+            else:
+                check_result(build())
+        else:
+            parser.print_help()
+    finally:
+        if profiling:
+            from .profiling import finish_profile
+            finish_profile(args.profile, args.timings_json, args.cprofile)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
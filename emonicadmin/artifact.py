@@ -0,0 +1,124 @@
+import os
+import time
+import gzip
+import shutil
+import tarfile
+import zipfile
+
+from .bytecode import legacy_pyc
+from .profiling import count
+
+ARTIFACT_FORMATS = ['tar.gz', 'tar.zst', 'zip']
+
+# 1980-01-01T00:00:00Z, the earliest timestamp a zip entry can hold
+DEFAULT_SOURCE_DATE_EPOCH = 315532800
+
+def source_date_epoch():
+    # Honour SOURCE_DATE_EPOCH (reproducible-builds.org) for archive timestamps
+    try:
+        return max(int(os.environ['SOURCE_DATE_EPOCH']), DEFAULT_SOURCE_DATE_EPOCH)
+    except (KeyError, ValueError):
+        return DEFAULT_SOURCE_DATE_EPOCH
+
+def open_tar_stream(raw_file, artifact_format, epoch):
+    if artifact_format == 'tar.gz':
+        # No file name and a fixed mtime in the gzip header keep the output byte-identical
+        compressor = gzip.GzipFile(filename='', mode='wb', fileobj=raw_file, compresslevel=6, mtime=epoch)
+    else:
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError('the zstandard package is required for tar.zst artifacts (pip install zstandard)')
+        compressor = zstandard.ZstdCompressor(level=10).stream_writer(raw_file, closefd=False)
+    return compressor, tarfile.open(fileobj=compressor, mode='w|', format=tarfile.PAX_FORMAT)
+
+def write_build_artifact(plan, artifact_path, artifact_format, chunk_size=1024 * 1024):
+    # Stream every planned file straight from its source into the archive, in sorted order
+    plan_dirs, plan_files = plan
+    epoch = source_date_epoch()
+    entries = sorted([(rel, None) for rel in plan_dirs] + [(rel, plan_files[rel]) for rel in plan_files])
+    total_bytes = 0
+
+    os.makedirs(os.path.dirname(artifact_path), exist_ok=True)
+    tmp_path = f'{artifact_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as raw_file:
+            if artifact_format == 'zip':
+                date_time = time.gmtime(epoch)[:6]
+                with zipfile.ZipFile(raw_file, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for rel, source in entries:
+                        if source is None:
+                            info = zipfile.ZipInfo(rel + '/', date_time)
+                            info.external_attr = (0o40755 << 16) | 0x10
+                            archive.writestr(info, b'')
+                            continue
+                        src_file, stat = source
+                        info = zipfile.ZipInfo(rel, date_time)
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                        info.external_attr = (0o100755 if stat.st_mode & 0o111 else 0o100644) << 16
+                        with open(src_file, 'rb') as src, archive.open(info, 'w', force_zip64=stat.st_size >= 2 ** 31) as dst:
+                            shutil.copyfileobj(src, dst, chunk_size)
+                        total_bytes += stat.st_size
+            else:
+                compressor, archive = open_tar_stream(raw_file, artifact_format, epoch)
+                with compressor, archive:
+                    for rel, source in entries:
+                        info = tarfile.TarInfo(rel)
+                        info.mtime = epoch
+                        info.uid = info.gid = 0
+                        info.uname = info.gname = ''
+                        if source is None:
+                            info.type = tarfile.DIRTYPE
+                            info.mode = 0o755
+                            archive.addfile(info)
+                            continue
+                        src_file, stat = source
+                        info.mode = 0o755 if stat.st_mode & 0o111 else 0o644
+                        info.size = stat.st_size
+                        with open(src_file, 'rb') as src:
+                            archive.addfile(info, src)
+                        total_bytes += stat.st_size
+        os.replace(tmp_path, artifact_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    size = os.path.getsize(artifact_path)
+    count('artifact_files', len(plan_files))
+    count('artifact_bytes', size)
+    return {'files': len(plan_files), 'bytes': total_bytes, 'size': size}
+
+def write_zipapp(files, archive_path, level=None, mode='checked-hash'):
+    # files: [(rel, (src_file, stat))]. Stored (uncompressed) entries import without zlib; with level
+    # set, each module gets a module.pyc next to it, which zipimport prefers over the source
+    date_time = time.gmtime(source_date_epoch())[:6]
+    total_bytes = 0
+    os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+    tmp_path = f'{archive_path}.{os.getpid()}.tmp'
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as archive:
+            for rel, (src_file, stat) in sorted(files):
+                with open(src_file, 'rb') as src:
+                    content = src.read()
+                info = zipfile.ZipInfo(rel, date_time)
+                info.external_attr = (0o100755 if stat.st_mode & 0o111 else 0o100644) << 16
+                archive.writestr(info, content)
+                total_bytes += len(content)
+                if level is not None and rel.endswith('.py'):
+                    try:
+                        pyc = legacy_pyc(content, rel, level, mode)
+                    except (SyntaxError, ValueError):
+                        continue
+                    info = zipfile.ZipInfo(rel[:-3] + '.pyc', date_time)
+                    info.external_attr = 0o100644 << 16
+                    archive.writestr(info, pyc)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return {'files': len(files), 'bytes': total_bytes, 'size': os.path.getsize(archive_path)}
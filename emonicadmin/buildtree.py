@@ -0,0 +1,350 @@
+import os
+import json
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .output import progress
+from .profiling import count, phase
+from .transaction import WriteTransaction
+
+BUILD_MANIFEST = '.gradle-manifest.json'
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as src:
+        for chunk in iter(lambda: src.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def copy_with_digest(src_file, dst_file, chunk_size=1024 * 1024):
+    # Copy the file and hash it in the same read pass, then keep metadata like copy2
+    digest = hashlib.sha256()
+    with open(src_file, 'rb') as src, open(dst_file, 'wb') as dst:
+        for chunk in iter(lambda: src.read(chunk_size), b''):
+            digest.update(chunk)
+            dst.write(chunk)
+    shutil.copystat(src_file, dst_file)
+    return digest.hexdigest()
+
+LINK_MODES = ['copy', 'hardlink', 'reflink', 'auto']
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+def reflink_file(src_file, dst_file):
+    if fcntl is None:
+        raise OSError('reflink is not supported on this platform')
+    with open(src_file, 'rb') as src, open(dst_file, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(src_file, dst_file)
+
+def kernel_copy_file(src_file, dst_file):
+    # Let the kernel move the bytes: copy_file_range first, sendfile as fallback
+    with open(src_file, 'rb') as src, open(dst_file, 'wb') as dst:
+        in_fd, out_fd = src.fileno(), dst.fileno()
+        remaining = os.fstat(in_fd).st_size
+        offset = 0
+        use_range = hasattr(os, 'copy_file_range')
+        while remaining > 0:
+            if use_range:
+                try:
+                    sent = os.copy_file_range(in_fd, out_fd, remaining)
+                except OSError:
+                    use_range = False
+                    continue
+            else:
+                sent = os.sendfile(out_fd, in_fd, offset, remaining)
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+    shutil.copystat(src_file, dst_file)
+
+def place_file(src_file, dst_file, link_mode='copy', unsupported=None):
+    # Returns (digest, method); digest is None when the bytes were never read in userspace
+    if unsupported is None:
+        unsupported = set()
+    try:
+        os.remove(dst_file)
+    except FileNotFoundError:
+        pass
+
+    if link_mode == 'hardlink' and 'hardlink' not in unsupported:
+        try:
+            os.link(src_file, dst_file)
+            return None, 'hardlink'
+        except OSError:
+            unsupported.add('hardlink')
+
+    if link_mode in ('reflink', 'auto'):
+        if 'reflink' not in unsupported:
+            try:
+                reflink_file(src_file, dst_file)
+                return None, 'reflink'
+            except OSError:
+                unsupported.add('reflink')
+        if 'kernel' not in unsupported:
+            try:
+                kernel_copy_file(src_file, dst_file)
+                return None, 'kernel'
+            except OSError:
+                unsupported.add('kernel')
+
+    return copy_with_digest(src_file, dst_file), 'copy'
+
+def scan_tree(src_root, prefix='', ignore=None, ignore_base=''):
+    # Walk src_root with scandir so every file is stat'ed exactly once. ignore (pruning.IgnoreRules)
+    # is matched against paths relative to the source root, which src_root sits at ignore_base in;
+    # ignored directories are never entered.
+    dirs = []
+    files = []
+    stack = [(src_root, prefix, ignore_base)]
+    while stack:
+        current, rel, ignore_rel = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                entry_rel = f'{rel}/{entry.name}' if rel else entry.name
+                entry_ignore_rel = f'{ignore_rel}/{entry.name}' if ignore_rel else entry.name
+                if entry.is_dir():
+                    if ignore is not None and ignore.matches(entry_ignore_rel, True):
+                        continue
+                    dirs.append(entry_rel)
+                    stack.append((entry.path, entry_rel, entry_ignore_rel))
+                elif entry.is_file():
+                    if ignore is not None and ignore.matches(entry_ignore_rel, False):
+                        continue
+                    files.append((entry_rel, entry.path, entry.stat()))
+    return dirs, files
+
+def collect_build_plan(sources, rules=None):
+    # sources is an ordered list of (src_root, dst_prefix); later sources win on clashes.
+    # rules maps dst_prefix to the IgnoreRules of that source.
+    plan_dirs = set()
+    plan_files = {}
+    for src_root, prefix in sources:
+        if prefix:
+            plan_dirs.add(prefix)
+        dirs, files = scan_tree(src_root, prefix, (rules or {}).get(prefix))
+        plan_dirs.update(dirs)
+        for rel, src_file, stat in files:
+            plan_files[rel] = (src_file, stat)
+    count('files_scanned', len(plan_files))
+    return plan_dirs, plan_files
+
+def load_build_manifest(build_path):
+    manifest_path = os.path.join(build_path, BUILD_MANIFEST)
+    try:
+        with open(manifest_path, 'r') as manifest_file:
+            manifest = json.load(manifest_file)
+        return set(manifest.get('dirs', [])), manifest.get('files', {})
+    except (OSError, ValueError):
+        return set(), {}
+
+def save_build_manifest(build_path, dirs, files):
+    manifest = {'version': 1, 'dirs': sorted(dirs), 'files': files}
+    with WriteTransaction() as transaction:
+        transaction.write(os.path.join(build_path, BUILD_MANIFEST), json.dumps(manifest, sort_keys=True))
+
+def build_target(build_path, rel):
+    return os.path.join(build_path, *rel.split('/'))
+
+def sync_build_tree(sources, build_path, incremental=False, jobs=1, link_mode='copy', plan=None, preserve=()):
+    if incremental:
+        previous_dirs, previous_files = load_build_manifest(build_path)
+    else:
+        # Full build: start from an empty build directory instead of failing on an existing one,
+        # keeping the top-level entries in preserve (outputs of other commands such as compiled templates)
+        with phase('sync.clean'):
+            if os.path.exists(build_path):
+                if preserve:
+                    with os.scandir(build_path) as entries:
+                        for entry in entries:
+                            if entry.name in preserve:
+                                continue
+                            if entry.is_dir(follow_symlinks=False):
+                                shutil.rmtree(entry.path)
+                            else:
+                                os.remove(entry.path)
+                else:
+                    shutil.rmtree(build_path)
+        previous_dirs, previous_files = set(), {}
+    os.makedirs(build_path, exist_ok=True)
+
+    progress(1, 3, 'Scanning sources')
+    with phase('sync.scan'):
+        plan_dirs, plan_files = plan or collect_build_plan(sources)
+
+    with phase('sync.mkdir'):
+        for rel in sorted(plan_dirs):
+            # Directories removed from build/ since the last build are recreated as well
+            if rel not in previous_dirs or not os.path.isdir(build_target(build_path, rel)):
+                os.makedirs(build_target(build_path, rel), exist_ok=True)
+
+    files = {}
+    pending = []
+    unchanged = 0
+    for rel, (src_file, stat) in plan_files.items():
+        entry = previous_files.get(rel)
+        # Same size and mtime as the last build and still in build/: trust the manifest, no read needed
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns and \
+           os.path.lexists(build_target(build_path, rel)):
+            files[rel] = entry
+            unchanged += 1
+        else:
+            pending.append((rel, src_file, stat, entry))
+
+    # Strategies that failed once (e.g. cross-device links) are not retried for every file
+    unsupported = set()
+
+    def copy_pending(item):
+        rel, src_file, stat, entry = item
+        dst_file = build_target(build_path, rel)
+        if entry and entry['sha256'] and entry['size'] == stat.st_size and os.path.exists(dst_file):
+            # Touched but possibly identical: hash before deciding to copy
+            digest = file_digest(src_file)
+            if digest == entry['sha256']:
+                return rel, dict(entry, mtime_ns=stat.st_mtime_ns), None
+        digest, method = place_file(src_file, dst_file, link_mode, unsupported)
+        return rel, {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}, method
+
+    # Directories already exist at this point, so copies can run in any order
+    progress(2, 3, f'Copying {len(pending)} of {len(plan_files)} files')
+    with phase('sync.copy'):
+        if jobs > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(copy_pending, pending))
+        else:
+            results = [copy_pending(item) for item in pending]
+
+    copied = bytes_copied = 0
+    methods = {}
+    for rel, entry, method in results:
+        files[rel] = entry
+        if method:
+            copied += 1
+            bytes_copied += entry['size']
+            methods[method] = methods.get(method, 0) + 1
+        else:
+            unchanged += 1
+
+    # Drop files and directories that no longer exist in the sources
+    progress(3, 3, 'Removing stale files and writing the manifest')
+    removed = 0
+    with phase('sync.cleanup'):
+        for rel in previous_files:
+            if rel not in files:
+                try:
+                    os.remove(build_target(build_path, rel))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        for rel in sorted(previous_dirs - plan_dirs, reverse=True):
+            try:
+                os.rmdir(build_target(build_path, rel))
+            except OSError:
+                pass
+
+    with phase('sync.manifest'):
+        save_build_manifest(build_path, plan_dirs, files)
+    count('files_copied', copied)
+    count('files_unchanged', unchanged)
+    count('files_removed', removed)
+    count('bytes_copied', bytes_copied)
+    return {'copied': copied, 'unchanged': unchanged, 'removed': removed, 'bytes': bytes_copied,
+            'methods': methods}
+
+def resolve_source(sources, rel, rules=None):
+    # (source path, its IgnoreRules, path relative to the source) currently providing build path rel
+    # (later sources win), or (None, None, None)
+    for src_root, prefix in reversed(sources):
+        if not prefix:
+            sub = rel
+        elif rel.startswith(prefix + '/'):
+            sub = rel[len(prefix) + 1:]
+        else:
+            continue
+        src_path = os.path.join(src_root, *sub.split('/'))
+        if not os.path.lexists(src_path):
+            continue
+        ignore = (rules or {}).get(prefix)
+        if ignore is not None and any(ignore.matches(part, True) for part in parent_paths(sub)):
+            continue
+        if ignore is not None and ignore.matches(sub, os.path.isdir(src_path)):
+            continue
+        return src_path, ignore, sub
+    return None, None, None
+
+def parent_paths(rel):
+    # 'a/b/c' -> 'a', 'a/b'
+    parts = rel.split('/')
+    return ['/'.join(parts[:end]) for end in range(1, len(parts))]
+
+def sync_build_paths(sources, build_path, rels, dirs, files, link_mode='copy', unsupported=None, rules=None):
+    # Bring only the given build paths up to date, updating the dirs/files manifest state in place
+    if unsupported is None:
+        unsupported = set()
+    copied = removed = bytes_copied = 0
+
+    def add_dir(rel):
+        while rel and rel not in dirs:
+            os.makedirs(build_target(build_path, rel), exist_ok=True)
+            dirs.add(rel)
+            rel = rel.rpartition('/')[0]
+
+    def place(rel, src_file, stat):
+        nonlocal copied, bytes_copied
+        entry = files.get(rel)
+        dst_file = build_target(build_path, rel)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns \
+                and os.path.exists(dst_file):
+            return
+        add_dir(rel.rpartition('/')[0])
+        digest, _ = place_file(src_file, dst_file, link_mode, unsupported)
+        files[rel] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+        copied += 1
+        bytes_copied += stat.st_size
+
+    def drop(rel):
+        nonlocal removed
+        under = rel + '/'
+        for file_rel in [file_rel for file_rel in files if file_rel == rel or file_rel.startswith(under)]:
+            try:
+                os.remove(build_target(build_path, file_rel))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            del files[file_rel]
+        for dir_rel in sorted((dir_rel for dir_rel in dirs if dir_rel == rel or dir_rel.startswith(under)), reverse=True):
+            try:
+                os.rmdir(build_target(build_path, dir_rel))
+            except OSError:
+                pass
+            dirs.discard(dir_rel)
+
+    for rel in sorted(rels):
+        src_path, ignore, sub = resolve_source(sources, rel, rules)
+        try:
+            if src_path and os.path.isdir(src_path):
+                add_dir(rel)
+                sub_dirs, sub_files = scan_tree(src_path, rel, ignore, sub)
+                for dir_rel in sub_dirs:
+                    add_dir(dir_rel)
+                for file_rel, src_file, stat in sub_files:
+                    place(file_rel, src_file, stat)
+                continue
+            if src_path and os.path.isfile(src_path):
+                if rel in dirs:
+                    drop(rel)
+                place(rel, src_path, os.stat(src_path))
+                continue
+        except FileNotFoundError:
+            # Deleted again while we were copying it
+            pass
+        drop(rel)
+    return {'copied': copied, 'removed': removed, 'bytes': bytes_copied}
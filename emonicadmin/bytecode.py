@@ -0,0 +1,103 @@
+import os
+import struct
+import marshal
+import py_compile
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+PYC_MODES = {
+    'checked-hash': py_compile.PycInvalidationMode.CHECKED_HASH,
+    'unchecked-hash': py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    'timestamp': py_compile.PycInvalidationMode.TIMESTAMP,
+}
+# PEP 552 flags word in the pyc header
+PYC_FLAGS = {'checked-hash': 0b11, 'unchecked-hash': 0b01, 'timestamp': 0}
+
+def pyc_path(source_path, level):
+    return importlib.util.cache_from_source(source_path, optimization=level if level else '')
+
+def pyc_is_current(source_path, cfile, mode):
+    try:
+        with open(cfile, 'rb') as pyc_file:
+            header = pyc_file.read(16)
+    except OSError:
+        return False
+    if len(header) < 16 or header[:4] != importlib.util.MAGIC_NUMBER:
+        return False
+    flags = struct.unpack('<I', header[4:8])[0]
+    if flags != PYC_FLAGS[mode]:
+        return False
+    if mode == 'timestamp':
+        stat = os.stat(source_path)
+        return header[8:16] == struct.pack('<II', int(stat.st_mtime) & 0xFFFFFFFF, stat.st_size & 0xFFFFFFFF)
+    with open(source_path, 'rb') as source_file:
+        return header[8:16] == importlib.util.source_hash(source_file.read())
+
+def compile_module(item):
+    # Runs in a worker process; returns (source, compiled levels, error)
+    source_path, levels, mode = item
+    compiled = []
+    try:
+        for level in levels:
+            cfile = pyc_path(source_path, level)
+            if pyc_is_current(source_path, cfile, mode):
+                continue
+            py_compile.compile(source_path, cfile, doraise=True, optimize=level, invalidation_mode=PYC_MODES[mode])
+            compiled.append(level)
+    except (py_compile.PyCompileError, OSError) as e:
+        return source_path, compiled, str(e)
+    return source_path, compiled, None
+
+def compile_build_tree(build_path, modules, levels=(0,), mode='checked-hash', jobs=1):
+    # modules: build-relative .py paths. Writes __pycache__/*.pyc next to each one, skipping pycs
+    # that already match their source, and removes pycs whose source is gone.
+    items = [(os.path.join(build_path, *rel.split('/')), tuple(levels), mode) for rel in sorted(modules)]
+    if jobs > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(compile_module, items, chunksize=max(1, len(items) // (jobs * 4))))
+    else:
+        results = [compile_module(item) for item in items]
+
+    errors = [(source_path, error) for source_path, _, error in results if error]
+    compiled = sum(len(levels_done) for _, levels_done, _ in results)
+
+    # Stale bytecode: a __pycache__ entry whose module is no longer shipped
+    live = {}
+    for rel in modules:
+        directory, _, name = rel.rpartition('/')
+        live.setdefault(directory, set()).add(name[:-3])
+    removed = 0
+    for directory, names in live.items():
+        cache_dir = os.path.join(build_path, *directory.split('/'), '__pycache__') if directory \
+            else os.path.join(build_path, '__pycache__')
+        try:
+            entries = os.listdir(cache_dir)
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.endswith('.pyc') and entry.partition('.')[0] not in names:
+                os.remove(os.path.join(cache_dir, entry))
+                removed += 1
+    return {'compiled': compiled, 'unchanged': len(items) * len(levels) - compiled - len(errors),
+            'removed': removed, 'errors': errors}
+
+def pycache_files(build_path, modules, levels):
+    # (rel, path, stat) of the bytecode compile_build_tree wrote for modules, for artifacts
+    files = []
+    for rel in sorted(modules):
+        source_path = os.path.join(build_path, *rel.split('/'))
+        for level in levels:
+            cfile = pyc_path(source_path, level)
+            try:
+                stat = os.stat(cfile)
+            except FileNotFoundError:
+                continue
+            files.append((os.path.relpath(cfile, build_path).replace(os.sep, '/'), cfile, stat))
+    return files
+
+def legacy_pyc(source, filename, level=0, mode='checked-hash'):
+    # Bytes of a `module.pyc` that zipimport loads from next to `module.py`
+    code = compile(source, filename, 'exec', dont_inherit=True, optimize=level)
+    # Archive entries carry a fixed mtime, so timestamp pycs become checked-hash ones
+    flags = PYC_FLAGS['checked-hash' if mode == 'timestamp' else mode]
+    return importlib.util.MAGIC_NUMBER + struct.pack('<I', flags) + importlib.util.source_hash(source) + marshal.dumps(code)
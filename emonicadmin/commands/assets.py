@@ -0,0 +1,270 @@
+import os
+import io
+import re
+import gzip
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from ..buildtree import scan_tree
+from ..config import fetch_gradle_project_name, fetch_static_dirs
+from ..output import progress, report
+from ..profiling import count, phase
+from ..transaction import WriteTransaction
+
+ASSET_OUTPUT_DIR = 'dist'
+ASSET_MANIFEST = 'manifest.json'
+ASSET_CACHE = '.assets-cache.json'
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.html', '.htm', '.svg', '.json', '.map', '.txt', '.xml',
+                           '.ico', '.webmanifest', '.wasm', '.ttf', '.otf', '.eot'}
+
+# Strings are matched first so that comment-like text inside them survives
+_css_comment = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*(?!!).*?\*/', re.S)
+# Space before a colon is dropped only in declarations (the colon is followed by ';' or '}' before
+# any '{'), since in a selector it is significant: `a :hover` is not `a:hover`
+_css_token = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|(\s*;[\s;]*(?=\}))|\s*([{};,>])\s*|(:)\s+'
+                        r'|(\s+(?=:[^{};]*[;}]))|(\s+)')
+
+def minify_css(text):
+    text = _css_comment.sub(lambda match: match.group(1) or '', text)
+
+    def replace(match):
+        quoted, last_semicolon, punctuation, colon, before_colon, space = match.groups()
+        if quoted:
+            return quoted
+        # Semicolons before a closing brace are optional
+        if last_semicolon:
+            return ''
+        if punctuation:
+            return punctuation
+        if colon:
+            return colon
+        if before_colon:
+            return ''
+        return ' '
+    return _css_token.sub(replace, text).strip()
+
+# Keywords after which a '/' starts a regex literal rather than a division
+JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                     'yield', 'await', 'instanceof'}
+
+def is_js_identifier(char):
+    return char.isalnum() or char in '_$\\' or ord(char) > 127
+
+def minify_js(text):
+    # Conservative: drops comments and indentation, collapses blank space, keeps line
+    # breaks so automatic semicolon insertion behaves exactly as before
+    out = []
+    i = 0
+    length = len(text)
+    pending_space = pending_newline = False
+    last = last_chunk = ''
+
+    def emit(chunk):
+        nonlocal pending_space, pending_newline, last, last_chunk
+        if out and (pending_newline or pending_space):
+            first = chunk[0]
+            if pending_newline:
+                out.append('\n')
+            elif (is_js_identifier(last) and is_js_identifier(first)) or (last in '+-/' and first == last) \
+                    or (last == '/' and first == '*') or (last.isdigit() and first == '.'):
+                out.append(' ')
+        pending_space = pending_newline = False
+        out.append(chunk)
+        last = chunk[-1]
+        last_chunk = chunk
+
+    while i < length:
+        char = text[i]
+        if char in ' \t\r\f\v':
+            pending_space = True
+            i += 1
+        elif char == '\n':
+            pending_newline = True
+            i += 1
+        elif text.startswith('//', i):
+            end = text.find('\n', i)
+            i = length if end == -1 else end
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            if text.startswith('/*!', i):
+                emit(text[i:end])
+            else:
+                pending_space = True
+            i = end
+        elif char in '"\'`' or (char == '/' and (not last or last in '(,=:[!&|?{};+-*%<>~^\n'
+                                                  or last_chunk in JS_REGEX_KEYWORDS)):
+            # String, template or regex literal: copy through to the matching delimiter
+            j = i + 1
+            in_class = False
+            while j < length:
+                if text[j] == '\\':
+                    j += 2
+                    continue
+                if char == '/' and text[j] == '[':
+                    in_class = True
+                elif char == '/' and text[j] == ']':
+                    in_class = False
+                elif text[j] == char and not in_class:
+                    break
+                elif text[j] == '\n' and char != '`':
+                    break
+                j += 1
+            j += 1
+            if char == '/':
+                while j < length and text[j].isalpha():
+                    j += 1
+            emit(text[i:j])
+            i = j
+        else:
+            j = i + 1
+            if is_js_identifier(char):
+                while j < length and is_js_identifier(text[j]):
+                    j += 1
+            emit(text[i:j])
+            i = j
+    return ''.join(out).strip()
+
+def gzip_bytes(data):
+    buffer = io.BytesIO()
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buffer, compresslevel=9, mtime=0) as compressor:
+        compressor.write(data)
+    return buffer.getvalue()
+
+def load_brotli():
+    for module_name in ('brotli', 'brotlicffi'):
+        try:
+            return __import__(module_name)
+        except ImportError:
+            continue
+    return None
+
+def fingerprint_name(rel, digest):
+    directory, name = os.path.split(rel)
+    stem, extension = os.path.splitext(name)
+    return os.path.join(directory, f'{stem}.{digest[:12]}{extension}').replace(os.sep, '/')
+
+def process_asset(src_file, rel, output_path, minify=True, brotli=None):
+    with open(src_file, 'rb') as src:
+        data = src.read()
+    size_in = len(data)
+
+    extension = os.path.splitext(rel)[1].lower()
+    is_minified = rel.endswith('.min.css') or rel.endswith('.min.js')
+    if minify and not is_minified and extension in ('.css', '.js'):
+        try:
+            text = data.decode('utf-8')
+            data = (minify_css(text) if extension == '.css' else minify_js(text)).encode('utf-8')
+        except UnicodeDecodeError:
+            pass
+
+    output_rel = fingerprint_name(rel, hashlib.sha256(data).hexdigest())
+    output_file = os.path.join(output_path, *output_rel.split('/'))
+    outputs = [output_rel]
+
+    # The fingerprinted file and its precompressed siblings (only where they actually save bytes)
+    # are published together
+    with WriteTransaction() as transaction:
+        transaction.write(output_file, data)
+        if extension in COMPRESSIBLE_EXTENSIONS:
+            compressed = [('.gz', gzip_bytes(data))]
+            if brotli is not None:
+                compressed.append(('.br', brotli.compress(data, quality=11)))
+            for suffix, payload in compressed:
+                if len(payload) < len(data):
+                    transaction.write(output_file + suffix, payload)
+                    outputs.append(output_rel + suffix)
+    return output_rel, outputs, size_in, len(data)
+
+def build_assets(gradle_project_name=None, base_dir=None, jobs=None, minify=True):
+    base_dir = base_dir or os.getcwd()
+    gradle_project_name = gradle_project_name or fetch_gradle_project_name(base_dir)
+    if not gradle_project_name:
+        return None
+
+    static_folder, _ = fetch_static_dirs(gradle_project_name, base_dir)
+    if not static_folder:
+        print(f'Error: STATIC_FOLDER not found in settings.py for {gradle_project_name}.')
+        return None
+    static_path = os.path.join(base_dir, gradle_project_name, static_folder)
+    if not os.path.isdir(static_path):
+        print(f'Error: {static_path} does not exist, run `emonic-admin manage engine` first.')
+        return None
+    output_path = os.path.join(static_path, ASSET_OUTPUT_DIR)
+    os.makedirs(output_path, exist_ok=True)
+
+    brotli = load_brotli()
+    options = {'minify': minify, 'brotli': brotli is not None, 'version': 1}
+    cache_path = os.path.join(output_path, ASSET_CACHE)
+    try:
+        with open(cache_path, 'r') as cache_file:
+            cache = json.load(cache_file)
+        # Outputs of every cached asset are cleaned up below, even when new options invalidate them
+        stale = cache['assets']
+        previous = stale if cache.get('options') == options else {}
+    except (OSError, ValueError, KeyError):
+        stale = previous = {}
+
+    progress(1, 3, f'Scanning {gradle_project_name}/{static_folder}')
+    _, files = scan_tree(static_path)
+    sources = {rel: (src_file, stat) for rel, src_file, stat in files
+               if not rel.startswith(ASSET_OUTPUT_DIR + '/')}
+
+    assets = {}
+    pending = []
+    for rel, (src_file, stat) in sources.items():
+        entry = previous.get(rel)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns and all(
+                os.path.isfile(os.path.join(output_path, *output.split('/'))) for output in entry['outputs']):
+            assets[rel] = entry
+        else:
+            pending.append((rel, src_file, stat))
+
+    def run(item):
+        rel, src_file, stat = item
+        output_rel, outputs, size_in, size_out = process_asset(src_file, rel, output_path, minify, brotli)
+        return rel, {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'output': output_rel,
+                     'outputs': outputs, 'size_out': size_out}, size_in
+
+    progress(2, 3, f'Processing {len(pending)} of {len(sources)} assets')
+    jobs = jobs or os.cpu_count() or 1
+    with phase('assets.process'):
+        if jobs > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(run, pending))
+        else:
+            results = [run(item) for item in pending]
+    count('assets_processed', len(results))
+
+    bytes_in = bytes_out = 0
+    for rel, entry, size_in in results:
+        assets[rel] = entry
+        bytes_in += size_in
+        bytes_out += entry['size_out']
+
+    # Remove outputs that no current asset produces any more
+    progress(3, 3, 'Writing the asset manifest')
+    live = {output for entry in assets.values() for output in entry['outputs']}
+    removed = 0
+    for entry in stale.values():
+        for output in entry.get('outputs', []):
+            if output not in live:
+                try:
+                    os.remove(os.path.join(output_path, *output.split('/')))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+
+    manifest = {rel: assets[rel]['output'] for rel in sorted(assets)}
+    with WriteTransaction() as transaction:
+        transaction.write(os.path.join(output_path, ASSET_MANIFEST), json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+        transaction.write(cache_path, json.dumps({'options': options, 'assets': assets}, sort_keys=True))
+
+    report(f'Asset pipeline for {gradle_project_name} completed: {len(results)} processed, '
+           f'{len(sources) - len(results)} unchanged, {removed} stale outputs removed '
+           f'({bytes_in / 1e3:.1f} kB -> {bytes_out / 1e3:.1f} kB).')
+    if brotli is None:
+        report('Brotli is not installed (pip install brotli), only .gz siblings were written.')
+    return {'processed': len(results), 'unchanged': len(sources) - len(results), 'removed': removed,
+            'bytes_in': bytes_in, 'bytes_out': bytes_out}
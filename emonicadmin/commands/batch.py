@@ -0,0 +1,132 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..config import load_config, merge_entries, write_config_file
+from ..output import report
+from ..registry import index_config, load_registry
+from .build import build_project
+from .createproject import create_project
+from .gradle import gradle_build
+from .manage import manage_engine
+from .migrate import create_migration
+
+def load_batch_manifest(manifest_path):
+    extension = os.path.splitext(manifest_path)[1].lower()
+    with open(manifest_path, 'rb') as manifest_file:
+        content = manifest_file.read()
+
+    if extension == '.json':
+        manifest = json.loads(content.decode('utf-8'))
+    elif extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError('PyYAML is required for YAML batch manifests (pip install pyyaml)')
+        manifest = yaml.safe_load(content)
+    elif extension == '.toml':
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ValueError('tomli is required for TOML batch manifests on Python < 3.11 (pip install tomli)')
+        manifest = tomllib.loads(content.decode('utf-8'))
+    else:
+        raise ValueError(f'unsupported manifest format "{extension}", use .json, .yaml, .yml or .toml')
+
+    projects = manifest.get('projects') if isinstance(manifest, dict) else None
+    if not isinstance(projects, list) or not projects:
+        raise ValueError('the manifest needs a non-empty "projects" list')
+    for project in projects:
+        if not isinstance(project, dict) or not project.get('name'):
+            raise ValueError('every entry in "projects" needs a "name"')
+        if not isinstance(project.get('build', []), list):
+            raise ValueError(f'"build" for {project["name"]} must be a list of project names')
+    return projects
+
+def run_batch_workspace(base_dir, projects):
+    # Projects sharing a directory share config.py, so they are scaffolded in order
+    os.makedirs(base_dir, exist_ok=True)
+    # The batch adds to a workspace's existing projects, replacing those with the same name
+    config_path = os.path.join(base_dir, 'config.py')
+    existing_app = existing_gradle = []
+    if os.path.exists(config_path):
+        config = load_config(config_path)
+        if config is None:
+            print(f'Error: {config_path} could not be read, skipping the workspace.')
+            return [], [], [os.path.basename(base_dir) or base_dir]
+        existing_app, existing_gradle = config.app, config.gradle or []
+        # Keeps the APP each existing GRADLE project was built on when the index is rewritten
+        load_registry(base_dir)
+    app_entries = []
+    gradle_entries = []
+    gradle_apps = {}
+    production_targets = []
+    failed = []
+    for project in projects:
+        name = project['name']
+        app_entry = create_project(name, base_dir, write_config=False)
+        if app_entry is None or not create_migration(name, base_dir):
+            failed.append(name)
+            continue
+        app_entries.append(app_entry)
+
+        for target in project.get('build', []):
+            gradle_entry = build_project(target, name, base_dir, write_config=False)
+            if gradle_entry is None:
+                failed.append(f'{name}:{target}')
+                continue
+            gradle_entries.append(gradle_entry)
+            gradle_apps[target] = name
+            if project.get('production'):
+                production_targets.append(target)
+            if project.get('engine', True) and not manage_engine(target, base_dir):
+                failed.append(f'{name}:{target}')
+
+    # config.py is written exactly once per workspace, after every project is in place
+    if app_entries:
+        write_config_file(base_dir, merge_entries(existing_app, app_entries, 'project'),
+                          merge_entries(existing_gradle, gradle_entries, 'gradle'))
+        index_config(base_dir, gradle_apps)
+        # Each target of a project flagged for production builds into build/<target>
+        for target in production_targets:
+            if gradle_build(base_dir=base_dir, project=target) is None:
+                failed.append(f'{gradle_apps[target]}:{target}:gradle')
+    return app_entries, gradle_entries, failed
+
+def run_batch(manifest_path, jobs=None):
+    try:
+        projects = load_batch_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        print(f'Error reading batch manifest "{manifest_path}": {e}')
+        return False
+
+    # Group projects by workspace directory; separate workspaces are independent
+    workspaces = {}
+    for project in projects:
+        base_dir = os.path.abspath(project.get('dir') or os.getcwd())
+        workspaces.setdefault(base_dir, []).append(project)
+
+    started = time.perf_counter()
+    jobs = jobs or min(len(workspaces), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        futures = {base_dir: executor.submit(run_batch_workspace, base_dir, workspace_projects)
+                   for base_dir, workspace_projects in workspaces.items()}
+
+    apps = builds = 0
+    failed = []
+    for base_dir, future in futures.items():
+        app_entries, gradle_entries, workspace_failed = future.result()
+        apps += len(app_entries)
+        builds += len(gradle_entries)
+        failed.extend(workspace_failed)
+
+    elapsed = time.perf_counter() - started
+    report(f'Batch completed: {apps} project(s) and {builds} build target(s) in '
+           f'{len(workspaces)} workspace(s) in {elapsed:.2f}s.')
+    if failed:
+        print(f'Error: batch steps failed for {", ".join(failed)}.')
+    return not failed
@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import statistics
+
+from ..config import fetch_gradle_project_name, invalidate_config, load_config, write_config_file
+from ..output import OUTPUT, report
+from .build import build_project
+from .createproject import create_project
+from .gradle import gradle_build
+from .manage import manage_engine
+from .migrate import create_migration
+
+BENCH_SHAPES = ['wide', 'deep']
+BENCH_APP = 'benchapp'
+BENCH_PROJECT = 'benchfront'
+# Files per directory for wide trees, files per leaf for deep (binary) trees
+WIDE_DIR_FILES = 1000
+DEEP_LEAF_FILES = 8
+
+def parse_scale(value):
+    # 1000, 10k, 1m
+    value = value.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    number = value[:-1] if multiplier > 1 else value
+    scale = int(float(number) * multiplier)
+    if scale < 1:
+        raise ValueError(f'invalid file count "{value}"')
+    return scale
+
+def synthetic_paths(files, shape):
+    if shape == 'wide':
+        for index in range(files):
+            yield f'wide{index // WIDE_DIR_FILES:04d}/module{index:07d}.py'
+        return
+    # Balanced binary tree just deep enough to hold every file in leaves of DEEP_LEAF_FILES
+    depth = 0
+    while DEEP_LEAF_FILES * 2 ** depth < files:
+        depth += 1
+    for index in range(files):
+        leaf = index // DEEP_LEAF_FILES
+        parts = [f'n{(leaf >> level) & 1}' for level in range(depth - 1, -1, -1)]
+        yield '/'.join(parts + [f'module{index:07d}.py'])
+
+def write_synthetic_tree(root, files, shape, file_size):
+    content = ('# synthetic module\n' + 'x = 1\n' * (file_size // 6 + 1))[:file_size]
+    made = set()
+    for rel in synthetic_paths(files, shape):
+        directory = os.path.join(root, os.path.dirname(rel))
+        if directory not in made:
+            os.makedirs(directory, exist_ok=True)
+            made.add(directory)
+        with open(os.path.join(root, rel), 'w') as synthetic_file:
+            synthetic_file.write(content)
+
+def add_gradle_entries(base_dir, count):
+    # Pad GRADLE with copies of the real entry; the first one stays the project being built
+    config = load_config(os.path.join(base_dir, 'config.py'))
+    gradle = list(config.gradle)
+    template = gradle[0]['gradle']
+    for index in range(count - len(gradle)):
+        name = f'{BENCH_PROJECT}{index:05d}'
+        gradle.append({'gradle': dict(template, project=name, path=os.path.join(base_dir, name))})
+    write_config_file(base_dir, config.app, gradle)
+
+def timed(step, timings, function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    if result is None or result is False:
+        raise RuntimeError(f'{step} failed')
+    timings.setdefault(step, []).append(elapsed)
+    return result
+
+def run_pipeline(base_dir, files, shape, gradle_entries, file_size, jobs, timings):
+    timed('createproject', timings, create_project, BENCH_APP, base_dir)
+    timed('setup --migrate', timings, create_migration, BENCH_APP, base_dir)
+    timed('build', timings, build_project, BENCH_PROJECT, base_dir=base_dir)
+    timed('manage engine', timings, manage_engine, BENCH_PROJECT, base_dir)
+
+    # Fixture set-up is not timed
+    write_synthetic_tree(os.path.join(base_dir, BENCH_PROJECT, 'synthetic'), files, shape, file_size)
+    if gradle_entries > 1:
+        add_gradle_entries(base_dir, gradle_entries)
+
+    config_path = os.path.join(base_dir, 'config.py')
+    invalidate_config(config_path)
+    timed('config fetch (cold)', timings, fetch_gradle_project_name, base_dir)
+    timed('config fetch (cached)', timings, fetch_gradle_project_name, base_dir)
+    timed('gradle --production', timings, gradle_build, False, jobs, base_dir=base_dir)
+    timed('gradle --incremental (no-op)', timings, gradle_build, True, jobs, base_dir=base_dir)
+
+def summarize(timings):
+    return {step: {'median_s': statistics.median(runs), 'min_s': min(runs), 'max_s': max(runs), 'runs': runs}
+            for step, runs in timings.items()}
+
+def run_bench(scales=None, shapes=None, gradle_entries=1, runs=3, jobs=1, file_size=1024, work_dir=None,
+              json_path=None, keep=False):
+    scales = scales or [1000]
+    shapes = shapes or ['wide']
+    root = tempfile.mkdtemp(prefix='emonic-bench-', dir=work_dir)
+    results = {
+        'version': 1,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': {'gradle_entries': gradle_entries, 'runs': runs, 'jobs': jobs, 'file_size': file_size},
+        'scenarios': [],
+    }
+
+    # Command output would swamp the timings and cost time of its own
+    saved_output = dict(OUTPUT)
+    OUTPUT.update(quiet=True, progress=False)
+    try:
+        for files in scales:
+            for shape in shapes:
+                timings = {}
+                for run in range(runs):
+                    base_dir = os.path.join(root, f'{shape}-{files}-{run}')
+                    os.makedirs(base_dir)
+                    run_pipeline(base_dir, files, shape, gradle_entries, file_size, jobs, timings)
+                    if not keep:
+                        shutil.rmtree(base_dir)
+                steps = summarize(timings)
+                gradle_median = steps['gradle --production']['median_s']
+                results['scenarios'].append({'files': files, 'shape': shape, 'steps': steps,
+                                             'gradle_files_per_s': files / max(gradle_median, 1e-9)})
+    except (RuntimeError, OSError) as e:
+        print(f'Error: benchmark aborted: {e}')
+        return None
+    finally:
+        OUTPUT.update(saved_output)
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    # With --json - stdout carries only the JSON document
+    if json_path == '-':
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return results
+
+    for scenario in results['scenarios']:
+        report(f'{scenario["files"]} files, {scenario["shape"]} tree '
+               f'({scenario["gradle_files_per_s"]:.0f} files/s through gradle --production):')
+        for step, stats in scenario['steps'].items():
+            report(f'  {step:<30} {stats["median_s"] * 1000:10.1f} ms median  {stats["min_s"] * 1000:10.1f} ms min')
+    if keep:
+        report(f'Benchmark workspaces kept in {root}.')
+    if json_path:
+        with open(json_path, 'w') as json_file:
+            json.dump(results, json_file, indent=2)
+            json_file.write('\n')
+        report(f'Results written to {json_path}.')
+    return results
@@ -0,0 +1,264 @@
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import platform
+import subprocess
+
+from ..output import report
+from ..serverconfig import tune_server
+from .gradle import ZIPAPP_NAME, gradle_targets
+
+# Where the app is looked for in the build directory, first match wins
+APP_CANDIDATES = [
+    ('root', 'wsgi.py', 'wsgi:application'),
+    ('root', 'views.py', 'views:app'),
+    ('', 'wsgi.py', 'wsgi:application'),
+    ('', 'views.py', 'views:app'),
+]
+BOOT_TIMEOUT = 15
+REQUEST_TIMEOUT = 10
+
+def find_app(build_path):
+    for directory, filename, spec in APP_CANDIDATES:
+        if os.path.isfile(os.path.join(build_path, directory, filename)):
+            return os.path.join(build_path, directory) if directory else build_path, spec
+    return None, None
+
+def load_gunicorn():
+    try:
+        import gunicorn
+    except ImportError:
+        return None
+    return gunicorn
+
+def free_port(host):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind((host, 0))
+        return probe.getsockname()[1]
+
+def server_command(server, spec, paths, host, port, tuning):
+    if server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', spec, '--bind', f'{host}:{port}', '--chdir', paths[0],
+                   '--workers', str(tuning['workers']), '--threads', str(tuning['threads']),
+                   '--worker-class', tuning['worker_class'], '--keep-alive', str(tuning['keepalive']),
+                   '--backlog', str(tuning['backlog']), '--timeout', str(tuning['timeout'])]
+        for path in paths[1:]:
+            command += ['--pythonpath', path]
+        return command + (['--preload'] if tuning['preload'] else [])
+    command = [sys.executable, '-m', 'emonicadmin.devserver', '--app', spec, '--host', host, '--port', str(port),
+               '--workers', str(tuning['workers']), '--threads', str(tuning['threads']),
+               '--backlog', str(tuning['backlog'])]
+    for path in paths:
+        command += ['--path', path]
+    return command + ([] if tuning['preload'] else ['--no-preload'])
+
+def wait_for_server(process, host, port, timeout=BOOT_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+def stop_server(process):
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+async def read_response(reader):
+    # (status, keep-alive) after consuming exactly one response
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed by the server')
+    version, status = status_line.split()[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip().lower()
+    keep_alive = version == b'HTTP/1.1' and headers.get('connection') != 'close'
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        # Body delimited by the end of the connection
+        await reader.read()
+        keep_alive = False
+    return int(status), keep_alive
+
+async def run_client(host, port, routes, offset, deadline, measure_from, results):
+    # One persistent connection, reopened whenever the server closes it; connect time counts
+    # towards the latency of the request that needed it
+    reader = writer = None
+    index = offset
+    while time.perf_counter() < deadline:
+        path = routes[index % len(routes)]
+        index += 1
+        request = f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUser-Agent: emonic-admin-bench-serve\r\n\r\n'
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), REQUEST_TIMEOUT)
+            writer.write(request.encode('latin-1'))
+            await writer.drain()
+            status, keep_alive = await asyncio.wait_for(read_response(reader), REQUEST_TIMEOUT)
+        except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            if started >= measure_from:
+                results['errors'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        elapsed = time.perf_counter() - started
+        if started >= measure_from:
+            results['latencies'].setdefault(path, []).append(elapsed)
+            results['status'][status] = results['status'].get(status, 0) + 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+async def generate_load(host, port, routes, connections, duration, warmup):
+    results = {'latencies': {}, 'status': {}, 'errors': 0}
+    now = time.perf_counter()
+    measure_from = now + warmup
+    deadline = measure_from + duration
+    await asyncio.gather(*(run_client(host, port, routes, offset, deadline, measure_from, results)
+                           for offset in range(connections)))
+    return results
+
+def percentile(ordered, fraction):
+    # Nearest-rank percentile of an already sorted list
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(fraction * len(ordered) + 0.5) - 1))]
+
+def latency_summary(latencies):
+    ordered = sorted(latencies)
+    summary = {'requests': len(ordered)}
+    for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99), ('max', 1.0)):
+        value = percentile(ordered, fraction)
+        summary[f'{name}_ms'] = value * 1000 if value is not None else None
+    summary['mean_ms'] = sum(ordered) / len(ordered) * 1000 if ordered else None
+    return summary
+
+def run_bench_serve(project=None, base_dir=None, profile='auto', server='auto', connections=64, duration=10.0,
+                    warmup=1.0, routes=None, app=None, host='127.0.0.1', port=None, json_path=None,
+                    min_rps=None, max_p99_ms=None):
+    base_dir = base_dir or os.getcwd()
+    routes = routes or ['/']
+    # Only the build directory matters here, the project names behind it do not
+    build_path = gradle_targets(base_dir, project)[2] if project else os.path.join(base_dir, 'build')
+    if build_path is None:
+        print(f'Error: "{project}" is not a GRADLE project in config.py.')
+        return None
+    if not os.path.isdir(build_path):
+        print('Error: build directory not found, run `emonic-admin gradle --production` first.')
+        return None
+
+    app_path, spec = find_app(build_path)
+    if app:
+        app_path, spec = build_path, app
+    if spec is None:
+        print(f'Error: no wsgi.py or views.py found in {build_path}/root or {build_path}.')
+        return None
+    # The gradle project (build/) stays importable from the root project (build/root, or build/root.pyz
+    # after `gradle --zipapp`) and the other way round
+    paths = list(dict.fromkeys([app_path, build_path, os.path.join(build_path, 'root')]))
+    if os.path.isfile(os.path.join(build_path, ZIPAPP_NAME)):
+        paths.append(os.path.join(build_path, ZIPAPP_NAME))
+
+    if server == 'auto':
+        server = 'gunicorn' if load_gunicorn() is not None else 'builtin'
+    elif server == 'gunicorn' and load_gunicorn() is None:
+        print('Error: gunicorn is required for --server gunicorn (pip install gunicorn).')
+        return None
+    tuning = tune_server(profile)
+    port = port or free_port(host)
+
+    # emonicadmin.devserver must be importable even when emonic-admin runs from a checkout
+    environment = dict(os.environ)
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    environment['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, environment.get('PYTHONPATH')]))
+    process = subprocess.Popen(server_command(server, spec, paths, host, port, tuning), cwd=app_path,
+                               env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        if not wait_for_server(process, host, port):
+            stop_server(process)
+            error = process.stderr.read().decode('utf-8', 'replace').strip().splitlines()
+            print(f'Error: {server} did not start {spec} from {app_path}'
+                  + (f': {error[-1]}' if error else '.'))
+            return None
+        results = asyncio.run(generate_load(host, port, routes, connections, duration, warmup))
+    finally:
+        stop_server(process)
+        process.stderr.close()
+
+    every = [latency for latencies in results['latencies'].values() for latency in latencies]
+    summary = latency_summary(every)
+    completed = summary['requests']
+    benchmark = {
+        'version': 1,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'app': spec,
+        'app_path': app_path,
+        'server': dict(tuning, kind=server, host=host, port=port),
+        'load': {'connections': connections, 'duration_s': duration, 'warmup_s': warmup, 'routes': routes},
+        'requests': completed,
+        'errors': results['errors'],
+        'status': {str(status): hits for status, hits in sorted(results['status'].items())},
+        'throughput_rps': completed / duration,
+        'latency': summary,
+        'routes': {path: latency_summary(latencies) for path, latencies in results['latencies'].items()},
+    }
+
+    if json_path == '-':
+        json.dump(benchmark, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        report(f'{spec} on {server} ({tuning["profile"]} profile: {tuning["workers"]} worker(s) x '
+               f'{tuning["threads"]} thread(s)), {connections} connection(s) for {duration:g}s:')
+        statuses = ', '.join(f'{status}: {hits}' for status, hits in benchmark['status'].items())
+        report(f'  {completed} requests ({statuses or "none"}), {results["errors"]} errors, '
+               f'{benchmark["throughput_rps"]:.1f} req/s')
+        if completed:
+            report(f'  latency p50 {summary["p50_ms"]:.2f} ms, p95 {summary["p95_ms"]:.2f} ms, '
+                   f'p99 {summary["p99_ms"]:.2f} ms, max {summary["max_ms"]:.2f} ms')
+        if json_path:
+            with open(json_path, 'w') as json_file:
+                json.dump(benchmark, json_file, indent=2)
+                json_file.write('\n')
+            report(f'Results written to {json_path}.')
+
+    # Release gates
+    failed = []
+    if not completed:
+        failed.append('no request completed')
+    if min_rps is not None and benchmark['throughput_rps'] < min_rps:
+        failed.append(f'throughput {benchmark["throughput_rps"]:.1f} req/s is below {min_rps:g}')
+    if max_p99_ms is not None and completed and summary['p99_ms'] > max_p99_ms:
+        failed.append(f'p99 latency {summary["p99_ms"]:.2f} ms is above {max_p99_ms:g} ms')
+    if failed:
+        print(f'Error: {"; ".join(failed)}.')
+        return None
+    return benchmark
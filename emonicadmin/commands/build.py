@@ -0,0 +1,147 @@
+import os
+import random
+
+from ..config import fetch_project_name, format_literal, load_config, merge_entries, write_config_file
+from ..output import progress, report
+from ..registry import load_registry, register_project
+from ..serverconfig import ASGI_SERVER_CONFIGS, render_server_configs, tune_server
+from ..settingsconfig import environment_settings
+from ..templating import render_template, stage_skeleton
+from ..transaction import WriteTransaction
+
+def build_project(project_name, gradle_project_name=None, base_dir=None, write_config=True, async_app=False,
+                  settings_options=None):
+    base_dir = base_dir or os.getcwd()
+    gradle_project_name = gradle_project_name or fetch_project_name(base_dir)
+    if not gradle_project_name:
+        print('Error: Project name not found in config.py.')
+        return None
+
+    config = None
+    if write_config:
+        config = load_config(os.path.join(base_dir, 'config.py'))
+        if config is None:
+            print(f'Error: config.py could not be read, "{project_name}" was not built.')
+            return None
+
+    project_path = os.path.join(base_dir, gradle_project_name)
+    root_project_path = os.path.join(base_dir, project_name)
+    steps = 5 if write_config else 4
+    migration_path = os.path.join(project_path, 'Gradle')
+    migration_file_path = os.path.join(migration_path, 'migration.py')
+
+    if os.path.exists(migration_file_path):
+        with open(migration_file_path, 'r') as migration_file:
+            migration_content = migration_file.read()
+            if 'BUILDER' in migration_content:
+                if f'"init": "main:{gradle_project_name}:gradle"' in migration_content and \
+                   '"migration": "gradle.migrate"' in migration_content:
+
+                    transaction = WriteTransaction()
+
+                    # Update INSTALLED_APPS in settings.py
+                    progress(1, steps, f'Registering {project_name} in {gradle_project_name}/settings.py')
+                    settings_path = os.path.join(project_path, 'settings.py')
+                    with open(settings_path, 'r') as settings_file:
+                        settings_content = settings_file.read()
+                    if f"'@{project_name}.gradle'" not in settings_content:
+                        new_settings_content = settings_content.replace(
+                            'INSTALLED_APPS = [',
+                            f"INSTALLED_APPS = [\n'@{project_name}.gradle',"
+                        )
+                        transaction.write(settings_path, new_settings_content)
+
+                    # Create a new folder outside {project_name}
+                    new_project_path = os.path.join(base_dir, project_name)
+                    os.makedirs(os.path.join(new_project_path, 'app'), exist_ok=True)
+
+                    transaction.touch(os.path.join(new_project_path, '__init__.py'))
+
+                    # Create views.py and the wsgi.py entry point the GRADLE scripts run
+                    progress(2, steps, f'Rendering {project_name}/views.py')
+                    views_content = render_template('build/views.py', project_name=project_name)
+                    transaction.write(os.path.join(new_project_path, 'views.py'), views_content)
+                    transaction.write(os.path.join(new_project_path, 'wsgi.py'),
+                                      render_template('build/wsgi.py', project_name=project_name))
+
+                    gradle_entry = {
+                        "gradle": {
+                            "project": project_name,
+                            "path": root_project_path,
+                            "dev": {
+                                "host": "localhost",
+                                "port": 8000,
+                                "debug": True,
+                                "key": random.randint(10000000000, 99999999999),
+                                "script": f"run {project_name}/wsgi.py",
+                                "console": "",
+                                "version": 1.1
+                            },
+                            "prod": {
+                                "host": "0.0.0.0",
+                                "port": 8000,
+                                "server": ['gunicorn', 'uWSGI'],
+                                "prod-key": None,
+                                "script": f"run {project_name}/wsgi.py",
+                                "build": f"gradle {project_name}",
+                                "version": 1.1
+                            }
+                        }
+                    }
+
+                    # Create settings.py, with dev/prod server, database and cache settings matching the entry
+                    progress(3, steps, f'Rendering {project_name}/settings.py')
+                    settings_content = render_template(
+                        'build/settings.py', project_name=project_name, root_project_path=root_project_path,
+                        gradle_project_name=gradle_project_name, project_path=project_path,
+                        environment_settings=environment_settings(project_name, root_project_path, gradle_entry,
+                                                                  **(settings_options or {})))
+                    transaction.write(os.path.join(new_project_path, 'settings.py'), settings_content)
+
+                    # asgi.py serving async_views.py, plus hypercorn/uvicorn launch configs for it
+                    if async_app:
+                        for name in ('asgi.py', 'async_views.py'):
+                            transaction.write(os.path.join(new_project_path, name),
+                                              render_template(f'build/{name}', project_name=project_name))
+                        prod = gradle_entry['gradle']['prod']
+                        launch_configs = render_server_configs(list(ASGI_SERVER_CONFIGS), tune_server(),
+                                                               prod['host'], prod['port'])
+                        for name, content in launch_configs.items():
+                            transaction.write(os.path.join(new_project_path, name), content)
+
+                    gradle_entry_content = format_literal(gradle_entry, 1)
+                    stage_skeleton('build', new_project_path, transaction, project_name=project_name,
+                                   root_project_path=root_project_path,
+                                   gradle_project_name=gradle_project_name, project_path=project_path)
+
+                    # Update config.py with GRADLE_PROJECT
+                    if write_config:
+                        progress(4, steps, 'Staging the GRADLE entry for config.py')
+                        report("Runnig builder...")
+                        load_registry(base_dir)
+                        # Newest first, so a plain `gradle` builds the project built last; a rebuild
+                        # replaces the project's entry instead of adding a second one
+                        write_config_file(base_dir, config.app,
+                                          merge_entries(config.gradle or [], [gradle_entry], 'gradle', first=True),
+                                          transaction)
+
+                    progress(steps, steps, f'Writing {len(transaction.files)} files')
+                    try:
+                        transaction.commit()
+                    except OSError as e:
+                        print(f'Error building project "{project_name}": {e}')
+                        return None
+                    if write_config:
+                        register_project(base_dir, 'gradle', project_name, gradle_entry, app=gradle_project_name)
+
+                    message = render_template('messages/build.txt', project_name=project_name,
+                                              gradle_entry=gradle_entry_content)
+                    report(message)
+                    return gradle_entry
+                else:
+                    print('Error: Invalid migration configuration in migration.py.')
+            else:
+                print('Error: BUILDER list is missing in migration.py.')
+    else:
+        print('Error: migration.py does not exist.')
+    return None
@@ -0,0 +1,79 @@
+import os
+import secrets
+
+from ..config import format_literal, load_config, merge_entries, write_config_file
+from ..output import progress, report
+from ..registry import load_registry, register_project
+from ..templating import render_template, stage_skeleton
+from ..transaction import WriteTransaction
+
+def create_project(project_name, base_dir=None, write_config=True):
+    base_dir = base_dir or os.getcwd()
+    project_path = os.path.join(base_dir, project_name)
+    steps = 4 if write_config else 3
+
+    try:
+        transaction = WriteTransaction()
+
+        # Create folders and files
+        transaction.touch(os.path.join(project_path, '__init__.py'))
+        transaction.touch(os.path.join(project_path, 'gradle.py'))
+
+        # Add content to settings.py
+        progress(1, steps, f'Rendering {project_name}/settings.py')
+        settings_content = render_template('project/settings.py', project_name=project_name)
+        transaction.write(os.path.join(project_path, 'settings.py'), settings_content)
+
+        # Add content to urls.py
+        progress(2, steps, f'Rendering {project_name}/urls.py')
+        urls_content = render_template('project/urls.py', project_name=project_name)
+        transaction.write(os.path.join(project_path, 'urls.py'), urls_content)
+
+        unique_key = secrets.token_hex(16)
+        unique_checksum = secrets.token_hex(32)
+
+        app_entry = {
+            "project": {
+                "project": project_name,
+                "path": project_path,
+                "gradle": {
+                    "version": 1.1,
+                    "path": f"{project_path}?gradle.key{unique_key}",
+                    "projectSecrets": ["myadmin", "root", "builder"],
+                    "checksum": unique_checksum
+                },
+                "projectKey": unique_key,
+                "projectAdmin": "emonic.root",
+                "alice": None
+            }
+        }
+
+        # Add the project to config.py, next to the workspace's other projects
+        config_path = os.path.join(base_dir, 'config.py')
+        if write_config:
+            progress(3, steps, 'Staging the APP entry for config.py')
+            if os.path.exists(config_path):
+                config = load_config(config_path)
+                if config is None:
+                    # Rewriting a config.py that could not be read would drop every project in it
+                    print(f'Error: config.py could not be read, "{project_name}" was not created.')
+                    return None
+                load_registry(base_dir)
+                write_config_file(base_dir, merge_entries(config.app, [app_entry], 'project'), config.gradle or [],
+                                  transaction)
+            else:
+                write_config_file(base_dir, [app_entry], [], transaction)
+        stage_skeleton('project', project_path, transaction, project_name=project_name, project_path=project_path)
+        progress(steps, steps, f'Writing {len(transaction.files)} files')
+        transaction.commit()
+        if write_config:
+            register_project(base_dir, 'app', project_name, app_entry)
+
+        message = render_template('messages/createproject.txt', project_name=project_name,
+                                  app=format_literal([app_entry]))
+
+        report(message)
+        return app_entry
+    except Exception as e:
+        print(f'Error creating project "{project_name}": {e}')
+        return None
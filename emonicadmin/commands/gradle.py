@@ -0,0 +1,255 @@
+import os
+import time
+
+from ..artifact import write_build_artifact, write_zipapp
+from ..buildtree import BUILD_MANIFEST, collect_build_plan, scan_tree, sync_build_tree
+from ..bytecode import compile_build_tree, pycache_files
+from ..config import fetch_gradle_project_name, fetch_project_name, fetch_static_dirs, load_config
+from ..deploy import deploy_build
+from ..output import report
+from ..profiling import phase
+from ..pruning import IgnoreRules, load_ignore_rules, prune_build_plan
+from ..registry import load_registry, project_build_path, registry_lookup
+from ..serverconfig import tune_server, write_server_configs
+from ..watch import watch_build_tree
+from .templates import COMPILED_TEMPLATES_CACHE, COMPILED_TEMPLATES_DIR, compile_templates
+
+def gradle_prod_block(base_dir, gradle_project_name):
+    config = load_config(os.path.join(base_dir, 'config.py'))
+    for gradle_project in config.gradle_projects if config else []:
+        if gradle_project.get('project') == gradle_project_name:
+            return gradle_project.get('prod') if isinstance(gradle_project.get('prod'), dict) else {}
+    return {}
+
+def gradle_prod_rules(base_dir, gradle_project_name):
+    # include/exclude pattern lists from the project's GRADLE prod block
+    prod = gradle_prod_block(base_dir, gradle_project_name)
+    include, exclude = prod.get('include', []), prod.get('exclude', [])
+    return ([include] if isinstance(include, str) else list(include),
+            [exclude] if isinstance(exclude, str) else list(exclude))
+
+def gradle_ignore_rules(base_dir, gradle_project_name, sources):
+    include, exclude = gradle_prod_rules(base_dir, gradle_project_name)
+    return {prefix: load_ignore_rules(src_root, exclude, include) for src_root, prefix in sources}, include
+
+ZIPAPP_NAME = 'root.pyz'
+
+def gradle_targets(base_dir, project=None):
+    # (gradle project, root project, build path). Without a selector this is the first GRADLE
+    # and APP entry building into build/; a selected project builds into build/<project> on
+    # top of the APP it was set up in.
+    if project is None:
+        return fetch_gradle_project_name(base_dir), fetch_project_name(base_dir), os.path.join(base_dir, 'build')
+    record = registry_lookup(base_dir, 'gradle', project)
+    if record is None:
+        return project, None, None
+    return project, record.get('app'), project_build_path(base_dir, project)
+
+def build_preserve(base_dir, project=None):
+    # Top-level build/ entries a clean build leaves alone: compiled templates, and in the
+    # shared build/ the per-project build/<project> directories
+    preserve = {COMPILED_TEMPLATES_DIR}
+    registry = load_registry(base_dir) if project is None else None
+    if registry:
+        preserve.update(registry['gradle'])
+    return preserve
+
+def extend_plan(plan, files):
+    # Add (rel, path, stat) files that live outside the sources, e.g. generated into build/
+    plan_dirs, plan_files = plan
+    plan_dirs = set(plan_dirs)
+    plan_files = dict(plan_files)
+    for rel, path, stat in files:
+        plan_files[rel] = (path, stat)
+        parent = rel.rpartition('/')[0]
+        while parent and parent not in plan_dirs:
+            plan_dirs.add(parent)
+            parent = parent.rpartition('/')[0]
+    return plan_dirs, plan_files
+
+def gradle_build(incremental=False, jobs=1, link_mode='copy', base_dir=None, artifact=None, tree=True,
+                 templates=False, prune_imports=False, compile_levels=None, pyc_mode='checked-hash', zipapp=False,
+                 project=None, server_profile=None, deploy=None, keep_releases=5):
+    base_dir = base_dir or os.getcwd()
+    gradle_project_name, root_project_name, build_path = gradle_targets(base_dir, project)
+    
+    if gradle_project_name and root_project_name:
+        project_path = os.path.join(base_dir, gradle_project_name)
+
+        if os.path.exists(project_path):
+            # The gradle project becomes build/, the root project build/root
+            sources = [(project_path, '')]
+            root_project_path = os.path.join(base_dir, root_project_name)
+            if os.path.exists(root_project_path):
+                sources.append((root_project_path, 'root'))
+
+            if templates:
+                with phase('gradle.templates'):
+                    if compile_templates(gradle_project_name, base_dir, build_path) is None:
+                        return None
+
+            # One scan feeds both the loose build tree and the artifact; ignored subtrees are never entered
+            rules, include = gradle_ignore_rules(base_dir, gradle_project_name, sources)
+            with phase('gradle.scan'):
+                plan = collect_build_plan(sources, rules)
+            stats = {}
+
+            if prune_imports:
+                static_folder, dirs_value = fetch_static_dirs(gradle_project_name, base_dir)
+                include_rules = IgnoreRules(include)
+                with phase('gradle.prune'):
+                    plan, pruned_modules, pruned_assets = prune_build_plan(
+                        plan, {gradle_project_name: '', root_project_name: 'root'},
+                        static_prefix=f'{static_folder}/' if static_folder else None,
+                        template_prefix=f'{dirs_value}/' if dirs_value else None,
+                        keep=lambda rel: include_rules.matches(rel[5:] if rel.startswith('root/') else rel, False))
+                report(f'Import graph pruning dropped {pruned_modules} unreachable modules and '
+                       f'{pruned_assets} unreferenced static files.')
+                stats['pruned'] = {'modules': pruned_modules, 'assets': pruned_assets}
+
+            if zipapp:
+                # build/root ships as one importable archive instead of a directory
+                plan_dirs, plan_files = plan
+                zipapp_files = [(rel, source) for rel, source in plan_files.items() if rel.startswith('root/')]
+                plan = ({rel for rel in plan_dirs if rel != 'root' and not rel.startswith('root/')},
+                        {rel: source for rel, source in plan_files.items() if not rel.startswith('root/')})
+
+            if tree:
+                started = time.perf_counter()
+                with phase('gradle.tree'):
+                    stats.update(sync_build_tree(sources, build_path, incremental, jobs, link_mode, plan,
+                                                 preserve=build_preserve(base_dir, project)))
+                elapsed = max(time.perf_counter() - started, 1e-9)
+
+                report(f'Gradle build completed and copied to the build directory '
+                      f'({stats["copied"]} copied, {stats["unchanged"]} unchanged, {stats["removed"]} removed).')
+                report(f'Copied {stats["bytes"] / 1e6:.1f} MB in {elapsed:.2f}s with {jobs} job(s): '
+                      f'{stats["copied"] / elapsed:.0f} files/s, {stats["bytes"] / 1e6 / elapsed:.1f} MB/s.')
+                if stats['methods']:
+                    used = ', '.join(f'{count} {method}' for method, count in sorted(stats['methods'].items()))
+                    report(f'File placement ({link_mode}): {used}.')
+
+            # Bytecode is written into build/, so it needs the loose tree (gradle --no-tree rejects --compile)
+            if compile_levels and tree:
+                modules = [rel for rel in plan[1] if rel.endswith('.py')]
+                started = time.perf_counter()
+                with phase('gradle.compile'):
+                    compile_stats = compile_build_tree(build_path, modules, compile_levels, pyc_mode, jobs)
+                for source_path, error in compile_stats['errors']:
+                    print(f'Error compiling {source_path}: {error}')
+                if compile_stats['errors']:
+                    return None
+                report(f'Bytecode ({pyc_mode}, optimize {",".join(map(str, compile_levels))}): '
+                       f'{compile_stats["compiled"]} compiled, {compile_stats["unchanged"]} unchanged, '
+                       f'{compile_stats["removed"]} stale removed in {time.perf_counter() - started:.2f}s.')
+                stats['bytecode'] = {key: value for key, value in compile_stats.items() if key != 'errors'}
+
+            zipapp_path = os.path.join(build_path, ZIPAPP_NAME)
+            if zipapp:
+                started = time.perf_counter()
+                try:
+                    with phase('gradle.zipapp'):
+                        zipapp_stats = write_zipapp(zipapp_files, zipapp_path,
+                                                    min(compile_levels) if compile_levels else None, pyc_mode)
+                except (OSError, ValueError) as e:
+                    print(f'Error writing {zipapp_path}: {e}')
+                    return None
+                report(f'Zipapp {zipapp_path} written: {zipapp_stats["files"]} files, '
+                       f'{zipapp_stats["size"] / 1e6:.1f} MB in {time.perf_counter() - started:.2f}s.')
+                stats['zipapp'] = dict(zipapp_stats, path=zipapp_path)
+            elif tree and os.path.exists(zipapp_path):
+                # Left over from an earlier --zipapp build; build/root is a directory again
+                os.remove(zipapp_path)
+
+            if server_profile:
+                # Served from the build directory, where views.py defines the app
+                prod = gradle_prod_block(base_dir, gradle_project_name)
+                tuning = tune_server(server_profile)
+                with phase('gradle.server'):
+                    server_configs = write_server_configs(
+                        build_path, tuning, prod.get('host', '0.0.0.0'), prod.get('port', 8000), prod.get('server'),
+                        'wsgi:application' if 'wsgi.py' in plan[1] else 'views:app', asgi='asgi.py' in plan[1])
+                memory = f'{tuning["memory_mb"]} MB' if tuning['memory_mb'] is not None else 'unknown memory'
+                report(f'Server config ({tuning["profile"]} profile, {tuning["cpus"]} CPU(s), '
+                       f'{memory}): {tuning["workers"]} {tuning["worker_class"]} worker(s) x '
+                       f'{tuning["threads"]} thread(s), written to '
+                       f'{", ".join(os.path.basename(path) for path in server_configs)}.')
+                stats['server'] = dict(tuning, files=server_configs)
+
+            if artifact:
+                artifact_path = os.path.join(base_dir, 'dist', f'{gradle_project_name}.{artifact}')
+                # Templates compiled by `manage compile-templates` already sit in build/, ship them too
+                compiled_path = os.path.join(build_path, COMPILED_TEMPLATES_DIR)
+                if os.path.isdir(compiled_path):
+                    _, compiled_files = scan_tree(compiled_path, COMPILED_TEMPLATES_DIR)
+                    plan = extend_plan(plan, [(rel, path, stat) for rel, path, stat in compiled_files
+                                              if not rel.endswith(COMPILED_TEMPLATES_CACHE)])
+                if compile_levels and tree:
+                    plan = extend_plan(plan, pycache_files(build_path, modules, compile_levels))
+                if zipapp:
+                    plan = extend_plan(plan, [(ZIPAPP_NAME, zipapp_path, os.stat(zipapp_path))])
+                if server_profile:
+                    plan = extend_plan(plan, [(os.path.basename(path), path, os.stat(path)) for path in server_configs])
+                started = time.perf_counter()
+                try:
+                    with phase('gradle.artifact'):
+                        artifact_stats = write_build_artifact(plan, artifact_path, artifact)
+                except (OSError, ValueError) as e:
+                    print(f'Error writing {artifact} artifact: {e}')
+                    return None
+                elapsed = max(time.perf_counter() - started, 1e-9)
+                report(f'Artifact {artifact_path} written: {artifact_stats["files"]} files, '
+                       f'{artifact_stats["bytes"] / 1e6:.1f} MB in, {artifact_stats["size"] / 1e6:.1f} MB out '
+                       f'in {elapsed:.2f}s.')
+                stats['artifact'] = dict(artifact_stats, path=artifact_path)
+
+            if deploy:
+                # Everything in the build directory ships except build bookkeeping and, from the
+                # shared build/, the build/<project> directories of selected builds
+                exclude = [f'/{BUILD_MANIFEST}', f'/{COMPILED_TEMPLATES_DIR}/{COMPILED_TEMPLATES_CACHE}']
+                exclude += [f'/{name}/' for name in build_preserve(base_dir, project) - {COMPILED_TEMPLATES_DIR}]
+                try:
+                    deploy_stats = deploy_build(build_path, deploy, keep_releases, jobs, exclude)
+                except (OSError, ValueError) as e:
+                    print(f'Error deploying to {deploy}: {e}')
+                    return None
+                report(f'Release {deploy_stats["release"]} is live at {deploy_stats["target"]}/current: '
+                       f'{deploy_stats["unchanged"]} unchanged, {deploy_stats["copied"]} copied '
+                       f'({deploy_stats["bytes_sent"] / 1e6:.1f} of {deploy_stats["bytes_total"] / 1e6:.1f} MB) '
+                       f'in {deploy_stats["seconds"]:.2f}s.')
+                if deploy_stats['pruned']:
+                    report(f'Removed {len(deploy_stats["pruned"])} old release(s).')
+                stats['deploy'] = deploy_stats
+            return stats
+        else:
+            print(f'Error: {gradle_project_name} does not exist.')
+    else:
+        print(f'Error: gradle_project_name or project_name not found in config.py.')
+    return None
+
+def gradle_watch(jobs=1, link_mode='copy', base_dir=None, debounce=0.02, polling=False, max_batches=None,
+                 project=None):
+    base_dir = base_dir or os.getcwd()
+    gradle_project_name, root_project_name, build_path = gradle_targets(base_dir, project)
+    if not (gradle_project_name and root_project_name):
+        print('Error: gradle_project_name or project_name not found in config.py.')
+        return None
+    project_path = os.path.join(base_dir, gradle_project_name)
+    if not os.path.exists(project_path):
+        print(f'Error: {gradle_project_name} does not exist.')
+        return None
+
+    sources = [(project_path, '')]
+    root_project_path = os.path.join(base_dir, root_project_name)
+    if os.path.exists(root_project_path):
+        sources.append((root_project_path, 'root'))
+    rules, _ = gradle_ignore_rules(base_dir, gradle_project_name, sources)
+
+    # Catch up with whatever changed while nobody was watching, then follow events
+    plan = collect_build_plan(sources, rules)
+    stats = sync_build_tree(sources, build_path, True, jobs, link_mode, plan,
+                            preserve=build_preserve(base_dir, project))
+    report(f'Build directory is up to date ({stats["copied"]} copied, {stats["unchanged"]} unchanged, '
+           f'{stats["removed"]} removed).')
+    return watch_build_tree(sources, build_path, link_mode, debounce, polling=polling, max_batches=max_batches,
+                            rules=rules)
@@ -0,0 +1,38 @@
+import os
+
+from ..config import fetch_gradle_project_name, fetch_static_dirs
+from ..output import report
+from ..transaction import WriteTransaction
+
+def manage_engine(gradle_project_name=None, base_dir=None):
+    base_dir = base_dir or os.getcwd()
+    gradle_project_name = gradle_project_name or fetch_gradle_project_name(base_dir)
+    if not gradle_project_name:
+        return False
+    project_path = os.path.join(base_dir, gradle_project_name)
+    
+    static_folder, dirs_value = fetch_static_dirs(gradle_project_name, base_dir)
+
+    if static_folder and dirs_value:
+        static_path = os.path.join(project_path, static_folder)
+        dirs_path = os.path.join(project_path, dirs_value)
+
+        if not os.path.exists(static_path):
+            os.makedirs(static_path)
+
+            # Create css/ and js/ folders inside static_path
+            os.makedirs(os.path.join(static_path, 'css'), exist_ok=True)
+            os.makedirs(os.path.join(static_path, 'js'), exist_ok=True)
+
+        if not os.path.exists(dirs_path):
+            os.makedirs(dirs_path)
+
+            # Create index.html file inside dirs_path
+            with WriteTransaction() as transaction:
+                transaction.write(os.path.join(dirs_path, 'index.html'), '')
+
+        report(f'Emonic template and static engine setup for {gradle_project_name} is completed.')
+        return True
+    else:
+        print(f'Error: Static folder and/or DIRS value not found in settings.py for {gradle_project_name}.')
+        return False
@@ -0,0 +1,46 @@
+import os
+
+from ..config import fetch_project_name
+from ..output import progress, report
+from ..templating import render_template
+from ..transaction import WriteTransaction
+
+def create_migration(project_name=None, base_dir=None):
+    base_dir = base_dir or os.getcwd()
+    project_name = project_name or fetch_project_name(base_dir)
+
+    if project_name:
+        project_path = os.path.join(base_dir, project_name)
+        migration_path = os.path.join(project_path, 'Gradle')
+
+        try:
+            transaction = WriteTransaction()
+
+            # Create files inside migration_path
+            transaction.touch(os.path.join(migration_path, '__init__.py'))
+
+            report(f'Migration of {project_name} in progress...')
+
+            # Add content to migration.py
+            progress(1, 3, f'Rendering {project_name}/Gradle/migration.py')
+            migration_content = render_template('migration/migration.py', project_name=project_name,
+                                                project_path=project_path)
+            transaction.write(os.path.join(migration_path, 'migration.py'), migration_content)
+
+            # Add content to build.py
+            progress(2, 3, f'Rendering {project_name}/Gradle/build.py')
+            build_content = render_template('migration/build.py', project_name=project_name, project_path=project_path)
+            transaction.write(os.path.join(migration_path, 'build.py'), build_content)
+            progress(3, 3, f'Writing {len(transaction.files)} files')
+            transaction.commit()
+
+            message = render_template('messages/migration.txt', project_name=project_name,
+                                      migration=migration_content)
+
+            report(message)
+            return True
+        except Exception as e:
+            print(f'Error creating migration for "{project_name}": {e}')
+    else:
+        print('Error: Project name not found in config.py.')
+    return False
@@ -0,0 +1,28 @@
+import os
+
+from ..config import entry_name, load_config, write_config_file
+from ..output import report
+from ..registry import load_registry, unregister_project
+
+def remove_project(project_name, base_dir=None):
+    # Drop the project's APP and/or GRADLE entry from config.py and the workspace index. The
+    # project's directories are left on disk.
+    base_dir = base_dir or os.getcwd()
+    config = load_config(os.path.join(base_dir, 'config.py'))
+    if config is None:
+        return None
+    app = [entry for entry in config.app if entry_name(entry, 'project') != project_name]
+    gradle = [entry for entry in config.gradle or [] if entry_name(entry, 'gradle') != project_name]
+    removed = [kind for kind, before, after in (('app', config.app, app), ('gradle', config.gradle or [], gradle))
+               if len(after) < len(before)]
+    if not removed:
+        print(f'Error: "{project_name}" is not in the APP or GRADLE list of config.py.')
+        return None
+
+    # The index must be in sync with config.py before the change so only the removals are appended
+    load_registry(base_dir)
+    write_config_file(base_dir, app, gradle)
+    for kind in removed:
+        unregister_project(base_dir, kind, project_name)
+    report(f'Removed "{project_name}" from config.py; {os.path.join(base_dir, project_name)} was left in place.')
+    return removed
@@ -0,0 +1,123 @@
+import os
+import json
+import py_compile
+import importlib.util
+
+from ..buildtree import scan_tree
+from ..config import fetch_gradle_project_name, fetch_static_dirs
+from ..output import progress, report
+from ..profiling import count, phase
+from ..transaction import WriteTransaction
+
+# Lives inside build/ and survives clean gradle builds, see gradle_build()
+COMPILED_TEMPLATES_DIR = 'compiled_templates'
+COMPILED_TEMPLATES_INDEX = 'index.json'
+COMPILED_TEMPLATES_CACHE = '.templates-cache.json'
+
+def load_jinja2():
+    try:
+        import jinja2
+    except ImportError:
+        return None
+    return jinja2
+
+def compile_templates(gradle_project_name=None, base_dir=None, build_path=None):
+    base_dir = base_dir or os.getcwd()
+    gradle_project_name = gradle_project_name or fetch_gradle_project_name(base_dir)
+    if not gradle_project_name:
+        return None
+
+    jinja2 = load_jinja2()
+    if jinja2 is None:
+        print('Error: Jinja2 is required to compile templates (pip install jinja2).')
+        return None
+
+    _, dirs_value = fetch_static_dirs(gradle_project_name, base_dir)
+    if not dirs_value:
+        print(f'Error: DIRS value not found in settings.py for {gradle_project_name}.')
+        return None
+    templates_path = os.path.join(base_dir, gradle_project_name, dirs_value)
+    if not os.path.isdir(templates_path):
+        print(f'Error: {templates_path} does not exist, run `emonic-admin manage engine` first.')
+        return None
+    output_path = os.path.join(build_path or os.path.join(base_dir, 'build'), COMPILED_TEMPLATES_DIR)
+    os.makedirs(output_path, exist_ok=True)
+
+    # Modules compiled by another Jinja2 release are not loadable, so the version is part of the cache key
+    options = {'jinja2': jinja2.__version__, 'version': 1}
+    cache_path = os.path.join(output_path, COMPILED_TEMPLATES_CACHE)
+    try:
+        with open(cache_path, 'r') as cache_file:
+            cache = json.load(cache_file)
+        previous = cache['templates'] if cache.get('options') == options else {}
+    except (OSError, ValueError, KeyError):
+        previous = {}
+
+    progress(1, 3, f'Scanning {gradle_project_name}/{dirs_value}')
+    _, files = scan_tree(templates_path)
+    templates = {}
+    pending = []
+    for rel, src_file, stat in files:
+        entry = previous.get(rel)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns \
+                and os.path.exists(os.path.join(output_path, entry['module'])):
+            templates[rel] = entry
+        else:
+            pending.append((rel, src_file, stat))
+
+    # Same module names and raw source as jinja2.Environment.compile_templates(), so
+    # jinja2.ModuleLoader('build/compiled_templates') loads them without parsing anything
+    progress(2, 3, f'Compiling {len(pending)} of {len(files)} templates')
+    environment = jinja2.Environment(loader=jinja2.FileSystemLoader(templates_path))
+    compiled = {}
+    errors = []
+    with phase('templates.compile'):
+        for rel, src_file, stat in pending:
+            module = jinja2.ModuleLoader.get_module_filename(rel)
+            try:
+                with open(src_file, 'r', encoding='utf-8') as template_file:
+                    source = template_file.read()
+                compiled[module] = environment.compile(source, rel, src_file, raw=True, defer_init=True)
+            except (UnicodeDecodeError, jinja2.TemplateSyntaxError) as e:
+                errors.append(f'{rel}: {e}')
+                continue
+            templates[rel] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'module': module}
+    count('templates_compiled', len(compiled))
+
+    # Nothing is written unless every template compiles
+    if errors:
+        for error in errors:
+            print(f'Error compiling template {error}')
+        return None
+    with WriteTransaction() as transaction:
+        for module, code in compiled.items():
+            transaction.write(os.path.join(output_path, module), code)
+
+    # Hash-checked bytecode stays valid however build/ is copied, linked or archived later
+    progress(3, 3, 'Writing bytecode and the template index')
+    for rel, _, _ in pending:
+        py_compile.compile(os.path.join(output_path, templates[rel]['module']), doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+
+    live = {entry['module'] for entry in templates.values()}
+    removed = 0
+    for entry in previous.values():
+        if entry['module'] not in live:
+            module_path = os.path.join(output_path, entry['module'])
+            for stale in [module_path, importlib.util.cache_from_source(module_path)]:
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+            removed += 1
+
+    index = {rel: templates[rel]['module'] for rel in sorted(templates)}
+    with WriteTransaction() as transaction:
+        transaction.write(os.path.join(output_path, COMPILED_TEMPLATES_INDEX), json.dumps(index, indent=2, sort_keys=True) + '\n')
+        transaction.write(cache_path, json.dumps({'options': options, 'templates': templates}, sort_keys=True))
+
+    report(f'Compiled templates for {gradle_project_name}: {len(pending)} compiled, '
+           f'{len(files) - len(pending)} unchanged, {removed} stale modules removed '
+           f'(build/{COMPILED_TEMPLATES_DIR}).')
+    return {'compiled': len(pending), 'unchanged': len(files) - len(pending), 'removed': removed,
+            'path': output_path}
@@ -0,0 +1,200 @@
+import os
+import ast
+import json
+from collections import namedtuple
+
+from .profiling import phase
+from .templating import render_template
+from .transaction import WriteTransaction
+
+class ProjectConfig(namedtuple('ProjectConfig', ['path', 'app', 'gradle'])):
+    # Parsed view of config.py: APP and GRADLE as plain Python lists
+
+    @property
+    def project_names(self):
+        return [entry['project']['project'] for entry in self.app
+                if isinstance(entry, dict) and isinstance(entry.get('project'), dict)
+                and 'project' in entry['project']]
+
+    @property
+    def gradle_projects(self):
+        return [entry['gradle'] for entry in self.gradle
+                if isinstance(entry, dict) and isinstance(entry.get('gradle'), dict)]
+
+# config.py path -> ((mtime_ns, size), ProjectConfig)
+_config_cache = {}
+
+# The only assignments read from and rewritten in config.py; anything else a user adds there
+# is neither evaluated nor touched (see splice_config)
+CONFIG_NAMES = ('APP', 'GRADLE')
+
+def parse_config(config_content):
+    values = {}
+    for node in ast.parse(config_content).body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name) \
+                and node.targets[0].id in CONFIG_NAMES:
+            values[node.targets[0].id] = ast.literal_eval(node.value)
+    return values
+
+def load_config(config_path=None):
+    config_path = config_path or os.path.join(os.getcwd(), 'config.py')
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        print('config.py does not exist.')
+        return None
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _config_cache.get(config_path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    try:
+        with phase('config.parse'), open(config_path, 'r') as config_file:
+            values = parse_config(config_file.read())
+    except (SyntaxError, ValueError) as e:
+        print(f'Error: config.py could not be parsed: {e}')
+        return None
+
+    config = ProjectConfig(config_path, values.get('APP', []), values.get('GRADLE'))
+    _config_cache[config_path] = (key, config)
+    return config
+
+def invalidate_config(config_path=None):
+    _config_cache.pop(config_path or os.path.join(os.getcwd(), 'config.py'), None)
+
+def format_literal(value, level=0):
+    # Render APP/GRADLE values as Python literals in the layout config.py has always used
+    pad = '    ' * level
+    if isinstance(value, dict):
+        if not value:
+            return '{}'
+        items = [f'{pad}    {format_literal(key)}: {format_literal(item, level + 1)}' for key, item in value.items()]
+        return '{\n' + ',\n'.join(items) + f'\n{pad}}}'
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return '[]'
+        if not any(isinstance(item, (dict, list, tuple)) for item in value):
+            return '[' + ', '.join(format_literal(item) for item in value) + ']'
+        items = [f'{pad}    {format_literal(item, level + 1)}' for item in value]
+        return '[\n' + ',\n'.join(items) + f'\n{pad}]'
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    return repr(value)
+
+def entry_name(entry, kind):
+    # Project name of an APP ('project') or GRADLE ('gradle') entry, None for anything else
+    section = entry.get(kind) if isinstance(entry, dict) else None
+    return section.get('project') if isinstance(section, dict) else None
+
+def merge_entries(entries, new_entries, kind, first=False):
+    # entries with new_entries added (at the end, or at the front with first=True), each
+    # replacing an existing entry of the same project
+    names = {entry_name(entry, kind) for entry in new_entries} - {None}
+    kept = [entry for entry in entries if entry_name(entry, kind) not in names]
+    return list(new_entries) + kept if first else kept + list(new_entries)
+
+def render_config(app, gradle):
+    return render_template('config.py', app=format_literal(app), gradle=format_literal(gradle))
+
+def assignment_spans(config_content):
+    # {name: (first line, last line)}, 1-based and inclusive, of the APP and GRADLE assignments
+    body = ast.parse(config_content).body
+    lines = config_content.splitlines()
+    spans = {}
+    for index, node in enumerate(body):
+        if not (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+                and node.targets[0].id in CONFIG_NAMES):
+            continue
+        last = getattr(node, 'end_lineno', None)
+        if last is None:
+            # Python 3.7 has no end_lineno: the statement runs up to the next one, minus the
+            # blank and comment lines in between
+            last = body[index + 1].lineno - 1 if index + 1 < len(body) else len(lines)
+            while last > node.lineno and (not lines[last - 1].strip() or lines[last - 1].lstrip().startswith('#')):
+                last -= 1
+        spans[node.targets[0].id] = (node.lineno, last)
+    return spans
+
+def splice_config(config_content, app, gradle):
+    # Replace only the APP and GRADLE assignments, keeping every other line byte for byte;
+    # a missing one is appended
+    values = {'APP': format_literal(app), 'GRADLE': format_literal(gradle)}
+    lines = config_content.splitlines(True)
+    spans = assignment_spans(config_content)
+    for name, (first, last) in sorted(spans.items(), key=lambda item: item[1][0], reverse=True):
+        lines[first - 1:last] = [f'{name} = {values[name]}\n']
+    for name in CONFIG_NAMES:
+        if name not in spans:
+            if lines and not lines[-1].endswith('\n'):
+                lines[-1] += '\n'
+            lines.append(f'\n{name} = {values[name]}\n')
+    return ''.join(lines)
+
+def write_config_file(base_dir, app, gradle, transaction=None):
+    # Callers load_config() first, so an existing config.py is known to parse
+    config_path = os.path.join(base_dir, 'config.py')
+    try:
+        if transaction is not None:
+            existing = transaction.read(config_path)
+        else:
+            with open(config_path, 'r') as config_file:
+                existing = config_file.read()
+    except FileNotFoundError:
+        existing = None
+    content = render_config(app, gradle) if existing is None else splice_config(existing, app, gradle)
+    if transaction is None:
+        with WriteTransaction() as config_transaction:
+            config_transaction.write(config_path, content)
+    else:
+        transaction.write(config_path, content)
+    invalidate_config(config_path)
+    return config_path
+
+def fetch_project_name(base_dir=None):
+    config = load_config(os.path.join(base_dir or os.getcwd(), 'config.py'))
+    if config is None:
+        return None
+
+    project_names = config.project_names
+    if project_names:
+        return project_names[0]
+    print('"project" key not found in APP list.')
+    return None
+
+def fetch_gradle_project_name(base_dir=None):
+    config = load_config(os.path.join(base_dir or os.getcwd(), 'config.py'))
+    if config is None:
+        return None
+
+    if config.gradle is None:
+        print('GRADLE list not found in config.py.')
+        return None
+
+    for gradle_project in config.gradle_projects:
+        if 'project' in gradle_project:
+            return gradle_project['project']
+    print('"project" key not found in GRADLE list.')
+    return None
+
+def fetch_static_dirs(project_name, base_dir=None):
+    project_path = os.path.join(base_dir or os.getcwd(), project_name)
+    settings_path = os.path.join(project_path, 'settings.py')
+    static_folder = None
+    dirs_value = None
+
+    if os.path.exists(settings_path):
+        with open(settings_path, 'r') as settings_file:
+            settings_content = settings_file.read()
+            static_start = settings_content.find('STATIC_FOLDER = ') + len('STATIC_FOLDER = ')
+            static_end = settings_content.find('\n', static_start)
+            static_folder = settings_content[static_start:static_end].strip('"')
+
+            dirs_start = settings_content.find("'DIRS': [") + len("'DIRS': [")
+            dirs_end = settings_content.find(']', dirs_start)
+            dirs_value = settings_content[dirs_start:dirs_end]
+
+            # Remove enclosing quotes from dirs_value if present
+            dirs_value = dirs_value.strip(" '\"")
+
+    return static_folder, dirs_value
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from .buildtree import copy_with_digest, file_digest, scan_tree
+from .profiling import count, phase
+from .pruning import IgnoreRules
+
+RELEASES_DIR = 'releases'
+CURRENT_LINK = 'current'
+# Written into every release: per-file size, mtime of the build file it came from and sha256
+DEPLOY_MANIFEST = '.deploy-manifest.json'
+
+def parse_deploy_target(target):
+    # A local directory, optionally spelled local:PATH; remote targets (ssh://host/path, host:path)
+    # are rejected rather than mistaken for relative paths
+    if target.startswith('local:'):
+        return os.path.abspath(target[len('local:'):])
+    head = target.split('/', 1)[0]
+    if target.startswith('ssh://') or (':' in head and len(head.split(':', 1)[0]) > 1):
+        raise ValueError(f'"{target}" is a remote target; only local directories (PATH or local:PATH) are '
+                         f'supported, mount the host or deploy to a local stand-in and sync that')
+    return os.path.abspath(target)
+
+def load_release_manifest(release_path):
+    try:
+        with open(os.path.join(release_path, DEPLOY_MANIFEST), 'r') as manifest_file:
+            return json.load(manifest_file)['files']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def new_release_id(releases_path):
+    # UTC with microseconds, so names sort in deploy order even for several deploys a second
+    now = time.time_ns()
+    release_id = time.strftime('%Y%m%dT%H%M%S', time.gmtime(now // 10**9)) + f'.{now // 1000 % 10**6:06d}Z'
+    suffix = 1
+    candidate = release_id
+    while os.path.exists(os.path.join(releases_path, candidate)):
+        suffix += 1
+        candidate = f'{release_id}-{suffix:02d}'
+    return candidate
+
+def link_unchanged(old_path, old, sha256, dst_file):
+    # Unchanged files are hardlinked from the live release, like rsync --link-dest
+    if not old_path or old['sha256'] != sha256:
+        return False
+    try:
+        os.link(old_path, dst_file)
+    except OSError:
+        return False
+    return True
+
+def deploy_file(item, previous_path, previous_files, release_path):
+    # One file of the new release: hardlink when unchanged, else a streamed full copy.
+    # Returns (rel, manifest entry, method, bytes sent).
+    rel, src_file, src_stat, sha256 = item
+    dst_file = os.path.join(release_path, *rel.split('/'))
+    old = previous_files.get(rel)
+    old_path = os.path.join(previous_path, *rel.split('/')) if previous_path and old else None
+    entry = {'size': src_stat.st_size, 'mtime_ns': src_stat.st_mtime_ns, 'sha256': sha256}
+
+    # Touched by the build since the last deploy: hash it to see whether it actually changed
+    if sha256 is None and old_path and old['size'] == src_stat.st_size:
+        sha256 = entry['sha256'] = file_digest(src_file)
+    if sha256 and link_unchanged(old_path, old, sha256, dst_file):
+        return rel, entry, 'unchanged', 0
+
+    entry['sha256'] = copy_with_digest(src_file, dst_file)
+    return rel, entry, 'copied', src_stat.st_size
+
+def prune_releases(releases_path, keep, protected):
+    releases = sorted(name for name in os.listdir(releases_path) if os.path.isdir(os.path.join(releases_path, name)))
+    removed = []
+    for name in releases[:max(len(releases) - keep, 0)]:
+        if name not in protected:
+            shutil.rmtree(os.path.join(releases_path, name))
+            removed.append(name)
+    return removed
+
+def deploy_build(build_path, target, keep_releases=5, jobs=1, exclude=()):
+    # Stage build_path as target/releases/<id>, copying only what differs from target/current,
+    # then point target/current at it with one atomic rename
+    target_path = parse_deploy_target(target)
+    releases_path = os.path.join(target_path, RELEASES_DIR)
+    current_path = os.path.join(target_path, CURRENT_LINK)
+    if os.path.exists(current_path) and not os.path.islink(current_path):
+        raise OSError(f'{current_path} exists and is not a symlink')
+    os.makedirs(releases_path, exist_ok=True)
+
+    previous_path = os.path.realpath(current_path) if os.path.islink(current_path) else None
+    previous_files = load_release_manifest(previous_path) if previous_path else {}
+
+    with phase('deploy.scan'):
+        dirs, files = scan_tree(build_path, ignore=IgnoreRules(exclude))
+    # The sha256 recorded for a build file that has not been touched since is reused without reading it
+    items = []
+    for rel, src_file, src_stat in files:
+        old = previous_files.get(rel)
+        known = old and old['size'] == src_stat.st_size and old.get('mtime_ns') == src_stat.st_mtime_ns
+        items.append((rel, src_file, src_stat, old['sha256'] if known else None))
+
+    release_id = new_release_id(releases_path)
+    release_path = os.path.join(releases_path, release_id)
+    started = time.perf_counter()
+    try:
+        os.makedirs(release_path)
+        for rel in sorted(dirs):
+            os.makedirs(os.path.join(release_path, *rel.split('/')), exist_ok=True)
+        with phase('deploy.transfer'):
+            if jobs > 1 and len(items) > 1:
+                with ThreadPoolExecutor(max_workers=jobs) as executor:
+                    results = list(executor.map(
+                        lambda item: deploy_file(item, previous_path, previous_files, release_path), items))
+            else:
+                results = [deploy_file(item, previous_path, previous_files, release_path) for item in items]
+
+        manifest = {'version': 1, 'release': release_id, 'files': {rel: entry for rel, entry, _, _ in results}}
+        with open(os.path.join(release_path, DEPLOY_MANIFEST), 'w') as manifest_file:
+            json.dump(manifest, manifest_file, sort_keys=True)
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+
+        # Atomic swap: a new symlink renamed over the old one, so readers see one release or the other
+        with phase('deploy.swap'):
+            link_path = os.path.join(target_path, f'.{CURRENT_LINK}.{release_id}')
+            os.symlink(os.path.join(RELEASES_DIR, release_id), link_path)
+            os.replace(link_path, current_path)
+            directory_fd = os.open(target_path, os.O_RDONLY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+    except BaseException:
+        # The current release stays live; only the half-written one goes
+        shutil.rmtree(release_path, ignore_errors=True)
+        raise
+
+    protected = {release_id, os.path.basename(previous_path)} if previous_path else {release_id}
+    removed = prune_releases(releases_path, keep_releases, protected)
+
+    methods = {'unchanged': 0, 'copied': 0}
+    sent = total = 0
+    for _, entry, method, sent_bytes in results:
+        methods[method] += 1
+        sent += sent_bytes
+        total += entry['size']
+    count('deploy_bytes_sent', sent)
+    count('deploy_bytes_total', total)
+    return {'release': release_id, 'path': release_path, 'target': target_path, 'files': len(results),
+            'unchanged': methods['unchanged'], 'copied': methods['copied'],
+            'bytes_sent': sent, 'bytes_total': total, 'pruned': removed,
+            'seconds': time.perf_counter() - started}
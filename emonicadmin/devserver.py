@@ -0,0 +1,98 @@
+import os
+import sys
+import signal
+import argparse
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+# Stand-in for gunicorn when it is not installed: pre-forked worker processes sharing one
+# listening socket, each serving requests on a fixed pool of threads. Used by `bench-serve`:
+#   python -m emonicadmin.devserver --app views:app --path build --workers 3 --threads 4
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+class PooledWSGIServer(WSGIServer):
+    executor = None
+    threads = 1
+
+    def process_request(self, request, client_address):
+        # Created after fork, so every worker has its own threads
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.threads)
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+def load_app(spec, paths):
+    for path in reversed(paths):
+        sys.path.insert(0, path)
+    module_name, _, attribute = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attribute or 'application')
+
+def serve(spec, paths, host='127.0.0.1', port=0, workers=1, threads=1, backlog=2048, preload=True):
+    PooledWSGIServer.request_queue_size = backlog
+    server = PooledWSGIServer((host, port), QuietHandler)
+    server.threads = threads
+    if preload:
+        server.set_app(load_app(spec, paths))
+    # Tells whoever started the server which port --port 0 ended up on
+    print(f'listening on {host}:{server.server_address[1]}', flush=True)
+
+    children = []
+    for _ in range(workers if hasattr(os, 'fork') else 0):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            if not preload:
+                server.set_app(load_app(spec, paths))
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children.append(pid)
+    if not children:
+        if not preload:
+            server.set_app(load_app(spec, paths))
+        server.serve_forever()
+        return
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            os.waitpid(pid, 0)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    # A worker that dies takes the server down rather than quietly shrinking the pool
+    os.wait()
+    stop(None, None)
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-forking WSGI server for benchmarking built Emonic apps.')
+    parser.add_argument('--app', required=True, help='MODULE:ATTRIBUTE of the WSGI application')
+    parser.add_argument('--path', action='append', default=[], help='Directory to import the app from (repeatable)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--backlog', type=int, default=2048)
+    parser.add_argument('--no-preload', action='store_true')
+    args = parser.parse_args()
+    serve(args.app, args.path, args.host, args.port, args.workers, args.threads, args.backlog, not args.no_preload)
+
+if __name__ == '__main__':
+    main()
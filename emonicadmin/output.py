@@ -0,0 +1,10 @@
+# Console output settings, set once from the command line in main()
+OUTPUT = {'quiet': False, 'progress': True}
+
+def report(message):
+    if not OUTPUT['quiet']:
+        print(message)
+
+def progress(step, total, message):
+    if OUTPUT['progress'] and not OUTPUT['quiet']:
+        print(f'[{step}/{total}] {message}')
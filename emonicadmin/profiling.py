@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Filled in by start_profile(); phase() and count() are no-ops until then
+PROFILE = {'enabled': False, 'command': None, 'started': None, 'start_io': None, 'start_overhead': None,
+           'phases': [], 'counters': {}, 'cprofile': None}
+_lock = threading.Lock()
+_local = threading.local()
+# Read syscalls and bytes spent by the profiler itself reading /proc/self/io, in every thread
+_overhead = {'syscalls': 0, 'bytes': 0}
+
+def read_proc_io():
+    # Linux only: read/write syscall counts and the bytes passed through read()/write() (rchar and
+    # wchar, page cache hits included), for the whole process rather than the calling thread
+    try:
+        with open('/proc/self/io', 'r') as io_file:
+            content = io_file.read()
+        values = {key: int(value) for key, value in (line.split(':') for line in content.splitlines())}
+    except (OSError, ValueError):
+        return None
+    with _lock:
+        # One read for the data, one for EOF
+        _overhead['syscalls'] += 2
+        _overhead['bytes'] += len(content)
+    return values
+
+def io_delta(before, after, overhead=None):
+    # overhead: the profiler's own reads of /proc/self/io between the two samples, subtracted
+    if before is None or after is None:
+        return {}
+    # The counters are sampled before the read returning them is accounted, so the read that took
+    # `before` is part of the difference and the one that took `after` is not
+    syscalls, read_bytes = overhead or (0, 0)
+    return {'read_syscalls': after['syscr'] - before['syscr'] - syscalls,
+            'write_syscalls': after['syscw'] - before['syscw'],
+            'read_bytes': after['rchar'] - before['rchar'] - read_bytes, 'write_bytes': after['wchar'] - before['wchar']}
+
+def profiler_overhead():
+    with _lock:
+        return _overhead['syscalls'], _overhead['bytes']
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def start_profile(command, cprofile=False):
+    start_overhead = profiler_overhead()
+    PROFILE.update(enabled=True, command=command, started=time.perf_counter(), start_io=read_proc_io(),
+                   start_overhead=start_overhead, phases=[], counters={}, cprofile=None)
+    if cprofile:
+        import cProfile
+        PROFILE['cprofile'] = cProfile.Profile()
+        PROFILE['cprofile'].enable()
+
+@contextmanager
+def phase(name):
+    if not PROFILE['enabled']:
+        yield
+        return
+    depth = getattr(_local, 'depth', 0)
+    _local.depth = depth + 1
+    overhead_before = profiler_overhead()
+    io_before = read_proc_io()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _local.depth = depth
+        entry = {'name': name, 'depth': depth, 'start_s': started - PROFILE['started'], 'wall_s': elapsed}
+        if threading.current_thread() is not threading.main_thread():
+            entry['thread'] = threading.current_thread().name
+        # Nested phases (and phases in other threads) read /proc/self/io meanwhile; their reads are not this phase's work
+        overhead_after = profiler_overhead()
+        entry.update(io_delta(io_before, read_proc_io(), (overhead_after[0] - overhead_before[0],
+                                                          overhead_after[1] - overhead_before[1])))
+        with _lock:
+            PROFILE['phases'].append(entry)
+
+def count(name, value=1):
+    if PROFILE['enabled']:
+        with _lock:
+            PROFILE['counters'][name] = PROFILE['counters'].get(name, 0) + value
+
+def profile_summary():
+    summary = {'command': PROFILE['command'], 'wall_s': time.perf_counter() - PROFILE['started'],
+               'phases': sorted(PROFILE['phases'], key=lambda entry: entry['start_s']),
+               'counters': dict(sorted(PROFILE['counters'].items())), 'peak_rss_kb': peak_rss_kb()}
+    overhead = profiler_overhead()
+    summary.update(io_delta(PROFILE['start_io'], read_proc_io(), (overhead[0] - PROFILE['start_overhead'][0],
+                                                                   overhead[1] - PROFILE['start_overhead'][1])))
+    # Syscall and byte counts cover every thread of the process, not just the phase's own
+    summary['io_scope'] = 'process'
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        summary.update(user_cpu_s=usage.ru_utime, system_cpu_s=usage.ru_stime,
+                       voluntary_context_switches=usage.ru_nvcsw, involuntary_context_switches=usage.ru_nivcsw)
+    return summary
+
+def print_profile(summary):
+    # Asked for explicitly, so printed even with --quiet
+    print(f'Profile of `{summary["command"]}`: {summary["wall_s"] * 1000:.1f} ms wall'
+          + (f', peak RSS {summary["peak_rss_kb"] / 1024:.1f} MB' if summary['peak_rss_kb'] else ''))
+    for entry in summary['phases']:
+        syscalls = ''
+        if 'read_syscalls' in entry:
+            syscalls = f'  {entry["read_syscalls"]} read / {entry["write_syscalls"]} write syscalls (process-wide)'
+        print(f'  {"  " * entry["depth"]}{entry["name"]:<{32 - 2 * entry["depth"]}} '
+              f'{entry["wall_s"] * 1000:9.1f} ms{syscalls}')
+    for name, value in summary['counters'].items():
+        print(f'  {name:<32} {value}')
+
+def finish_profile(print_summary=False, timings_json=None, cprofile_path=None):
+    if PROFILE['cprofile'] is not None:
+        PROFILE['cprofile'].disable()
+    summary = profile_summary()
+    if print_summary:
+        print_profile(summary)
+    try:
+        if timings_json:
+            directory = os.path.dirname(os.path.abspath(timings_json))
+            os.makedirs(directory, exist_ok=True)
+            with open(timings_json, 'w') as timings_file:
+                json.dump(summary, timings_file, indent=2)
+                timings_file.write('\n')
+        if cprofile_path and PROFILE['cprofile'] is not None:
+            PROFILE['cprofile'].dump_stats(cprofile_path)
+    except OSError as e:
+        print(f'Error writing profile output: {e}')
+    PROFILE['enabled'] = False
+    return summary
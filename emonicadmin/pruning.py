@@ -0,0 +1,269 @@
+import os
+import re
+import ast
+import json
+
+GRADLEIGNORE = '.gradleignore'
+
+# Never needed at runtime: bytecode caches, VCS metadata, tool caches and editor leftovers
+DEFAULT_EXCLUDES = [
+    '__pycache__/', '*.py[cod]', '.git/', '.hg/', '.svn/', '.tox/', '.nox/', '.venv/', '.pytest_cache/',
+    '.mypy_cache/', '.ruff_cache/', '.idea/', '.vscode/', '.DS_Store', 'Thumbs.db', '*~', '*.swp', '*.swo',
+    '.#*', '\\#*#', GRADLEIGNORE,
+]
+
+def translate_pattern(pattern):
+    # .gitignore glob to regex: * and ? stay within one path segment, ** crosses them
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            # Escaped character, e.g. \# or \! at the start of a pattern
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                parts.append('[' + ('^' + body[1:] if body.startswith('!') else body) + ']')
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return re.compile(''.join(parts) + r'\Z')
+
+class IgnoreRules:
+    # Ordered .gitignore-style rules for one source tree; the last matching rule wins
+    def __init__(self, patterns=()):
+        self.rules = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+            negate = pattern.startswith('!')
+            pattern = pattern[1:] if negate else pattern
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            # A slash anywhere but the end anchors the pattern to the source root
+            anchored = '/' in pattern
+            self.rules.append((translate_pattern(pattern.lstrip('/')), negate, dir_only, anchored))
+
+    def matches(self, rel, is_dir):
+        name = rel.rpartition('/')[2]
+        result = False
+        for regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel if anchored else name):
+                result = not negate
+        return result
+
+def load_ignore_rules(src_root, exclude=(), include=()):
+    # Defaults, then the tree's .gradleignore, then the GRADLE prod block; include re-adds matches
+    patterns = list(DEFAULT_EXCLUDES)
+    try:
+        with open(os.path.join(src_root, GRADLEIGNORE), 'r') as ignore_file:
+            patterns.extend(ignore_file.read().splitlines())
+    except FileNotFoundError:
+        pass
+    patterns.extend(exclude)
+    patterns.extend('!' + pattern for pattern in include)
+    return IgnoreRules(patterns)
+
+# The BUILDER list of Gradle/migration.py names more modules the framework imports:
+# "init": "main:{project}:{module}" and "migration": "{module}.{function}"
+MIGRATION_ENTRY_POINT = 'Gradle/migration.py'
+# Loaded by the server or the framework by name rather than imported
+ENTRY_POINTS = ['views.py', 'settings.py', 'urls.py', 'wsgi.py', 'asgi.py', MIGRATION_ENTRY_POINT]
+TEXT_ASSET_EXTENSIONS = {'.css', '.js', '.mjs', '.html', '.htm', '.svg', '.json', '.webmanifest'}
+_path_token = re.compile(r'[\w@~+.-]+(?:/[\w@~+.-]+)*')
+
+def module_file(plan_files, parts):
+    rel = '/'.join(parts)
+    for candidate in (rel + '.py', rel + '/__init__.py'):
+        if candidate in plan_files:
+            return candidate
+    return None
+
+def imported_modules(tree, package):
+    # Dotted names (as part lists) an AST may import, including `from pkg import submodule`
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name.split('.')
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[:len(package) - node.level + 1] if node.level - 1 <= len(package) else None
+                if base is None:
+                    continue
+            else:
+                base = []
+            module = base + (node.module.split('.') if node.module else [])
+            if module:
+                yield module
+            for alias in node.names:
+                if alias.name != '*':
+                    yield module + [alias.name]
+
+def string_value(node):
+    # Python 3.7 parses string literals to ast.Str (.s), later versions to ast.Constant (.value)
+    value = node.value if isinstance(node, ast.Constant) else getattr(node, 's', None)
+    return value if isinstance(value, str) else None
+
+def builder_modules(tree, package):
+    # Dotted names (as part lists) the BUILDER entries of a migration.py load; "migration" is
+    # relative to the project the file belongs to, "init" names the project itself
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Dict):
+            for key, value in zip(node.keys, node.values):
+                key, value = string_value(key), string_value(value)
+                if key == 'init' and value and value.count(':') == 2:
+                    yield value.split(':')[1:]
+                elif key == 'migration' and value:
+                    yield package + value.split('.')
+
+def reachable_modules(plan_files, aliases):
+    # Walk the import graph from ENTRY_POINTS and the modules named by their BUILDER lists;
+    # returns kept .py files and their string literals
+    queue = [rel for prefix in sorted({''} | set(aliases.values()))
+             for rel in [f'{prefix}/{name}' if prefix else name for name in ENTRY_POINTS] if rel in plan_files]
+    reachable = set(queue)
+    strings = []
+    while queue:
+        rel = queue.pop()
+        try:
+            with open(plan_files[rel][0], 'rb') as source_file:
+                tree = ast.parse(source_file.read(), rel)
+        except (SyntaxError, ValueError, OSError):
+            continue
+        strings.extend(value for value in map(string_value, ast.walk(tree)) if value is not None)
+        package = rel[:-3].split('/')[:-1]
+        modules = list(imported_modules(tree, package))
+        if rel == MIGRATION_ENTRY_POINT or rel.endswith('/' + MIGRATION_ENTRY_POINT):
+            project = rel[:-len(MIGRATION_ENTRY_POINT)].rstrip('/')
+            modules.extend(builder_modules(tree, project.split('/') if project else []))
+        for module in modules:
+            if module[0] in aliases:
+                module = [part for part in aliases[module[0]].split('/') if part] + module[1:]
+                if not module:
+                    continue
+            # Importing a.b.c runs a/__init__.py and a/b/__init__.py too
+            for end in range(1, len(module) + 1):
+                found = module_file(plan_files, module[:end])
+                if found and found not in reachable:
+                    reachable.add(found)
+                    queue.append(found)
+
+    # Entry points are loaded by path, but the packages around every kept module still need their __init__.py
+    for parent in parent_dirs(list(reachable)) | {''}:
+        init = f'{parent}/__init__.py' if parent else '__init__.py'
+        if init in plan_files:
+            reachable.add(init)
+    return reachable, strings
+
+def referenced_assets(plan_files, static_prefix, texts):
+    # Static files named (by path below the static folder or by file name) anywhere in texts;
+    # referenced CSS/JS/HTML is scanned in turn so url() and import chains are followed
+    static = {rel for rel in plan_files if rel.startswith(static_prefix)}
+    tokens = set()
+    names = set()
+
+    def add_text(text):
+        for token in _path_token.findall(text):
+            token = token.lstrip('./')
+            tokens.add(token)
+            names.add(token.rpartition('/')[2])
+
+    for text in texts:
+        add_text(text)
+
+    # Fingerprinted copies from `manage assets` follow their originals
+    fingerprinted = {}
+    manifest_rel = f'{static_prefix}dist/manifest.json'
+    if manifest_rel in plan_files:
+        try:
+            with open(plan_files[manifest_rel][0], 'r') as manifest_file:
+                fingerprinted = json.load(manifest_file)
+        except (OSError, ValueError):
+            fingerprinted = {}
+
+    kept = {manifest_rel} & static
+    changed = True
+    while changed:
+        changed = False
+        for rel in static - kept:
+            sub = rel[len(static_prefix):]
+            if sub not in tokens and rel.rpartition('/')[2] not in names:
+                continue
+            kept.add(rel)
+            changed = True
+            if os.path.splitext(rel)[1].lower() in TEXT_ASSET_EXTENSIONS:
+                try:
+                    with open(plan_files[rel][0], 'r', encoding='utf-8', errors='replace') as asset_file:
+                        add_text(asset_file.read())
+                except OSError:
+                    pass
+            output = fingerprinted.get(sub)
+            if output:
+                for suffix in ('', '.gz', '.br'):
+                    names.add(output.rpartition('/')[2] + suffix)
+    return kept
+
+def parent_dirs(files):
+    dirs = set()
+    for rel in files:
+        parent = rel.rpartition('/')[0]
+        while parent and parent not in dirs:
+            dirs.add(parent)
+            parent = parent.rpartition('/')[0]
+    return dirs
+
+def prune_build_plan(plan, aliases, static_prefix=None, template_prefix=None, keep=None):
+    # Drop Python modules the entry points never import and static files nothing references.
+    # Everything else (templates, data files, config) is kept; keep(rel) forces a file in.
+    plan_dirs, plan_files = plan
+    reachable, strings = reachable_modules(plan_files, aliases)
+    texts = list(strings)
+    if template_prefix:
+        for rel, (src_file, _) in plan_files.items():
+            if rel.startswith(template_prefix):
+                try:
+                    with open(src_file, 'r', encoding='utf-8', errors='replace') as template_file:
+                        texts.append(template_file.read())
+                except OSError:
+                    pass
+    assets = referenced_assets(plan_files, static_prefix, texts) if static_prefix else set()
+
+    files = {}
+    pruned_modules = pruned_assets = 0
+    for rel, source in plan_files.items():
+        if keep is not None and keep(rel):
+            files[rel] = source
+        elif rel.endswith('.py') and rel not in reachable:
+            pruned_modules += 1
+        elif static_prefix and rel.startswith(static_prefix) and rel not in assets:
+            pruned_assets += 1
+        else:
+            files[rel] = source
+
+    # Drop directories that only held pruned files; ones that were empty to begin with stay
+    shipped = parent_dirs(files)
+    populated = parent_dirs(plan_files)
+    dirs = {rel for rel in plan_dirs if rel in shipped or rel not in populated}
+    return (dirs, files), pruned_modules, pruned_assets
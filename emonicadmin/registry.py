@@ -0,0 +1,182 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import load_config
+from .transaction import WriteTransaction
+
+# Append-only journal next to config.py: one JSON record per line, replayed into
+# {'app': {name: record}, 'gradle': {name: record}} for O(1) lookups by project name
+WORKSPACE_INDEX = '.emonic-workspace.jsonl'
+REGISTRY_KINDS = ('app', 'gradle')
+
+# index path -> ((mtime_ns, size), registry)
+_registry_cache = {}
+_registry_lock = threading.Lock()
+
+def file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def replay(lines):
+    registry = {'app': {}, 'gradle': {}, 'config': None, 'records': 0}
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # A torn last line from an interrupted append; everything before it is intact
+            continue
+        registry['records'] += 1
+        op = record.get('op')
+        if op == 'config':
+            registry['config'] = record.get('stamp')
+        elif op == 'add' and record.get('kind') in REGISTRY_KINDS:
+            registry[record['kind']][record['name']] = record
+        elif op == 'remove' and record.get('kind') in REGISTRY_KINDS:
+            registry[record['kind']].pop(record['name'], None)
+    return registry
+
+def index_records(config, gradle_apps=None, previous=None):
+    # Records describing config.py; a GRADLE entry remembers the APP it was built on when known
+    apps = config.project_names
+    records = [{'op': 'add', 'kind': 'app', 'name': entry['project']['project'], 'entry': entry}
+               for entry in config.app if isinstance(entry, dict) and isinstance(entry.get('project'), dict)
+               and 'project' in entry['project']]
+    for entry in config.gradle or []:
+        gradle_project = entry.get('gradle') if isinstance(entry, dict) else None
+        if not isinstance(gradle_project, dict) or 'project' not in gradle_project:
+            continue
+        name = gradle_project['project']
+        app = (gradle_apps or {}).get(name) or ((previous or {}).get(name) or {}).get('app')
+        if app not in apps:
+            app = apps[0] if apps else None
+        records.append({'op': 'add', 'kind': 'gradle', 'name': name, 'app': app, 'entry': entry})
+    return records
+
+def index_config(base_dir, gradle_apps=None):
+    # (Re)write the whole index from config.py, compacting the journal
+    config_path = os.path.join(base_dir, 'config.py')
+    index_path = os.path.join(base_dir, WORKSPACE_INDEX)
+    config = load_config(config_path)
+    if config is None:
+        return None
+    with _registry_lock:
+        cached = _registry_cache.get(index_path)
+        previous = cached[1]['gradle'] if cached else None
+        records = index_records(config, gradle_apps, previous)
+        records.append({'op': 'config', 'stamp': file_stamp(config_path)})
+        lines = [json.dumps(record, sort_keys=True) for record in records]
+        with WriteTransaction() as transaction:
+            transaction.write(index_path, '\n'.join(lines) + '\n')
+        registry = replay(lines)
+        _registry_cache[index_path] = (file_stamp(index_path), registry)
+    return registry
+
+def read_registry(base_dir):
+    # The journal as last written, without checking it against config.py
+    index_path = os.path.join(base_dir, WORKSPACE_INDEX)
+    stamp = file_stamp(index_path)
+    if stamp is None:
+        return None
+    cached = _registry_cache.get(index_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with open(index_path, 'r') as index_file:
+        registry = replay(index_file)
+    _registry_cache[index_path] = (stamp, registry)
+    return registry
+
+def load_registry(base_dir=None):
+    base_dir = base_dir or os.getcwd()
+    config_stamp = file_stamp(os.path.join(base_dir, 'config.py'))
+    if config_stamp is None:
+        print('config.py does not exist.')
+        return None
+    registry = read_registry(base_dir)
+    # config.py edited by hand (or written by batch) since the last record: rebuild from it
+    if registry is None or registry['config'] != config_stamp:
+        registry = index_config(base_dir)
+    return registry
+
+def registry_update(base_dir, records):
+    # Append records plus the new config.py stamp instead of rewriting the index; the file is
+    # only compacted once it is mostly superseded records. Callers load_registry() before
+    # changing config.py, so the journal was in sync up to their own change.
+    index_path = os.path.join(base_dir, WORKSPACE_INDEX)
+    registry = read_registry(base_dir)
+    if registry is None:
+        return index_config(base_dir)
+    records = list(records) + [{'op': 'config', 'stamp': file_stamp(os.path.join(base_dir, 'config.py'))}]
+    lines = [json.dumps(record, sort_keys=True) for record in records]
+    with _registry_lock:
+        with open(index_path, 'a+') as index_file:
+            # Start on a fresh line after a torn record, so it cannot swallow the first new one
+            index_file.seek(0, os.SEEK_END)
+            torn = index_file.tell() > 0 and not ends_with_newline(index_path)
+            index_file.write(('\n' if torn else '') + '\n'.join(lines) + '\n')
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        for line in lines:
+            registry_apply(registry, json.loads(line))
+        _registry_cache[index_path] = (file_stamp(index_path), registry)
+    live = len(registry['app']) + len(registry['gradle'])
+    if registry['records'] > 4 * live + 64:
+        index_config(base_dir)
+    return registry
+
+def ends_with_newline(path):
+    with open(path, 'rb') as index_file:
+        index_file.seek(-1, os.SEEK_END)
+        return index_file.read(1) == b'\n'
+
+def registry_apply(registry, record):
+    registry['records'] += 1
+    if record['op'] == 'config':
+        registry['config'] = record['stamp']
+    elif record['op'] == 'add':
+        registry[record['kind']][record['name']] = record
+    elif record['op'] == 'remove':
+        registry[record['kind']].pop(record['name'], None)
+
+def register_project(base_dir, kind, name, entry, **fields):
+    return registry_update(base_dir, [dict(fields, op='add', kind=kind, name=name, entry=entry)])
+
+def unregister_project(base_dir, kind, name):
+    return registry_update(base_dir, [{'op': 'remove', 'kind': kind, 'name': name}])
+
+def registry_lookup(base_dir, kind, name):
+    registry = load_registry(base_dir)
+    return registry[kind].get(name) if registry else None
+
+def project_build_path(base_dir, project):
+    # Selected projects build side by side instead of sharing build/
+    return os.path.join(base_dir, 'build', project)
+
+def select_projects(base_dir=None, names=None, all_projects=False):
+    # GRADLE project names picked by --project/--all, in config.py order
+    registry = load_registry(base_dir)
+    if registry is None:
+        return None
+    if all_projects:
+        if not registry['gradle']:
+            print('Error: no GRADLE projects found in config.py.')
+            return None
+        return list(registry['gradle'])
+    missing = [name for name in names if name not in registry['gradle']]
+    if missing:
+        print(f'Error: unknown project(s) {", ".join(missing)}; '
+              f'config.py has {", ".join(registry["gradle"]) or "none"}.')
+        return None
+    return list(dict.fromkeys(names))
+
+def run_projects(names, function):
+    # One thread per selected project; the commands keep their own -j workers inside each
+    if len(names) == 1:
+        return {names[0]: function(names[0])}
+    with ThreadPoolExecutor(max_workers=min(len(names), os.cpu_count() or 1)) as executor:
+        futures = {name: executor.submit(function, name) for name in names}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,127 @@
+import os
+
+from .templating import render_template
+from .transaction import WriteTransaction
+
+SERVER_PROFILES = ['auto', 'cpu', 'io', 'low-memory']
+# Generated next to views.py in the build directory
+SERVER_CONFIGS = {'gunicorn': 'gunicorn.conf.py', 'uwsgi': 'uwsgi.ini'}
+# Launch configs for asgi.py, written when the project was built with --async
+ASGI_SERVER_CONFIGS = {'hypercorn': 'hypercorn.toml', 'uvicorn': 'uvicorn.env'}
+
+# Resident memory budgeted per worker process (a preloaded Emonic app plus request buffers)
+WORKER_MEMORY_MB = 96
+# Memory left to the OS, page cache and the master process
+RESERVED_MEMORY_MB = 256
+DEFAULT_BACKLOG = 2048
+
+def host_cpus():
+    # CPUs this process may run on, which is less than cpu_count() under taskset or cpusets
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # cgroup v2 CPU quota, e.g. "200000 100000" for two CPUs in a container
+    try:
+        with open('/sys/fs/cgroup/cpu.max', 'r') as quota_file:
+            quota, period = quota_file.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+def host_memory_mb():
+    try:
+        memory = os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+    # A cgroup v2 memory limit caps what the workers can actually use
+    try:
+        with open('/sys/fs/cgroup/memory.max', 'r') as limit_file:
+            limit = limit_file.read().strip()
+        if limit != 'max':
+            memory = min(memory, int(limit))
+    except (OSError, ValueError):
+        pass
+    return memory // (1024 * 1024)
+
+def listen_backlog():
+    # A backlog above net.core.somaxconn is silently truncated by the kernel
+    try:
+        with open('/proc/sys/net/core/somaxconn', 'r') as somaxconn_file:
+            return min(DEFAULT_BACKLOG, int(somaxconn_file.read()))
+    except (OSError, ValueError):
+        return DEFAULT_BACKLOG
+
+def tune_server(profile='auto', cpus=None, memory_mb=None):
+    cpus = cpus or host_cpus()
+    memory_mb = memory_mb if memory_mb is not None else host_memory_mb()
+    # How many workers fit in memory; unknown memory does not limit anything
+    memory_workers = max(1, (memory_mb - RESERVED_MEMORY_MB) // WORKER_MEMORY_MB) if memory_mb else None
+
+    if profile == 'auto':
+        # Web views mostly wait on the database and the network, so threads pay off unless
+        # memory cannot hold one process per core
+        profile = 'low-memory' if memory_workers is not None and memory_workers < cpus + 1 else 'io'
+
+    if profile == 'cpu':
+        # Gunicorn's 2 x cores + 1 sync workers: one request per process, no GIL contention
+        workers, threads, worker_class = 2 * cpus + 1, 1, 'sync'
+    elif profile == 'io':
+        workers, threads, worker_class = cpus + 1, 4, 'gthread'
+    else:
+        # Few processes, more threads each: concurrency without a process per request
+        workers, threads, worker_class = min(cpus, 2), 8, 'gthread'
+    # One event loop per core serves async views; more processes only add memory
+    asgi_workers = cpus
+    if memory_workers is not None:
+        workers = min(workers, memory_workers)
+        asgi_workers = min(asgi_workers, memory_workers)
+
+    return {
+        'profile': profile,
+        'cpus': cpus,
+        'memory_mb': memory_mb,
+        'workers': max(workers, 1),
+        'threads': threads,
+        'worker_class': worker_class,
+        'asgi_workers': asgi_workers,
+        # Longer than a load balancer's idle probe interval, short enough not to pin threads
+        'keepalive': 5,
+        'backlog': listen_backlog(),
+        # Import the app once in the master and fork: copy-on-write memory and no per-worker start-up
+        'preload': True,
+        'timeout': 30,
+        'graceful_timeout': 30,
+        # Recycle workers now and then so slow leaks cannot grow without bound
+        'max_requests': 1000,
+        'max_requests_jitter': 100,
+    }
+
+def server_names(servers):
+    # Servers named in the GRADLE prod block ("gunicorn", "uWSGI"), both when none is named
+    if isinstance(servers, str):
+        servers = [servers]
+    names = [name.lower() for name in servers or [] if isinstance(name, str) and name.lower() in SERVER_CONFIGS]
+    return list(dict.fromkeys(names)) or list(SERVER_CONFIGS)
+
+def render_server_configs(names, tuning, host='0.0.0.0', port=8000, wsgi_app='views:app', asgi_app='asgi:application'):
+    # {file name: content} for the named servers
+    context = dict(tuning, host=host, port=port, wsgi_app=wsgi_app, asgi_app=asgi_app,
+                   memory_mb=tuning['memory_mb'] if tuning['memory_mb'] is not None else 'unknown',
+                   lazy_apps='false' if tuning['preload'] else 'true',
+                   enable_threads='true' if tuning['threads'] > 1 else 'false')
+    filenames = dict(SERVER_CONFIGS, **ASGI_SERVER_CONFIGS)
+    return {filenames[name]: render_template(f'server/{filenames[name]}', **context) for name in names}
+
+def write_server_configs(build_path, tuning, host='0.0.0.0', port=8000, servers=None, wsgi_app='views:app',
+                         asgi=False):
+    names = server_names(servers) + (list(ASGI_SERVER_CONFIGS) if asgi else [])
+    written = []
+    with WriteTransaction() as transaction:
+        for filename, content in render_server_configs(names, tuning, host, port, wsgi_app).items():
+            path = os.path.join(build_path, filename)
+            transaction.write(path, content)
+            written.append(path)
+    return written
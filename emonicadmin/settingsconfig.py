@@ -0,0 +1,90 @@
+from .config import format_literal
+from .serverconfig import tune_server
+
+CACHE_BACKENDS = {
+    'locmem': 'emonic.cache.backends.locmem.LocMemCache',
+    'file': 'emonic.cache.backends.filebased.FileBasedCache',
+    'redis': 'emonic.cache.backends.redis.RedisCache',
+}
+DEFAULT_REDIS_URL = 'redis://127.0.0.1:6379/0'
+DATABASE = {
+    'ENGINE': 'emonic.db.backends.electrus',
+    'HOST': 'localhost',
+    'PORT': 37017,
+    'USER': 'root',
+    'PASSWORD': 'root',
+}
+
+def parse_replica(value):
+    # HOST or HOST:PORT, the port defaulting to the primary's
+    host, _, port = value.rpartition(':') if ':' in value else (value, '', '')
+    if not host or not (port.isdigit() or not port):
+        raise ValueError(f'invalid replica "{value}", expected HOST or HOST:PORT')
+    return host, int(port) if port else DATABASE['PORT']
+
+def pool_settings(pool_size, max_overflow, recycle):
+    return {
+        'SIZE': pool_size,
+        # Extra connections opened under bursts and closed again when returned
+        'MAX_OVERFLOW': max_overflow,
+        # Seconds a request waits for a free connection before failing
+        'TIMEOUT': 30,
+        # Seconds before a connection is replaced, below typical server and firewall idle cut-offs
+        'RECYCLE': recycle,
+        'PRE_PING': True,
+    }
+
+def database_settings(pool, replicas=()):
+    databases = {'default': dict(DATABASE, CONNECT_TIMEOUT=5, POOL=pool)}
+    for index, (host, port) in enumerate(replicas, 1):
+        databases[f'replica{index}'] = dict(DATABASE, HOST=host, PORT=port, CONNECT_TIMEOUT=5, READ_ONLY=True,
+                                            POOL=pool)
+    return databases
+
+def cache_settings(backend, project_name, root_project_path, location=None, pool_size=10):
+    cache = {'BACKEND': CACHE_BACKENDS[backend], 'TIMEOUT': 300}
+    if backend == 'locmem':
+        # Per process, evicting the least recently used entries beyond MAX_ENTRIES
+        cache.update(LOCATION=location or project_name, OPTIONS={'MAX_ENTRIES': 1000, 'CULL_POLICY': 'lru'})
+    elif backend == 'file':
+        cache.update(LOCATION=location or f'{root_project_path}/.cache', OPTIONS={'MAX_ENTRIES': 10000})
+    else:
+        cache.update(LOCATION=location or DEFAULT_REDIS_URL, KEY_PREFIX=project_name,
+                     OPTIONS={'POOL_SIZE': pool_size, 'SOCKET_TIMEOUT': 5, 'SOCKET_CONNECT_TIMEOUT': 5})
+    return {'default': cache}
+
+def environment_settings(project_name, root_project_path, gradle_entry, profile='auto', pool_size=None,
+                         max_overflow=None, recycle=1800, replicas=(), cache='locmem', cache_location=None):
+    # Source of the per-environment block of settings.py. Production pools hold one connection
+    # per request a worker process serves at once (its threads), plus as many again for bursts.
+    tuning = tune_server(profile)
+    pool_size = pool_size or tuning['threads']
+    max_overflow = max_overflow if max_overflow is not None else pool_size
+    gradle = gradle_entry['gradle']
+    environments = {
+        'prod': {
+            'HOST': gradle['prod']['host'],
+            'PORT': gradle['prod']['port'],
+            'DEBUG': False,
+            'DATABASES': database_settings(pool_settings(pool_size, max_overflow, recycle), replicas),
+            # Read-only aliases in DATABASES that reads may be routed to
+            'DATABASE_REPLICAS': [f'replica{index}' for index in range(1, len(replicas) + 1)],
+            'CACHES': cache_settings(cache, project_name, root_project_path, cache_location, pool_size),
+        },
+        # Development talks to the primary only through a small pool, and a local memory cache
+        # stands in for shared (file or Redis) caches
+        'dev': {
+            'HOST': gradle['dev']['host'],
+            'PORT': gradle['dev']['port'],
+            'DEBUG': gradle['dev'].get('debug', True),
+            'DATABASES': database_settings(pool_settings(2, 2, recycle)),
+            'DATABASE_REPLICAS': [],
+            'CACHES': cache_settings('locmem', project_name, root_project_path),
+        },
+    }
+
+    lines = []
+    for header, values in (("if ENVIRONMENT == 'prod':", environments['prod']), ('else:', environments['dev'])):
+        lines.append(header)
+        lines.extend(f'    {name} = {format_literal(value, 1)}' for name, value in values.items())
+    return '\n'.join(lines)
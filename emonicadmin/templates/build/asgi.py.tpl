@@ -0,0 +1,63 @@
+# ASGI entry point for ${project_name}: uvicorn asgi:application, hypercorn --config hypercorn.toml asgi:application
+# Paths registered in async_views.py are served on the event loop; every other request goes to
+# the WSGI app in views.py (through asgiref when it is installed).
+from urllib.parse import parse_qs
+
+from async_views import routes
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+    from views import app as wsgi_app
+    fallback = WsgiToAsgi(wsgi_app)
+except ImportError:
+    fallback = None
+
+class Request:
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        self.headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope.get('headers', [])}
+        self._receive = receive
+
+    async def body(self):
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await self._receive()
+            chunks.append(message.get('body', b''))
+            more_body = message.get('more_body', False)
+        return b''.join(chunks)
+
+async def send_response(send, body, status=200, content_type='text/html; charset=utf-8'):
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', content_type.encode('latin-1')),
+                            (b'content-length', str(len(body)).encode('latin-1'))]})
+    await send({'type': 'http.response.body', 'body': body})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+    view = routes.get(scope['path'])
+    if view is not None:
+        result = await view(Request(scope, receive))
+        await send_response(send, *(result if isinstance(result, tuple) else (result,)))
+    elif fallback is not None:
+        await fallback(scope, receive, send)
+    else:
+        await send_response(send, 'Not Found', 404, 'text/plain; charset=utf-8')
@@ -0,0 +1,20 @@
+import asyncio
+
+# Async views for ${project_name}, served by asgi.py on the event loop: await I/O instead of blocking.
+# Return a body, or (body, status) / (body, status, content type).
+routes = {}
+
+def route(path):
+    def register(view):
+        routes[path] = view
+        return view
+    return register
+
+@route('/')
+async def emonic(request):
+    return "Welcome to Emonic async server!"
+
+@route('/health')
+async def health(request):
+    await asyncio.sleep(0)
+    return 'ok', 200, 'text/plain; charset=utf-8'
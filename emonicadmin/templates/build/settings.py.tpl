@@ -0,0 +1,57 @@
+import os
+
+SECRET_KEY = "your_secret_key"
+STATIC_FOLDER = "static"
+
+TEMPLATES = [
+    {
+        'BACKEND': 'emonic.backends.EmonicTemplates',
+        'DIRS': ['views'],
+    }
+]
+
+# Server, database and cache settings for the GRADLE "dev" and "prod" blocks in config.py;
+# EMONIC_ENV=prod selects production
+ENVIRONMENT = os.environ.get('EMONIC_ENV', 'dev')
+
+${environment_settings}
+
+MAILER = [
+    {
+        "SMTP": "VALUE",
+        "PORT": "VALUE",
+        "USERNAME": "VALUE",
+        "PASSWORD": "VALUE",
+        "SSL": True,
+        "DEFAULT_SENDER": "VALUE"
+    }
+]
+
+PATH = [
+    {
+        "project": {
+            "name": "${project_name}",
+            "path": "${root_project_path}"
+        },
+        "gradle": {
+            "name": "${gradle_project_name}",
+            "path": "${project_path}"
+        }
+    }
+]
+
+SCRIPT = [
+    {
+        "config": {
+            "wsgi": "emonic.wsgi.http",
+            "host": "localhost",
+            "port": "8000",
+            "debug": "True"
+        },
+        "apps": {
+            "emonic",
+            "emonic-admin"
+            # add more emonic apps for e.g, electrus nexusdb etc...
+        }
+    }
+]
@@ -0,0 +1,10 @@
+from emonic.core.branch import Emonic
+
+app = Emonic(__name__)
+
+@app.route('/')
+def emonic(request):
+    return "Welcome to Emonic server!"
+
+if __name__ == "__main__":
+    app.run()
@@ -0,0 +1,4 @@
+# WSGI entry point for ${project_name}: gunicorn wsgi:application, uwsgi --module wsgi:application
+from views import app
+
+application = app
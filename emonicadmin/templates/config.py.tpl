@@ -0,0 +1,3 @@
+APP = ${app}
+
+GRADLE = ${gradle}
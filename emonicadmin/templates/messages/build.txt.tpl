@@ -0,0 +1,10 @@
+
+GRADLE = [
+    ${gradle_entry}
+]
+
+Builder completed, Gradle project: ${project_name}.
+run ^ `emonic-admin gradle --production` # Setup your project for production.
+run ^ `emonic-admin manage engine` # For setup your Emonic Static and Templating Engine.
+run ^ `emonic-admin create electrus cli -u root -p root` # Creating the Electrus CLI Engine.
+>> emonic-admin 1.0.1
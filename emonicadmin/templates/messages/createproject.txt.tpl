@@ -0,0 +1,6 @@
+Project ${project_name} intitiazed.
+
+APP = ${app}
+
+run ^ `emonic-admin setup --migrate` # Migrate your project
+>> emonic-admin 1.0.1
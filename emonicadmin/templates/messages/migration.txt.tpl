@@ -0,0 +1,5 @@
+Migration setup for ${project_name} is completed.
+
+${migration}
+run ^ `emonic-admin build --p <gradle_project_name>` ## For build core project.
+>> emonic-admin 1.0.1
@@ -0,0 +1 @@
+GRADLE_BUILD = ["${project_name}", "${project_path}"]
@@ -0,0 +1,23 @@
+BUILDER = [
+    {
+        "project": {
+            "init": "main:${project_name}:gradle",
+            "migration": "gradle.migrate",
+            "entry_point": {
+                "root": "${project_path}",
+                "secure": True
+            },
+            "connection": {
+                "connect": "http://emonic.vvfin.in/connect/migration/{secret_key}",
+                "CORS": "Keep-Alive-3.0",
+                "setup": ['on', 'disconnect']
+            },
+            "gradle": {
+                "name": "gradle.com.1",
+                "version": 1.1,
+                "key": "",
+                "entry": "BUILDER"
+            }
+        }
+    }
+]
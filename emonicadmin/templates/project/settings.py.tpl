@@ -0,0 +1,14 @@
+INSTALLED_APPS = [
+    '@emonic.core',
+    '@emonic.mail',
+    '@emonic.contrib',
+    '@emonic.Restful',
+    '@emonic.security',
+    '@emonic.utils',
+    '@emonic.components',
+    '@emonic.structer',
+    '@emonic.builder',
+    '${project_name}.admin',
+]
+
+ALLOWED_HOSTS = ['0.0.0.0', '127.0.0.1']
@@ -0,0 +1,5 @@
+from ${project_name}.urls import path
+
+urlpatterns = [
+    path('${project_name}')
+]
@@ -0,0 +1,27 @@
+# Generated by `emonic-admin gradle --server-config` (profile ${profile}: ${cpus} CPU(s), ${memory_mb} MB)
+# Run from anywhere with: gunicorn -c gunicorn.conf.py
+import os
+import sys
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+# `gradle --zipapp` ships the root project as root.pyz instead of the root/ directory
+zipapp = os.path.join(chdir, "root.pyz")
+if os.path.exists(zipapp):
+    sys.path.insert(0, zipapp)
+wsgi_app = "${wsgi_app}"
+bind = "${host}:${port}"
+
+workers = ${workers}
+threads = ${threads}
+worker_class = "${worker_class}"
+preload_app = ${preload}
+
+keepalive = ${keepalive}
+backlog = ${backlog}
+timeout = ${timeout}
+graceful_timeout = ${graceful_timeout}
+max_requests = ${max_requests}
+max_requests_jitter = ${max_requests_jitter}
+
+accesslog = "-"
+errorlog = "-"
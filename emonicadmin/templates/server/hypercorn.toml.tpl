@@ -0,0 +1,12 @@
+# Generated by emonic-admin (profile ${profile}: ${cpus} CPU(s), ${memory_mb} MB)
+# Run from the directory holding asgi.py with: hypercorn --config hypercorn.toml ${asgi_app}
+bind = ["${host}:${port}"]
+workers = ${asgi_workers}
+worker_class = "asyncio"
+keep_alive_timeout = ${keepalive}
+backlog = ${backlog}
+graceful_timeout = ${graceful_timeout}
+max_requests = ${max_requests}
+max_requests_jitter = ${max_requests_jitter}
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,9 @@
+# Generated by emonic-admin (profile ${profile}: ${cpus} CPU(s), ${memory_mb} MB)
+# Run from the directory holding asgi.py with: set -a; . ./uvicorn.env; set +a; uvicorn ${asgi_app}
+UVICORN_HOST=${host}
+UVICORN_PORT=${port}
+UVICORN_WORKERS=${asgi_workers}
+UVICORN_BACKLOG=${backlog}
+UVICORN_TIMEOUT_KEEP_ALIVE=${keepalive}
+UVICORN_TIMEOUT_GRACEFUL_SHUTDOWN=${graceful_timeout}
+UVICORN_LIMIT_MAX_REQUESTS=${max_requests}
@@ -0,0 +1,25 @@
+; Generated by `emonic-admin gradle --server-config` (profile ${profile}: ${cpus} CPU(s), ${memory_mb} MB)
+; Run from anywhere with: uwsgi --ini uwsgi.ini
+[uwsgi]
+chdir = %d
+module = ${wsgi_app}
+; `gradle --zipapp` ships the root project as root.pyz instead of the root/ directory
+if-exists = %d/root.pyz
+pythonpath = %d/root.pyz
+endif =
+http-socket = ${host}:${port}
+master = true
+need-app = true
+die-on-term = true
+vacuum = true
+
+processes = ${workers}
+threads = ${threads}
+enable-threads = ${enable_threads}
+lazy-apps = ${lazy_apps}
+
+http-keepalive = ${keepalive}
+listen = ${backlog}
+harakiri = ${timeout}
+max-requests = ${max_requests}
+max-requests-delta = ${max_requests_jitter}
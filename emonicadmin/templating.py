@@ -0,0 +1,74 @@
+import os
+import string
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# User template directories, searched before the bundled ones; set from --template-dir in main()
+TEMPLATE_DIRS = []
+
+# template name -> resolved path, and resolved path -> compiled template
+_template_paths = {}
+_template_cache = {}
+
+def set_template_dirs(template_dirs):
+    TEMPLATE_DIRS[:] = [os.path.abspath(template_dir) for template_dir in template_dirs]
+    _template_paths.clear()
+
+def compile_template(source):
+    # Split ${name} templates once into [literal, name, literal, ...]; rendering is then a join
+    parts = []
+    literal = []
+    position = 0
+    for match in string.Template.pattern.finditer(source):
+        literal.append(source[position:match.start()])
+        position = match.end()
+        if match.group('escaped') is not None:
+            literal.append('$')
+            continue
+        name = match.group('named') or match.group('braced')
+        if name is None:
+            raise ValueError(f'invalid placeholder at offset {match.start()}')
+        parts.append(''.join(literal))
+        parts.append(name)
+        literal = []
+    literal.append(source[position:])
+    parts.append(''.join(literal))
+    return parts
+
+def load_template(path):
+    compiled = _template_cache.get(path)
+    if compiled is None:
+        with open(path, 'r', encoding='utf-8') as template_file:
+            compiled = compile_template(template_file.read())
+        _template_cache[path] = compiled
+    return compiled
+
+def find_template(name):
+    path = _template_paths.get(name)
+    if path is None:
+        for template_dir in TEMPLATE_DIRS + [TEMPLATE_DIR]:
+            candidate = os.path.join(template_dir, *name.split('/')) + '.tpl'
+            if os.path.isfile(candidate):
+                path = _template_paths[name] = candidate
+                break
+        else:
+            raise FileNotFoundError(f'template "{name}" not found')
+    return path
+
+def render_compiled(compiled, context):
+    return ''.join(part if index % 2 == 0 else str(context[part]) for index, part in enumerate(compiled))
+
+def render_template(name, **context):
+    return render_compiled(load_template(find_template(name)), context)
+
+def stage_skeleton(kind, target_path, transaction, **context):
+    # Every file under <template-dir>/skeleton/<kind>/ is rendered into the new project
+    for template_dir in TEMPLATE_DIRS:
+        skeleton_root = os.path.join(template_dir, 'skeleton', kind)
+        for root, _, files in os.walk(skeleton_root):
+            for file in files:
+                template_path = os.path.join(root, file)
+                rel = os.path.relpath(template_path, skeleton_root)
+                if rel.endswith('.tpl'):
+                    rel = rel[:-len('.tpl')]
+                transaction.write(os.path.join(target_path, rel), render_compiled(load_template(template_path), context))
@@ -0,0 +1,121 @@
+import os
+import shutil
+import threading
+
+from .profiling import count, phase
+
+class WriteTransaction:
+    # Stages generated files in memory and publishes them together: each file goes
+    # through a temp file and os.replace, directories are fsynced once each, and a
+    # failure anywhere puts every target back the way it was.
+
+    def __init__(self):
+        self.files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.files.clear()
+        return False
+
+    def write(self, path, content):
+        # content is text, or bytes for binary files
+        self.files[os.path.abspath(path)] = content
+
+    def touch(self, path):
+        # Like open(path, 'a'): only create the file when it does not exist yet
+        path = os.path.abspath(path)
+        if path not in self.files and not os.path.exists(path):
+            self.files[path] = ''
+
+    def read(self, path):
+        path = os.path.abspath(path)
+        if path in self.files:
+            return self.files[path]
+        with open(path, 'r') as staged_file:
+            return staged_file.read()
+
+    def commit(self):
+        with phase('transaction.commit'):
+            created_dirs = []
+            staged = []
+            replaced = []
+            try:
+                for path in sorted(self.files):
+                    directory = os.path.dirname(path)
+                    created_dirs.extend(make_missing_dirs(directory))
+                    tmp_path = os.path.join(directory, f'.{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp')
+                    staged.append((tmp_path, path))
+                    with open(tmp_path, 'xb' if isinstance(self.files[path], bytes) else 'x') as tmp_file:
+                        tmp_file.write(self.files[path])
+                        tmp_file.flush()
+                        os.fsync(tmp_file.fileno())
+
+                for tmp_path, path in staged:
+                    try:
+                        with open(path, 'rb') as original_file:
+                            original = original_file.read()
+                        shutil.copymode(path, tmp_path)
+                    except FileNotFoundError:
+                        original = None
+                    os.replace(tmp_path, path)
+                    replaced.append((path, original))
+
+                directories = {os.path.dirname(path) for path in self.files}
+                fsync_dirs(directories)
+                count('files_written', len(staged))
+                count('fsyncs', len(staged) + len(directories))
+            except BaseException:
+                self.rollback(staged, replaced, created_dirs)
+                raise
+            finally:
+                self.files.clear()
+
+    def rollback(self, staged, replaced, created_dirs):
+        for path, original in reversed(replaced):
+            try:
+                if original is None:
+                    os.remove(path)
+                else:
+                    with open(path, 'wb') as restored_file:
+                        restored_file.write(original)
+            except OSError:
+                pass
+        for tmp_path, _ in staged:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        for directory in reversed(created_dirs):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+
+def make_missing_dirs(directory):
+    # Returns the directories that had to be created, outermost first
+    missing = []
+    while directory and not os.path.isdir(directory):
+        missing.append(directory)
+        directory = os.path.dirname(directory)
+    for path in reversed(missing):
+        os.makedirs(path, exist_ok=True)
+    return list(reversed(missing))
+
+def fsync_dirs(directories):
+    for directory in directories:
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            # Directories cannot be opened on every platform (e.g. Windows)
+            continue
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
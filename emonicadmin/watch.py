@@ -0,0 +1,223 @@
+import os
+import errno
+import select
+import struct
+import time
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+from .buildtree import collect_build_plan, load_build_manifest, save_build_manifest, scan_tree, sync_build_paths
+from .output import report
+
+# linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct('iIII')
+
+def load_libc():
+    if ctypes is None:
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+class InotifyWatcher:
+    # Watches every directory of the sources; read_changes() maps events to build-relative paths
+    def __init__(self, sources, rules=None):
+        self.rules = rules or {}
+        self.libc = load_libc()
+        if self.libc is None:
+            raise OSError('inotify is not available on this platform')
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.watches = {}
+        try:
+            for src_root, prefix in sources:
+                self.add_tree(src_root, prefix, self.rules.get(prefix), '')
+        except OSError:
+            self.close()
+            raise
+
+    def add_watch(self, path, rel, ignore, ignore_rel):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return
+            # ENOSPC means fs.inotify.max_user_watches is exhausted
+            raise OSError(error, f'inotify_add_watch failed for {path}')
+        self.watches[wd] = (path, rel, ignore, ignore_rel)
+
+    def add_tree(self, path, rel, ignore, ignore_rel):
+        # Ignored directories are pruned by scan_tree, so they are never watched
+        self.add_watch(path, rel, ignore, ignore_rel)
+        dirs, _ = scan_tree(path, rel, ignore, ignore_rel)
+        for dir_rel in dirs:
+            sub = dir_rel[len(rel):].lstrip('/')
+            self.add_watch(os.path.join(path, *sub.split('/')), dir_rel, ignore,
+                           f'{ignore_rel}/{sub}' if ignore_rel else sub)
+
+    def remove_tree(self, rel):
+        under = rel + '/'
+        for wd, (_, watched_rel, _, _) in list(self.watches.items()):
+            if watched_rel == rel or watched_rel.startswith(under):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def fileno(self):
+        return self.fd
+
+    def read_changes(self):
+        # Returns (changed build paths, overflowed)
+        changes = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                if wd not in self.watches or not name:
+                    continue
+                path, rel, ignore, ignore_rel = self.watches[wd]
+                name = os.fsdecode(name)
+                entry_rel = f'{rel}/{name}' if rel else name
+                entry_ignore_rel = f'{ignore_rel}/{name}' if ignore_rel else name
+                if ignore is not None and ignore.matches(entry_ignore_rel, bool(mask & IN_ISDIR)):
+                    continue
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # Watch new directories right away so files created inside them are not missed
+                        self.add_tree(os.path.join(path, name), entry_rel, ignore, entry_ignore_rel)
+                    elif mask & IN_MOVED_FROM:
+                        self.remove_tree(entry_rel)
+                changes.add(entry_rel)
+        return changes, overflow
+
+    def wait(self, timeout):
+        return bool(select.select([self.fd], [], [], timeout)[0])
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingWatcher:
+    # Fallback for platforms without inotify: rescans the sources every interval
+    def __init__(self, sources, interval=0.5, rules=None):
+        self.sources = sources
+        self.rules = rules
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        plan_dirs, plan_files = collect_build_plan(self.sources, self.rules)
+        return plan_dirs, {rel: (stat.st_size, stat.st_mtime_ns) for rel, (_, stat) in plan_files.items()}
+
+    def read_changes(self):
+        previous_dirs, previous_files = self.snapshot
+        self.snapshot = current_dirs, current_files = self.scan()
+        changes = previous_dirs ^ current_dirs
+        changes.update(rel for rel in previous_files.keys() | current_files.keys()
+                       if previous_files.get(rel) != current_files.get(rel))
+        return changes, False
+
+    def wait(self, timeout):
+        # Changes only show up on the next scan, so there is nothing to debounce
+        if timeout is not None:
+            return False
+        time.sleep(self.interval)
+        return True
+
+    def close(self):
+        pass
+
+def watch_build_tree(sources, build_path, link_mode='copy', debounce=0.02, poll_interval=0.5, polling=False,
+                     max_batches=None, rules=None):
+    # build_path must already be in sync with its manifest (run an incremental sync_build_tree first)
+    watcher = None
+    if not polling:
+        try:
+            watcher = InotifyWatcher(sources, rules)
+        except OSError as e:
+            report(f'inotify unavailable ({e}), polling every {poll_interval:.1f}s instead.')
+    if watcher is None:
+        watcher = PollingWatcher(sources, poll_interval, rules)
+
+    dirs, files = load_build_manifest(build_path)
+    unsupported = set()
+    totals = {'batches': 0, 'copied': 0, 'removed': 0, 'bytes': 0}
+    report(f'Watching {", ".join(src_root for src_root, _ in sources)} '
+           f'({"inotify" if isinstance(watcher, InotifyWatcher) else "polling"}), press Ctrl+C to stop.')
+    try:
+        while max_batches is None or totals['batches'] < max_batches:
+            # Block for the first event, then keep collecting until the tree is quiet for `debounce`
+            if not watcher.wait(None):
+                continue
+            first_seen = time.perf_counter()
+            pending = set()
+            overflow = False
+            while True:
+                changes, overflowed = watcher.read_changes()
+                pending.update(changes)
+                overflow = overflow or overflowed
+                # Cap the wait so a constantly busy tree still syncs
+                remaining = debounce * 5 - (time.perf_counter() - first_seen)
+                if remaining <= 0 or not watcher.wait(min(debounce, remaining)):
+                    break
+            if overflow:
+                # The kernel dropped events: resync everything that changed since the manifest
+                plan_dirs, plan_files = collect_build_plan(sources, rules)
+                pending = (dirs ^ plan_dirs) | (files.keys() ^ plan_files.keys()) | {
+                    rel for rel, (_, stat) in plan_files.items()
+                    if rel in files and (files[rel]['size'], files[rel]['mtime_ns']) != (stat.st_size, stat.st_mtime_ns)}
+            if not pending:
+                continue
+
+            stats = sync_build_paths(sources, build_path, pending, dirs, files, link_mode, unsupported, rules)
+            elapsed = time.perf_counter() - first_seen
+            if stats['copied'] or stats['removed']:
+                save_build_manifest(build_path, dirs, files)
+                report(f'Synced {len(pending)} change(s) in {elapsed * 1000:.0f} ms '
+                       f'({stats["copied"]} copied, {stats["removed"]} removed).')
+            totals['batches'] += 1
+            for key in ('copied', 'removed', 'bytes'):
+                totals[key] += stats[key]
+    except KeyboardInterrupt:
+        report('Watch stopped.')
+    finally:
+        watcher.close()
+    return totals
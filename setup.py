@@ -13,12 +13,13 @@ setup(
     author_email='control@vvfin.in',
     url='https://github.com/embracke/emonicadmin',
     packages=find_packages(),
+    package_data={'emonicadmin': ['templates/*.tpl', 'templates/*/*.tpl']},
     install_requires=['emonic'],  
+    python_requires='>=3.7',
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
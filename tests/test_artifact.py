@@ -0,0 +1,45 @@
+import os
+import tarfile
+
+import pytest
+
+from emonicadmin.artifact import write_build_artifact
+from emonicadmin.buildtree import collect_build_plan
+
+def make_plan(tmp_path):
+    blog = tmp_path / 'blog'
+    (blog / 'static').mkdir(parents=True)
+    (blog / 'views.py').write_text('app = None\n')
+    (blog / 'static' / 'site.css').write_text('body{}\n')
+    (blog / 'run.sh').write_text('#!/bin/sh\n')
+    os.chmod(blog / 'run.sh', 0o755)
+    return blog, collect_build_plan([(str(blog), '')])
+
+@pytest.mark.parametrize('artifact_format', ['tar.gz', 'zip'])
+def test_artifacts_are_byte_reproducible(tmp_path, monkeypatch, artifact_format):
+    monkeypatch.delenv('SOURCE_DATE_EPOCH', raising=False)
+    blog, plan = make_plan(tmp_path)
+    first = tmp_path / f'first.{artifact_format}'
+    write_build_artifact(plan, str(first), artifact_format)
+
+    # Other mtimes and a fresh scan must not change a single byte
+    for path in (blog / 'views.py', blog / 'static' / 'site.css'):
+        os.utime(path, (1700000000, 1700000000))
+    second = tmp_path / f'second.{artifact_format}'
+    write_build_artifact(collect_build_plan([(str(blog), '')]), str(second), artifact_format)
+
+    assert first.read_bytes() == second.read_bytes()
+
+def test_tar_entries_are_sorted_with_fixed_metadata(tmp_path, monkeypatch):
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', '1600000000')
+    _, plan = make_plan(tmp_path)
+    artifact = tmp_path / 'blog.tar.gz'
+    stats = write_build_artifact(plan, str(artifact), 'tar.gz')
+
+    assert stats['files'] == 3
+    with tarfile.open(artifact) as archive:
+        members = archive.getmembers()
+    assert [member.name for member in members] == ['run.sh', 'static', 'static/site.css', 'views.py']
+    assert {(member.mtime, member.uid, member.uname) for member in members} == {(1600000000, 0, '')}
+    assert {member.name: member.mode for member in members if member.isfile()} == \
+        {'run.sh': 0o755, 'static/site.css': 0o644, 'views.py': 0o644}
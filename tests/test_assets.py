@@ -0,0 +1,48 @@
+import gzip
+import os
+
+from emonicadmin.commands.assets import minify_css, minify_js, process_asset
+
+def test_css_drops_whitespace_comments_and_last_semicolons():
+    css = '/* note */\na  >  b {\n  color : red;\n  margin: 0 auto ;\n}\n/*! keep */'
+    assert minify_css(css) == 'a>b{color:red;margin:0 auto}/*! keep */'
+
+def test_css_space_before_colon_only_matters_in_selectors():
+    assert minify_css('a :hover { color : red }') == 'a :hover{color:red}'
+    assert minify_css('@media (min-width: 10px) { a :first-child { margin : 0 ; } }') == \
+        '@media (min-width:10px){a :first-child{margin:0}}'
+
+def test_css_keeps_strings_intact():
+    assert minify_css('a { content: ";}" ; }') == 'a{content:";}"}'
+    assert minify_css("a { font-family: 'Open  Sans' , serif; }") == "a{font-family:'Open  Sans',serif}"
+    assert minify_css('a:after { content: "  /* not a comment */  "; }') == \
+        'a:after{content:"  /* not a comment */  "}'
+
+def test_js_drops_comments_and_keeps_strings():
+    js = 'var a = "x  // y";  // comment\nvar b = \'/* z */\'; /* block */\nvar c = `t  ${a}`;'
+    assert minify_js(js) == 'var a="x  // y";\nvar b=\'/* z */\';\nvar c=`t  ${a}`;'
+
+def test_js_regex_literals_are_copied_through():
+    assert minify_js('var r = /a  b\\/ [/] c/g;') == 'var r=/a  b\\/ [/] c/g;'
+    # After a keyword '/' starts a regex, so no space is needed to keep it apart
+    assert minify_js('return /  x  /.test(s)') == 'return/  x  /.test(s)'
+
+def test_js_division_is_not_a_regex():
+    assert minify_js('var x = a / b / c;') == 'var x=a/b/c;'
+
+def test_js_keeps_tokens_apart():
+    assert minify_js('a + +b; c - -d; return  x') == 'a+ +b;c- -d;return x'
+
+def test_process_asset_writes_fingerprinted_and_compressed_copies(tmp_path):
+    src = tmp_path / 'site.css'
+    src.write_text('body {\n  color : red;\n}\n' * 50)
+    output_rel, outputs, size_in, size_out = process_asset(str(src), 'css/site.css', str(tmp_path / 'dist'))
+
+    assert output_rel.startswith('css/site.') and output_rel.endswith('.css')
+    assert outputs == [output_rel, output_rel + '.gz']
+    output = tmp_path / 'dist' / output_rel
+    assert output.read_bytes().startswith(b'body{color:red}')
+    assert gzip.decompress((tmp_path / 'dist' / (output_rel + '.gz')).read_bytes()) == output.read_bytes()
+    assert (size_in, size_out) == (src.stat().st_size, output.stat().st_size)
+    # Published through temp files that never outlive the write
+    assert sorted(os.listdir(tmp_path / 'dist' / 'css')) == sorted(name.rpartition('/')[2] for name in outputs)
@@ -0,0 +1,28 @@
+import json
+import os
+
+from emonicadmin.commands.batch import run_batch
+from emonicadmin.commands.createproject import create_project
+from emonicadmin.config import load_config
+
+def test_batch_merges_into_an_existing_workspace(tmp_path):
+    base_dir = str(tmp_path)
+    assert create_project('myapp', base_dir) is not None
+    manifest = tmp_path / 'batch.json'
+    manifest.write_text(json.dumps({'projects': [{'name': 'tenant1', 'dir': base_dir, 'build': ['t1web'],
+                                                  'engine': False}]}))
+    assert run_batch(str(manifest))
+    config = load_config(os.path.join(base_dir, 'config.py'))
+    assert config.project_names == ['myapp', 'tenant1']
+    assert [entry['project'] for entry in config.gradle_projects] == ['t1web']
+
+def test_batch_builds_only_the_flagged_projects(tmp_path):
+    base_dir = str(tmp_path)
+    manifest = tmp_path / 'batch.json'
+    manifest.write_text(json.dumps({'projects': [
+        {'name': 'a1', 'dir': base_dir, 'build': ['fa1'], 'engine': False},
+        {'name': 'a2', 'dir': base_dir, 'build': ['fa2'], 'engine': False, 'production': True},
+    ]}))
+    assert run_batch(str(manifest))
+    assert os.path.isfile(os.path.join(base_dir, 'build', 'fa2', 'views.py'))
+    assert not os.path.exists(os.path.join(base_dir, 'build', 'fa1'))
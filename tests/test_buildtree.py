@@ -0,0 +1,53 @@
+import os
+import shutil
+
+from emonicadmin.buildtree import sync_build_tree
+
+def make_sources(tmp_path):
+    gradle = tmp_path / 'blog'
+    root = tmp_path / 'front'
+    (gradle / 'static').mkdir(parents=True)
+    (root / 'app').mkdir(parents=True)
+    (gradle / 'settings.py').write_text('DEBUG = False\n')
+    (gradle / 'static' / 'site.css').write_text('body{}\n')
+    (root / 'views.py').write_text('app = None\n')
+    (root / 'app' / 'models.py').write_text('MODELS = []\n')
+    return [(str(gradle), ''), (str(root), 'root')]
+
+def test_incremental_build_reuses_the_manifest(tmp_path):
+    sources = make_sources(tmp_path)
+    build = tmp_path / 'build'
+    assert sync_build_tree(sources, str(build))['copied'] == 4
+
+    stats = sync_build_tree(sources, str(build), incremental=True)
+    assert (stats['copied'], stats['unchanged']) == (0, 4)
+
+    (tmp_path / 'front' / 'views.py').write_text('app = object()\n')
+    stats = sync_build_tree(sources, str(build), incremental=True)
+    assert (stats['copied'], stats['unchanged']) == (1, 3)
+    assert (build / 'root' / 'views.py').read_text() == 'app = object()\n'
+
+def test_incremental_build_restores_deleted_outputs(tmp_path):
+    sources = make_sources(tmp_path)
+    build = tmp_path / 'build'
+    sync_build_tree(sources, str(build))
+
+    os.remove(build / 'settings.py')
+    shutil.rmtree(build / 'root')
+    stats = sync_build_tree(sources, str(build), incremental=True)
+
+    assert (stats['copied'], stats['unchanged']) == (3, 1)
+    assert (build / 'settings.py').read_text() == 'DEBUG = False\n'
+    assert (build / 'root' / 'app' / 'models.py').read_text() == 'MODELS = []\n'
+
+def test_incremental_build_removes_stale_files(tmp_path):
+    sources = make_sources(tmp_path)
+    build = tmp_path / 'build'
+    sync_build_tree(sources, str(build))
+
+    shutil.rmtree(tmp_path / 'front' / 'app')
+    stats = sync_build_tree(sources, str(build), incremental=True)
+
+    assert stats['removed'] == 1
+    assert not os.path.exists(build / 'root' / 'app')
+    assert (build / 'root' / 'views.py').exists()
@@ -0,0 +1,86 @@
+import ast
+
+import pytest
+
+from emonicadmin.commands.createproject import create_project
+from emonicadmin.config import load_config, merge_entries, parse_config, render_config, splice_config
+
+APP_ENTRY = {'project': {'project': 'blog', 'path': '/srv/blog'}}
+GRADLE_ENTRY = {'gradle': {'project': 'front', 'version': 1.1}}
+
+def test_parse_config_reads_app_and_gradle():
+    values = parse_config(render_config([APP_ENTRY], [GRADLE_ENTRY]))
+    assert values == {'APP': [APP_ENTRY], 'GRADLE': [GRADLE_ENTRY]}
+
+def test_parse_config_ignores_other_statements():
+    content = 'import os\nEXTRA = os.environ.get("X")\nAPP = [{"project": {"project": "blog"}}]\nDEBUG = f"{1}"\n'
+    assert parse_config(content) == {'APP': [{'project': {'project': 'blog'}}]}
+
+def test_parse_config_rejects_non_literal_app():
+    with pytest.raises(ValueError):
+        parse_config('import os\nAPP = [os.getcwd()]\n')
+
+def test_load_config_project_names(tmp_path):
+    (tmp_path / 'config.py').write_text(render_config([APP_ENTRY], [GRADLE_ENTRY]))
+    config = load_config(str(tmp_path / 'config.py'))
+    assert config.project_names == ['blog']
+    assert config.gradle_projects == [GRADLE_ENTRY['gradle']]
+
+def test_load_config_unparsable(tmp_path, capsys):
+    (tmp_path / 'config.py').write_text('APP = [\n')
+    assert load_config(str(tmp_path / 'config.py')) is None
+    assert 'could not be parsed' in capsys.readouterr().out
+
+def test_merge_entries_replaces_by_name():
+    other = {'project': {'project': 'shop'}}
+    updated = {'project': {'project': 'blog', 'path': '/new'}}
+    assert merge_entries([APP_ENTRY, other], [updated], 'project') == [other, updated]
+    assert merge_entries([GRADLE_ENTRY], [], 'gradle') == [GRADLE_ENTRY]
+
+HAND_WRITTEN = '''import os
+
+# Extra settings kept by hand
+EXTRA = os.environ.get("X")
+
+APP = []  # projects
+
+GRADLE = [
+    # none yet
+]
+
+DEBUG = EXTRA is not None
+'''
+
+def test_splice_config_keeps_other_statements():
+    content = splice_config(HAND_WRITTEN, [APP_ENTRY], [GRADLE_ENTRY])
+    assert content.startswith('import os\n\n# Extra settings kept by hand\nEXTRA = os.environ.get("X")\n\n')
+    assert content.endswith('\n\nDEBUG = EXTRA is not None\n')
+    assert parse_config(content) == {'APP': [APP_ENTRY], 'GRADLE': [GRADLE_ENTRY]}
+
+def test_splice_config_without_end_lineno(monkeypatch):
+    # Python 3.7 nodes carry no end_lineno
+    parse = ast.parse
+
+    def parse_without_end(source):
+        tree = parse(source)
+        for node in ast.walk(tree):
+            node.end_lineno = None
+        return tree
+    monkeypatch.setattr(ast, 'parse', parse_without_end)
+    content = splice_config(HAND_WRITTEN, [APP_ENTRY], [GRADLE_ENTRY])
+    monkeypatch.undo()
+    assert content.endswith('\n\nDEBUG = EXTRA is not None\n')
+    assert parse_config(content) == {'APP': [APP_ENTRY], 'GRADLE': [GRADLE_ENTRY]}
+
+def test_splice_config_appends_missing_assignments():
+    content = splice_config('import os', [APP_ENTRY], [])
+    assert content.startswith('import os\n\nAPP = ')
+    assert parse_config(content) == {'APP': [APP_ENTRY], 'GRADLE': []}
+
+def test_createproject_keeps_hand_written_statements(tmp_path):
+    (tmp_path / 'config.py').write_text(HAND_WRITTEN)
+    assert create_project('blog', str(tmp_path)) is not None
+    content = (tmp_path / 'config.py').read_text()
+    assert 'EXTRA = os.environ.get("X")' in content and '# Extra settings kept by hand' in content
+    assert content.endswith('\n\nDEBUG = EXTRA is not None\n')
+    assert load_config(str(tmp_path / 'config.py')).project_names == ['blog']
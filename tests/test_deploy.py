@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from emonicadmin.deploy import deploy_build, parse_deploy_target
+
+def make_build(tmp_path):
+    build = tmp_path / 'build'
+    (build / 'sub').mkdir(parents=True)
+    (build / 'views.py').write_text('app = None\n')
+    (build / 'sub' / 'data.txt').write_text('one\n')
+    return build
+
+def test_deploy_links_unchanged_and_switches_current(tmp_path):
+    build = make_build(tmp_path)
+    target = tmp_path / 'target'
+
+    first = deploy_build(str(build), str(target))
+    assert first['copied'] == 2
+    (build / 'sub' / 'data.txt').write_text('two\n')
+    second = deploy_build(str(build), str(target), keep_releases=1)
+
+    assert (second['unchanged'], second['copied']) == (1, 1)
+    current = target / 'current'
+    assert os.path.islink(current)
+    assert (current / 'sub' / 'data.txt').read_text() == 'two\n'
+    # Hardlinked from the previous release, which stays as the rollback target despite keep_releases=1
+    assert os.path.samefile(current / 'views.py', os.path.join(first['path'], 'views.py'))
+    assert len(os.listdir(target / 'releases')) == 2
+
+def test_deploy_prunes_old_releases(tmp_path):
+    build = make_build(tmp_path)
+    target = tmp_path / 'target'
+    releases = [deploy_build(str(build), str(target), keep_releases=2)['release'] for _ in range(4)]
+    assert sorted(os.listdir(target / 'releases')) == releases[-2:]
+
+def test_remote_targets_are_rejected(tmp_path):
+    assert parse_deploy_target(f'local:{tmp_path}') == str(tmp_path)
+    for target in ('ssh://host/srv/app', 'host:/srv/app'):
+        with pytest.raises(ValueError):
+            parse_deploy_target(target)
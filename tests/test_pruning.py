@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+from emonicadmin.buildtree import collect_build_plan
+from emonicadmin.pruning import DEFAULT_EXCLUDES, IgnoreRules, prune_build_plan, string_value
+
+def test_unanchored_patterns_match_any_directory():
+    rules = IgnoreRules(['*.log', 'build/'])
+    assert rules.matches('app.log', False)
+    assert rules.matches('a/b/app.log', False)
+    assert rules.matches('a/build', True)
+    assert not rules.matches('a/build', False)
+
+def test_slash_anchors_to_the_root():
+    rules = IgnoreRules(['/settings_dev.py', 'docs/*.md'])
+    assert rules.matches('settings_dev.py', False)
+    assert not rules.matches('app/settings_dev.py', False)
+    assert rules.matches('docs/index.md', False)
+    assert not rules.matches('app/docs/index.md', False)
+    assert not rules.matches('docs/api/index.md', False)
+
+def test_double_star():
+    rules = IgnoreRules(['**/fixtures/**', 'a/**/b.txt'])
+    assert rules.matches('fixtures/x.json', False)
+    assert rules.matches('tests/fixtures/deep/x.json', False)
+    assert rules.matches('a/b.txt', False)
+    assert rules.matches('a/x/y/b.txt', False)
+
+def test_negation_last_match_wins():
+    rules = IgnoreRules(['*.py', '!keep.py', 'plugins/*.py', '!plugins/core.py'])
+    assert rules.matches('x.py', False)
+    assert not rules.matches('keep.py', False)
+    assert rules.matches('plugins/a.py', False)
+    assert not rules.matches('plugins/core.py', False)
+
+def test_comments_blank_lines_and_escapes():
+    assert IgnoreRules(['# comment', '', '   ']).rules == []
+    assert IgnoreRules(['\\#*#']).matches('#notes.txt#', False)
+    assert IgnoreRules(['\\!important']).matches('!important', False)
+
+def test_defaults_skip_caches_and_editor_files():
+    rules = IgnoreRules(DEFAULT_EXCLUDES)
+    for rel, is_dir in [('__pycache__', True), ('a/x.pyc', False), ('.git', True), ('a/#views.py#', False),
+                        ('a/.#views.py', False), ('a/views.py~', False)]:
+        assert rules.matches(rel, is_dir), rel
+    assert not rules.matches('a/views.py', False)
+
+def test_builder_modules_are_kept(tmp_path):
+    blog = tmp_path / 'blog'
+    front = tmp_path / 'front'
+    (blog / 'Gradle').mkdir(parents=True)
+    (blog / 'gradle').mkdir()
+    front.mkdir()
+    (blog / 'settings.py').write_text('INSTALLED_APPS = []\n')
+    (blog / 'main.py').write_text('')
+    (blog / 'unused.py').write_text('')
+    (blog / 'gradle' / '__init__.py').write_text('')
+    (blog / 'gradle' / 'migrate.py').write_text('import helpers\n')
+    (blog / 'helpers.py').write_text('')
+    (blog / 'Gradle' / 'migration.py').write_text(
+        'BUILDER = [{"project": {"init": "main:blog:gradle", "migration": "gradle.migrate"}}]\n')
+    (front / 'views.py').write_text('app = None\n')
+    plan = collect_build_plan([(str(blog), ''), (str(front), 'root')])
+
+    (dirs, files), pruned_modules, _ = prune_build_plan(plan, {'blog': '', 'front': 'root'})
+
+    assert {'Gradle/migration.py', 'gradle/__init__.py', 'gradle/migrate.py', 'helpers.py'} <= set(files)
+    assert 'main.py' not in files and 'unused.py' not in files
+    assert pruned_modules == 2
+
+def test_string_value_reads_python37_str_nodes():
+    assert string_value(SimpleNamespace(s='static/site.css')) == 'static/site.css'
+    assert string_value(SimpleNamespace(s=b'bytes')) is None
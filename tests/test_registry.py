@@ -0,0 +1,97 @@
+import json
+import os
+
+from emonicadmin.commands.build import build_project
+from emonicadmin.commands.createproject import create_project
+from emonicadmin.commands.migrate import create_migration
+from emonicadmin.config import load_config, splice_config
+from emonicadmin.registry import WORKSPACE_INDEX, load_registry, register_project, registry_update, \
+    unregister_project
+
+def workspace(tmp_path, *apps):
+    for app in apps:
+        assert create_project(app, str(tmp_path)) is not None
+        assert create_migration(app, str(tmp_path))
+    return str(tmp_path)
+
+def index_lines(base_dir):
+    with open(os.path.join(base_dir, WORKSPACE_INDEX)) as index_file:
+        return [json.loads(line) for line in index_file]
+
+def test_rebuild_replaces_the_gradle_entry(tmp_path):
+    base_dir = workspace(tmp_path, 'shop')
+    assert build_project('front', 'shop', base_dir) is not None
+    assert build_project('api', 'shop', base_dir) is not None
+    assert build_project('front', 'shop', base_dir) is not None
+
+    config = load_config(os.path.join(base_dir, 'config.py'))
+    # Newest first, each project once
+    assert [entry['project'] for entry in config.gradle_projects] == ['front', 'api']
+    registry = load_registry(base_dir)
+    assert sorted(registry['gradle']) == ['api', 'front']
+    assert registry['gradle']['front']['app'] == 'shop'
+
+def test_build_fails_without_readable_config(tmp_path, capsys):
+    base_dir = workspace(tmp_path, 'shop')
+    with open(os.path.join(base_dir, 'config.py'), 'w') as config_file:
+        config_file.write('APP = [\n')
+    assert build_project('front', 'shop', base_dir) is None
+    assert 'could not be read' in capsys.readouterr().out
+    assert not os.path.exists(os.path.join(base_dir, 'front'))
+
+def test_build_adds_a_missing_gradle_list(tmp_path):
+    base_dir = workspace(tmp_path, 'shop')
+    config_path = os.path.join(base_dir, 'config.py')
+    with open(config_path) as config_file:
+        content = config_file.read()
+    with open(config_path, 'w') as config_file:
+        config_file.write(content[:content.index('GRADLE')])
+    assert build_project('front', 'shop', base_dir) is not None
+    assert [entry['project'] for entry in load_config(config_path).gradle_projects] == ['front']
+
+def test_registry_appends_instead_of_rewriting(tmp_path):
+    base_dir = workspace(tmp_path, 'shop', 'blog')
+    before = index_lines(base_dir)
+    assert build_project('front', 'blog', base_dir) is not None
+    after = index_lines(base_dir)
+    # One add record plus the new config.py stamp
+    assert after[:len(before)] == before
+    assert [record['op'] for record in after[len(before):]] == ['add', 'config']
+    assert load_registry(base_dir)['gradle']['front']['app'] == 'blog'
+
+def test_registry_compacts_superseded_records(tmp_path):
+    base_dir = workspace(tmp_path, 'shop')
+    load_registry(base_dir)
+    entry = load_registry(base_dir)['app']['shop']['entry']
+    for _ in range(100):
+        register_project(base_dir, 'app', 'shop', entry)
+    lines = index_lines(base_dir)
+    assert len(lines) < 100
+    registry = load_registry(base_dir)
+    assert list(registry['app']) == ['shop']
+
+def test_registry_rebuilds_after_a_hand_edit(tmp_path):
+    base_dir = workspace(tmp_path, 'shop', 'blog')
+    load_registry(base_dir)
+    config_path = os.path.join(base_dir, 'config.py')
+    with open(config_path) as config_file:
+        content = config_file.read()
+    # Drop blog by hand: the index no longer matches config.py and is rebuilt from it
+    config = load_config(config_path)
+    with open(config_path, 'w') as config_file:
+        config_file.write(splice_config(content, config.app[:1], []) + '\n# edited\n')
+    assert list(load_registry(base_dir)['app']) == ['shop']
+
+def test_registry_remove_and_torn_last_line(tmp_path):
+    base_dir = workspace(tmp_path, 'shop', 'blog')
+    load_registry(base_dir)
+    unregister_project(base_dir, 'app', 'blog')
+    assert list(load_registry(base_dir)['app']) == ['shop']
+    # An interrupted append leaves half a record, which replay skips
+    with open(os.path.join(base_dir, WORKSPACE_INDEX), 'a') as index_file:
+        index_file.write('{"op": "add", "kind": "app", "na')
+    registry_update(base_dir, [])
+    unregister_project(base_dir, 'app', 'shop')
+    with open(os.path.join(base_dir, WORKSPACE_INDEX)) as index_file:
+        records = [json.loads(line) for line in index_file if line.endswith('}\n')]
+    assert records[-2] == {'op': 'remove', 'kind': 'app', 'name': 'shop'}
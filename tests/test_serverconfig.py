@@ -0,0 +1,31 @@
+import os
+import sys
+import runpy
+
+from emonicadmin.artifact import write_zipapp
+from emonicadmin.serverconfig import tune_server, write_server_configs
+
+def test_server_configs_put_the_zipapp_on_sys_path(tmp_path, monkeypatch):
+    build = tmp_path / 'build'
+    source = tmp_path / 'blogfront_views.py'
+    source.write_text('app = "from the zipapp"\n')
+    write_zipapp([('blogfront_views.py', (str(source), source.stat()))], str(build / 'root.pyz'))
+    gunicorn_conf, uwsgi_ini = write_server_configs(str(build), tune_server('cpu', cpus=2, memory_mb=1024),
+                                                    servers=['gunicorn', 'uWSGI'])
+
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    settings = runpy.run_path(gunicorn_conf)
+    assert sys.path[0] == settings['zipapp'] == os.path.join(str(build), 'root.pyz')
+    monkeypatch.delitem(sys.modules, 'blogfront_views', raising=False)
+    assert __import__('blogfront_views').app == 'from the zipapp'
+
+    with open(uwsgi_ini) as ini_file:
+        assert 'if-exists = %d/root.pyz\npythonpath = %d/root.pyz\nendif =\n' in ini_file.read()
+
+def test_gunicorn_config_without_zipapp_leaves_sys_path(tmp_path, monkeypatch):
+    gunicorn_conf, = write_server_configs(str(tmp_path), tune_server('cpu', cpus=2, memory_mb=1024),
+                                          servers=['gunicorn'])
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    before = list(sys.path)
+    runpy.run_path(gunicorn_conf)
+    assert sys.path == before
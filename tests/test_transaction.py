@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from emonicadmin import transaction as transaction_module
+from emonicadmin.transaction import WriteTransaction
+
+def test_commit_publishes_every_file(tmp_path):
+    (tmp_path / 'config.py').write_text('APP = []\n')
+    with WriteTransaction() as transaction:
+        transaction.write(tmp_path / 'config.py', 'APP = ["blog"]\n')
+        transaction.write(tmp_path / 'blog' / 'settings.py', 'DEBUG = True\n')
+        transaction.touch(tmp_path / 'blog' / '__init__.py')
+
+    assert (tmp_path / 'config.py').read_text() == 'APP = ["blog"]\n'
+    assert (tmp_path / 'blog' / 'settings.py').read_text() == 'DEBUG = True\n'
+    assert (tmp_path / 'blog' / '__init__.py').read_text() == ''
+    assert sorted(os.listdir(tmp_path)) == ['blog', 'config.py']
+
+def test_failed_commit_rolls_every_file_back(tmp_path, monkeypatch):
+    (tmp_path / 'config.py').write_text('APP = []\n')
+    transaction = WriteTransaction()
+    transaction.write(tmp_path / 'config.py', 'APP = ["blog"]\n')
+    transaction.write(tmp_path / 'blog' / 'app' / 'settings.py', 'DEBUG = True\n')
+
+    # Fails after both files were moved into place
+    def failing_fsync_dirs(directories):
+        raise OSError('disk full')
+    monkeypatch.setattr(transaction_module, 'fsync_dirs', failing_fsync_dirs)
+    with pytest.raises(OSError):
+        transaction.commit()
+
+    assert (tmp_path / 'config.py').read_text() == 'APP = []\n'
+    # New files, the directories created for them and the temp files are all gone
+    assert os.listdir(tmp_path) == ['config.py']
+
+def test_failed_replace_leaves_no_temp_files(tmp_path, monkeypatch):
+    (tmp_path / 'a.py').write_text('a = 1\n')
+    (tmp_path / 'b.py').write_text('b = 1\n')
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+            raise OSError('read-only file system')
+        os.rename(src, dst)
+    monkeypatch.setattr(transaction_module.os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        with WriteTransaction() as transaction:
+            transaction.write(tmp_path / 'a.py', 'a = 2\n')
+            transaction.write(tmp_path / 'b.py', 'b = 2\n')
+
+    assert (tmp_path / 'a.py').read_text() == 'a = 1\n'
+    assert (tmp_path / 'b.py').read_text() == 'b = 1\n'
+    assert sorted(os.listdir(tmp_path)) == ['a.py', 'b.py']
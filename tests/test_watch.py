@@ -0,0 +1,56 @@
+from emonicadmin import watch
+from emonicadmin.buildtree import load_build_manifest, sync_build_tree
+from emonicadmin.watch import watch_build_tree
+
+class ScriptedWatcher:
+    # Stands in for inotify: hands out one scripted read_changes() result per event
+    script = []
+
+    def __init__(self, sources, rules=None):
+        self.events = list(self.script)
+
+    def wait(self, timeout):
+        return bool(self.events)
+
+    def read_changes(self):
+        return self.events.pop(0)
+
+    def close(self):
+        pass
+
+def make_build(tmp_path):
+    blog = tmp_path / 'blog'
+    blog.mkdir()
+    (blog / 'views.py').write_text('app = None\n')
+    sources = [(str(blog), '')]
+    build = tmp_path / 'build'
+    sync_build_tree(sources, str(build))
+    return blog, sources, build
+
+def test_bursts_are_synced_as_one_batch(tmp_path, monkeypatch):
+    blog, sources, build = make_build(tmp_path)
+    (blog / 'static').mkdir()
+    (blog / 'static' / 'site.css').write_text('body{}\n')
+    (blog / 'views.py').write_text('app = object()\n')
+    monkeypatch.setattr(ScriptedWatcher, 'script', [({'static', 'static/site.css'}, False),
+                                                    ({'views.py'}, False), ({'views.py'}, False)])
+    monkeypatch.setattr(watch, 'InotifyWatcher', ScriptedWatcher)
+
+    totals = watch_build_tree(sources, str(build), debounce=60, max_batches=1)
+
+    assert (totals['batches'], totals['copied'], totals['removed']) == (1, 2, 0)
+    assert (build / 'static' / 'site.css').read_text() == 'body{}\n'
+    assert (build / 'views.py').read_text() == 'app = object()\n'
+    assert set(load_build_manifest(str(build))[1]) == {'views.py', 'static/site.css'}
+
+def test_overflow_resyncs_against_the_manifest(tmp_path, monkeypatch):
+    blog, sources, build = make_build(tmp_path)
+    (blog / 'urls.py').write_text('urlpatterns = []\n')
+    (blog / 'views.py').unlink()
+    monkeypatch.setattr(ScriptedWatcher, 'script', [(set(), True)])
+    monkeypatch.setattr(watch, 'InotifyWatcher', ScriptedWatcher)
+
+    totals = watch_build_tree(sources, str(build), max_batches=1)
+
+    assert (totals['copied'], totals['removed']) == (1, 1)
+    assert sorted(path.name for path in build.iterdir() if not path.name.startswith('.')) == ['urls.py']